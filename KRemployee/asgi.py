@@ -13,4 +13,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'KRemployee.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from management.live import LIVE_EVENTS_PATH, live_events  # noqa: E402, needs the apps loaded
+
+
+async def application(scope, receive, send):
+    """ the live board stream is served outside of Django, its streaming responses are iterated synchronously"""
+    if scope['type'] == 'http' and scope['path'] == LIVE_EVENTS_PATH:
+        return await live_events(scope, receive, send)
+    return await django_application(scope, receive, send)
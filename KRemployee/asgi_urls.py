@@ -0,0 +1,13 @@
+"""
+URL configuration used for the requests served by KRemployee.asgi, see management.middleware.
+The same urls as KRemployee.urls, the management reports are served by their async views.
+"""
+from django.urls import include, path
+
+from KRemployee.urls import urlpatterns as wsgi_urlpatterns
+
+
+urlpatterns = [
+    path('management/', include('management.async_urls')) if str(pattern.pattern) == 'management/' else pattern
+    for pattern in wsgi_urlpatterns
+]
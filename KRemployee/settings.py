@@ -47,7 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'management.instrumentation.RequestStatsMiddleware',
+    'management.middleware.asgi_urlconf_middleware',
     'django.middleware.security.SecurityMiddleware',
+    'management.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,6 +60,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'KRemployee.urls'
+# requests served by KRemployee.asgi use these urls, the management reports are async views there
+ASGI_ROOT_URLCONF = 'KRemployee.asgi_urls'
 
 TEMPLATES = [
     {
@@ -87,6 +92,60 @@ DATABASES = {
     }
 }
 
+# Optional read replica of the management reports, see management.routers. REPLICA_DATABASE_NAME is the replica
+# database (a copy of db.sqlite3 is enough to try it), reads of the report views go there except for
+# REPLICA_PIN_SECONDS after a user's last write request
+if os.getenv('REPLICA_DATABASE_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': os.getenv('REPLICA_DATABASE_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.getenv('REPLICA_DATABASE_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+REPLICA_PIN_SECONDS = 10
+DATABASE_ROUTERS = ['management.routers.ReplicaRouter']
+
+# Opt-in SQLite profile for concurrent writers (SQLITE_TUNING=1), applied to every new connection by management.sqlite.
+# WAL lets readers run next to the writer; busy_timeout (ms) waits longer than the 5 s of python's sqlite3 for the
+# write lock before "database is locked"; synchronous=NORMAL syncs on checkpoints only, which is safe with WAL;
+# mmap_size (bytes) and cache_size (KiB when negative) keep hot pages in memory.
+# `manage.py sqlite_maintenance` analyzes and checkpoints, `manage.py benchmark_sqlite` compares the profiles.
+SQLITE_TUNING = os.getenv('SQLITE_TUNING') == '1'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'busy_timeout': 20000,
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Local-memory by default, any other backend (redis, memcached, database) can be plugged in here.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'kremployee'),
+    },
+    # counters of management.metrics, one key per series and histogram bucket; use a shared backend with several workers
+    'metrics': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'kremployee-metrics',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Cache alias and timeout (seconds) of the per-user workday state, see employee.workday_state.
+# Saves drop the state only in the cache of the process that made them, with several processes use a shared backend
+# or stale pages may be shown until the timeout; the views that write read the state from the database anyway.
+WORKDAY_STATE_CACHE = 'default'
+WORKDAY_STATE_CACHE_TIMEOUT = 15 * 60
+
+# Seconds the distinct values offered by the management filter dropdowns are cached, see management.choices
+FILTER_CHOICES_CACHE_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -127,6 +186,35 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Rows per page of the management filter views; 'keyset' seeks on (start, id) and skips COUNT(*), 'pages' uses numbered pages
+MANAGEMENT_PAGINATE_BY = 50
+MANAGEMENT_PAGINATION = 'keyset'
+
+# Per view wall time and SQL stats, Server-Timing headers and the request stats page; off unless REQUEST_STATS=1
+REQUEST_STATS = os.getenv('REQUEST_STATS') == '1'
+
+# Prometheus /metrics: cache alias of the counters, bearer token required when set,
+# seconds after which the open workday/task gauges are counted again from the database
+METRICS_CACHE = 'metrics'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_RECOUNT_TIMEOUT = 60 * 60
+
+# Live board (management.live): cache alias of the event log, seconds between polls of the log in every ASGI process
+# and seconds the events are kept for reconnecting browsers. The alias has to point to a backend shared by all processes
+# (redis, memcached, database): with local-memory the board only gets the events of the process serving the stream,
+# `manage.py check --deploy` warns about it
+LIVE_BOARD_CACHE = 'default'
+LIVE_BOARD_POLL_INTERVAL = 1
+LIVE_BOARD_EVENT_TIMEOUT = 5 * 60
+
+# Cache alias of the overtime and project hours reports and seconds they are kept, see management.report_cache;
+# their versions are kept in the database, so any backend stays correct with several processes
+REPORT_CACHE = 'default'
+REPORT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Seconds a running report job may go without progress before `report_worker` queues it again
+REPORT_JOB_STALE_TIMEOUT = 10 * 60
+
 LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = 'login'
 
@@ -16,11 +16,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from management.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path('employee/', include('employee.urls')),
     path('management/', include('management.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 admin.site.site_header = "Master Administracja"
@@ -10,7 +10,7 @@ class UserAdmin(BaseUserAdmin):
     form = UserChangeForm
     add_form = UserCreationForm
 
-    list_display = ('last_name', 'first_name', 'email', 'is_admin', 'is_staff')
+    list_display = ('last_name', 'first_name', 'email', 'remaining_holiday', 'sick_leave_days', 'child_care_days', 'is_admin', 'is_staff')
     list_filter = ('is_admin', 'is_staff')
     fieldsets = (
         ('Informacje personalne', {'fields': ('email', 'first_name', 'last_name', 'mobile_nr', 'pesel', 'holiday_allowance')}),
@@ -27,5 +27,20 @@ class UserAdmin(BaseUserAdmin):
     ordering = ('last_name',)
     filter_horizontal = ()
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_absence_days()
+
+    @admin.display(description='Pozostały urlop', ordering='remaining_holiday')
+    def remaining_holiday(self, obj):
+        return obj.remaining_holiday
+
+    @admin.display(description='Dni choroby', ordering='sick_leave_days')
+    def sick_leave_days(self, obj):
+        return obj.sick_leave_days
+
+    @admin.display(description='Dni opieki', ordering='child_care_days')
+    def child_care_days(self, obj):
+        return obj.child_care_days
+
 admin.site.unregister(Group)
 admin.site.register(get_user_model(), UserAdmin)
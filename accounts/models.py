@@ -1,11 +1,34 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
+from django.db.models import F, FilteredRelation, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now as utcnow
 
-from employee import models as emp_models
+from management import models as manage_models
 from employee.enums import WorkDayStatus
 
-class AccountManagerCustom(BaseUserManager):
+class UserCustomQuerySet(models.QuerySet):
+
+    def with_absence_days(self, year=None):
+        """
+        Annotates used and remaining holiday, sick leave and child care days of the year
+        for every user at once, one grouped query over the employee day rollups.
+        """
+        year = year or utcnow().year
+
+        def days(status):
+            return Coalesce(Sum('year_days__workday_count', filter=Q(year_days__status=status)), 0)
+
+        return self.alias(
+            year_days=FilteredRelation('employeedayrollup', condition=Q(employeedayrollup__day__year=year)),
+        ).annotate(
+            used_holiday=days(WorkDayStatus.HOLIDAY),
+            sick_leave_days=days(WorkDayStatus.SICK_LEAVE),
+            child_care_days=days(WorkDayStatus.CHILD_CARE),
+        ).annotate(remaining_holiday=F('holiday_allowance') - F('used_holiday'))
+
+
+class AccountManagerCustom(BaseUserManager.from_queryset(UserCustomQuerySet)):
 
     def create_user(self,
                     email,
@@ -102,8 +125,10 @@ class UserCustom(AbstractBaseUser):
 
     @property
     def get_remaining_holiday(self):
+        if hasattr(self, 'remaining_holiday'):     # annotated by with_absence_days()
+            return self.remaining_holiday
         current_year = utcnow().year
-        used_up_holiday_qs = emp_models.WorkhoursRegistry.objects.filter(employee=self.pk, start__year=current_year, status=WorkDayStatus.HOLIDAY)
-        used_up_holiday = used_up_holiday_qs.count()
+        used_up_holiday_qs = manage_models.EmployeeDayRollup.objects.filter(employee=self.pk, day__year=current_year, status=WorkDayStatus.HOLIDAY)
+        used_up_holiday = used_up_holiday_qs.aggregate(days=Sum('workday_count'))['days'] or 0
         remaining_holiday = self.holiday_allowance - used_up_holiday
         return remaining_holiday
\ No newline at end of file
@@ -1,10 +1,56 @@
-from django.contrib import admin
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
 from employee.models import WorkhoursRegistry, Task, Projects, OvertimeParameters
+from management.timesheets import TimesheetImport, TIMESHEET_COLUMNS
+
+
+class TimesheetImportForm(forms.Form):
+    timesheet = forms.FileField(label="Plik CSV")
+    delimiter = forms.CharField(label="Separator", initial=';', max_length=1, strip=False)
+
+
+class WorkhoursRegistryAdmin(admin.ModelAdmin):
+    """ changelist has an extra 'Importuj CSV' page loading historical timesheets"""
+    shown_errors = 20
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='employee_workhoursregistry_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = TimesheetImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['timesheet'].file, encoding='utf-8-sig', newline='')
+            result = TimesheetImport().run(lines, delimiter=form.cleaned_data['delimiter'])
+            result.refresh_rollups()    # only the days in the file, the whole history is rebuilt by `import_timesheets`
+            self.message_user(request, f"Zaimportowano dni pracy: {result.workday_count}, zadania: {result.task_count}", messages.SUCCESS)
+            for line, message in result.errors[:self.shown_errors]:
+                self.message_user(request, f"Linia {line}: {message}", messages.WARNING)
+            if len(result.errors) > self.shown_errors:
+                self.message_user(request, f"Odrzuconych wierszy: {len(result.errors)}", messages.WARNING)
+            return redirect('admin:employee_workhoursregistry_changelist')
 
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "Import dni pracy z CSV",
+            'form': form,
+            'columns': TIMESHEET_COLUMNS,
+        }
+        return TemplateResponse(request, 'admin/employee/workhoursregistry/import_timesheets.html', context)
 
-# Register your models here.
 
-admin.site.register(WorkhoursRegistry)
+admin.site.register(WorkhoursRegistry, WorkhoursRegistryAdmin)
 admin.site.register(Task)
 admin.site.register(Projects)
-admin.site.register(OvertimeParameters)
\ No newline at end of file
+admin.site.register(OvertimeParameters)
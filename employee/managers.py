@@ -0,0 +1,90 @@
+from datetime import timedelta, timezone
+
+from django.db import models
+from django.db.models import Case, F, IntegerField, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, ExtractIsoWeekDay, Floor, Mod
+from django.db.models.lookups import Exact, GreaterThan
+
+
+def seconds_between(start, stop):
+    """ whole seconds from start to stop as stored in duration_seconds, None while the row is open"""
+    if stop is None:
+        return None
+    return (stop - start) // timedelta(seconds=1)
+
+
+def clock_parts(seconds):
+    """
+    SQL twin of management.utilities.seconds_to_hours_from_timedelta.
+    Floats are computed the same way python does (days * 24 + seconds / 3600) and minutes are rounded half to even,
+    so the sums are identical to adding the python results row by row.
+    """
+    decimal_hours = Cast(seconds / 86400 * 24, FloatField()) + Cast(Mod(seconds, 86400), FloatField()) / Cast(Value(3600), FloatField())
+    full_hours = Cast(Floor(decimal_hours), IntegerField())
+    minutes = (decimal_hours - Floor(decimal_hours)) * Cast(Value(60), FloatField())
+    minutes_floor = Cast(Floor(minutes), IntegerField())
+    minutes_rest = minutes - Floor(minutes)
+    clock_minutes = minutes_floor + Case(
+        When(GreaterThan(minutes_rest, 0.5), then=Value(1)),
+        When(Exact(minutes_rest, 0.5), then=Mod(minutes_floor, 2)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return full_hours, clock_minutes
+
+
+class WorkTimeQuerySet(models.QuerySet):
+    """ Duration sums for models with start/stop columns, computed by the database in one aggregate"""
+
+    def finished(self):
+        return self.exclude(stop=None)
+
+    def worked_between(self, first_day, last_day):
+        """ rows of the local days first_day to last_day, both included, read from the indexed work_date column"""
+        return self.filter(work_date__range=(first_day, last_day))
+
+    def longer_than(self, hours):
+        return self.filter(duration_seconds__gt=hours * 3600)
+
+    def with_duration(self):
+        full_hours, clock_minutes = clock_parts(F('duration_seconds'))
+        return self.finished().annotate(full_hours=full_hours, clock_minutes=clock_minutes)
+
+    def duration_breakdown(self, *fields):
+        """ one row per distinct value of fields with full_hours and clock_minutes summed"""
+        return self.with_duration().order_by().values(*fields).annotate(
+            full_hours_sum=Sum('full_hours'),
+            clock_minutes_sum=Sum('clock_minutes'),
+        ).order_by(*fields)
+
+
+class WorkhoursRegistryQuerySet(WorkTimeQuerySet):
+
+    def with_overtime(self, overtime_after, overtime_day):
+        """
+        Overtime of every workday as one column:
+        every hour past overtime_after counts, every hour on overtime_day (1=Mon, 7=Sun) counts,
+        and 30 or more remaining minutes count as a full hour.
+        Weekday is taken from the stored (UTC) start, same as workday.start.isoweekday() did.
+        """
+        minutes_bonus = Case(When(clock_minutes__gte=30, then=Value(1)), default=Value(0), output_field=IntegerField())
+        overtime_hours = Case(
+            When(start_iso_weekday=overtime_day, then=F('full_hours') + minutes_bonus),
+            When(full_hours__gte=overtime_after, then=F('full_hours') - overtime_after + minutes_bonus),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return self.with_duration().annotate(
+            start_iso_weekday=ExtractIsoWeekDay('start', tzinfo=timezone.utc),
+        ).annotate(overtime_hours=overtime_hours)
+
+    def overtime_per_employee(self, overtime_after, overtime_day):
+        """ {employee_id: overtime hours} for the whole queryset in one grouped query"""
+        rows = self.with_overtime(overtime_after, overtime_day).order_by().values('employee').annotate(
+            overtime=Coalesce(Sum('overtime_hours'), 0),
+        )
+        return {row['employee']: row['overtime'] for row in rows}
+
+
+class TaskQuerySet(WorkTimeQuerySet):
+    pass
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.1 on 2026-10-18 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_overtimeparameters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['work_day', 'stop'], name='task_work_day_stop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'start'], name='task_project_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['employee', 'start'], name='workday_employee_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['employee', 'status', 'stop'], name='workday_emp_status_stop_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0008_workday_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['start', 'id'], name='task_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['start', 'id'], name='workday_start_id_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.utils.timezone import localdate
+
+
+BATCH_SIZE = 1000
+
+
+def fill_work_date(apps, schema_editor):
+    """ local date of the start of every workday, tasks take the date of their workday, in pk batches"""
+    WorkhoursRegistry = apps.get_model('employee', 'WorkhoursRegistry')
+    Task = apps.get_model('employee', 'Task')
+
+    last_pk = 0
+    while True:
+        workdays = list(WorkhoursRegistry.objects.filter(pk__gt=last_pk).order_by('pk').only('start')[:BATCH_SIZE])
+        if not workdays:
+            break
+        for workday in workdays:
+            workday.work_date = localdate(workday.start)
+        WorkhoursRegistry.objects.bulk_update(workdays, ['work_date'])
+        last_pk = workdays[-1].pk
+
+    work_date = Subquery(WorkhoursRegistry.objects.filter(pk=OuterRef('work_day')).values('work_date')[:1])
+    last_task_pk = Task.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for first_pk in range(0, last_task_pk, BATCH_SIZE):
+        Task.objects.filter(pk__gt=first_pk, pk__lte=first_pk + BATCH_SIZE).update(work_date=work_date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0009_start_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workhoursregistry',
+            name='work_date',
+            field=models.DateField(null=True, editable=False, verbose_name='Dzień'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='work_date',
+            field=models.DateField(null=True, editable=False, verbose_name='Dzień'),
+        ),
+        migrations.RunPython(fill_work_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='workhoursregistry',
+            name='work_date',
+            field=models.DateField(editable=False, verbose_name='Dzień'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='work_date',
+            field=models.DateField(editable=False, verbose_name='Dzień'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['employee', 'work_date'], name='workday_employee_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['work_date'], name='workday_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'work_date'], name='task_project_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['work_date'], name='task_date_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def fill_duration_seconds(apps, schema_editor):
+    """ whole seconds from start to stop of every finished workday and task, in pk batches"""
+    for model_name in ('WorkhoursRegistry', 'Task'):
+        model = apps.get_model('employee', model_name)
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only('start', 'stop')[:BATCH_SIZE])
+            if not rows:
+                break
+            finished = [row for row in rows if row.stop is not None]
+            for row in finished:
+                row.duration_seconds = (row.stop - row.start) // timedelta(seconds=1)
+            model.objects.bulk_update(finished, ['duration_seconds'])
+            last_pk = rows[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0010_work_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workhoursregistry',
+            name='duration_seconds',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Czas trwania [s]'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='duration_seconds',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Czas trwania [s]'),
+        ),
+        migrations.RunPython(fill_duration_seconds, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='workhoursregistry',
+            index=models.Index(fields=['duration_seconds'], name='workday_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'duration_seconds'], name='task_project_duration_idx'),
+        ),
+    ]
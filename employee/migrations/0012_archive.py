@@ -0,0 +1,74 @@
+# Generated by Django 4.1.1 on 2026-10-18 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('employee', '0011_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkhoursRegistryArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(verbose_name='Start pracy')),
+                ('stop', models.DateTimeField(verbose_name='Koniec pracy')),
+                ('status', models.CharField(choices=[('P', 'Praca'), ('U', 'Urlop'), ('C', 'Choroba'), ('O', 'Opieka')], max_length=20, verbose_name='Status')),
+                ('work_date', models.DateField(verbose_name='Dzień')),
+                ('duration_seconds', models.BigIntegerField(verbose_name='Czas trwania [s]')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL, verbose_name='Pracownik')),
+            ],
+            options={
+                'verbose_name': 'Archiwalny dzień pracy',
+                'verbose_name_plural': 'Archiwalne dni pracy',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(verbose_name='Początek zadania')),
+                ('stop', models.DateTimeField(verbose_name='Zakończenie zadania')),
+                ('location', models.CharField(max_length=50, verbose_name='Miejsce pracy')),
+                ('work_mode', models.CharField(choices=[('HO', 'Home office'), ('F', 'W Firmie'), ('D', 'Delegacja'), ('S', 'Serwis')], max_length=20, verbose_name='Tryb pracy')),
+                ('work_date', models.DateField(verbose_name='Dzień')),
+                ('duration_seconds', models.BigIntegerField(verbose_name='Czas trwania [s]')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='employee.projects', verbose_name='Projekt')),
+                ('work_day', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_set', to='employee.workhoursregistryarchive', verbose_name='Dzień pracy')),
+            ],
+            options={
+                'verbose_name': 'Archiwalne zadanie',
+                'verbose_name_plural': 'Archiwalne zadania',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistryarchive',
+            index=models.Index(fields=['employee', 'work_date'], name='archive_employee_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistryarchive',
+            index=models.Index(fields=['work_date'], name='archive_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workhoursregistryarchive',
+            index=models.Index(fields=['start', 'id'], name='archive_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskarchive',
+            index=models.Index(fields=['project', 'work_date'], name='task_archive_project_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskarchive',
+            index=models.Index(fields=['work_date'], name='task_archive_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskarchive',
+            index=models.Index(fields=['start', 'id'], name='task_archive_start_id_idx'),
+        ),
+    ]
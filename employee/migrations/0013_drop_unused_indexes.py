@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-18 12:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0012_archive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_project_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='workhoursregistry',
+            name='workday_employee_start_idx',
+        ),
+    ]
@@ -1,12 +1,9 @@
-from datetime import timedelta
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.utils.timezone import now as utcnow
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.core.exceptions import ImproperlyConfigured
-from employee.enums import WorkDayStatus as wds
 
-from employee.models import WorkhoursRegistry
+from employee.workday_state import resolve_workday_state
 
 class RedirectMixin:
     """
@@ -54,11 +51,8 @@ class RestrictAbsentOrFinishedAccessMixin(RedirectMixin):
     redirect_url = 'errors'
     
     def test_func(self):       
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-        workday_absent = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow)).exclude(status__iexact=wds.WORK).first()
-        workday_finished = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow), status__exact=wds.WORK,).exclude(stop__iexact=None).first()
-        if workday_absent or workday_finished:
+        state = resolve_workday_state(self.request)
+        if state.is_absent or state.is_finished:
             return False
         else:
             return True
@@ -71,10 +65,8 @@ class RestrictWhenWorkdayAccessMixin(RedirectMixin):
     redirect_url = 'errors'
 
     def test_func(self):       
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-        workday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow)).first()
-        if workday:
+        state = resolve_workday_state(self.request)
+        if state.today_any:
             return False
         else:
             return True
@@ -87,22 +79,11 @@ class RestrictUnfinishedTaskAccessMixin(RedirectMixin):
     redirect_url = 'errors'
 
     def test_func(self):       
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-
-        yesterday = today - timedelta(days=1)
-        workday_yesterday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(yesterday, today), stop=None, status__exact=wds.WORK).first()
-        if workday_yesterday:
-            tasks = workday_yesterday.task_set.all()
+        state = resolve_workday_state(self.request)
+        if state.has_open_task:
+            return False
         else:
-            workday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow), status__exact=wds.WORK).first()
-            tasks = workday.task_set.all()
-            
-        for task in tasks:
-            if task.stop == None:
-                return False 
-            else:
-                return True
+            return True
 
 
 
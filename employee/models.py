@@ -1,9 +1,10 @@
 # from django.contrib.postgres.fields import ArrayField
-from django.db import models
-from django.utils.timezone import now as utcnow
+from django.db import models, transaction
+from django.utils.timezone import localdate, now as utcnow
 from django.contrib.auth import get_user_model
 
 from employee.enums import WorkDayStatus, WorkModeStatus
+from employee.managers import TaskQuerySet, WorkhoursRegistryQuerySet, seconds_between
 
 
 class WorkhoursRegistry(models.Model):
@@ -15,10 +16,37 @@ class WorkhoursRegistry(models.Model):
     stop = models.DateTimeField(verbose_name="Koniec pracy", null=True)
     employee = models.ForeignKey(get_user_model(), verbose_name="Pracownik", on_delete=models.PROTECT)
     status = models.CharField(verbose_name="Status", choices=WorkDayStatus.choices, default=WorkDayStatus.WORK, max_length=20)
+    # local day of start, a night shift belongs to the day it started; filled by save(), bulk_create callers set it themselves
+    work_date = models.DateField(verbose_name="Dzień", editable=False)
+    # stop - start in whole seconds, kept by save() so reports sum a column
+    duration_seconds = models.BigIntegerField(verbose_name="Czas trwania [s]", null=True, editable=False)
+
+    objects = WorkhoursRegistryQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Dzień Pracy"
         verbose_name_plural = "Dni Pracy"
+        indexes = [
+            models.Index(fields=['employee', 'status', 'stop'], name='workday_emp_status_stop_idx'),
+            models.Index(fields=['start', 'id'], name='workday_start_id_idx'),
+            models.Index(fields=['employee', 'work_date'], name='workday_employee_date_idx'),
+            models.Index(fields=['work_date'], name='workday_date_idx'),
+            models.Index(fields=['duration_seconds'], name='workday_duration_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.work_date = localdate(self.start)
+        self.duration_seconds = seconds_between(self.start, self.stop)
+        if kwargs.get('update_fields') is not None and {'start', 'stop'} & set(kwargs['update_fields']):
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'work_date', 'duration_seconds'}
+        if adding:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            # start edited in the admin moves the tasks with it, before post_save refreshes the rollups of both days
+            self.task_set.exclude(work_date=self.work_date).update(work_date=self.work_date)
+            super().save(*args, **kwargs)
 
     def __str__(self):
         label = f'{self.employee} dzień {self.start.astimezone()}'
@@ -48,10 +76,40 @@ class Task(models.Model):
     project = models.ForeignKey(Projects, verbose_name="Projekt", on_delete=models.PROTECT)
     work_mode = models.CharField(verbose_name="Tryb pracy", choices=WorkModeStatus.choices, max_length=20)
     work_day = models.ForeignKey(WorkhoursRegistry, verbose_name="Dzień pracy", on_delete=models.PROTECT)
+    # work_date of the workday, tasks of a night shift after midnight still count for the day the shift started
+    work_date = models.DateField(verbose_name="Dzień", editable=False)
+    duration_seconds = models.BigIntegerField(verbose_name="Czas trwania [s]", null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Zadanie"
         verbose_name_plural = "Zadania"
+        indexes = [
+            models.Index(fields=['work_day', 'stop'], name='task_work_day_stop_idx'),
+            models.Index(fields=['start', 'id'], name='task_start_id_idx'),
+            models.Index(fields=['project', 'work_date'], name='task_project_date_idx'),
+            models.Index(fields=['work_date'], name='task_date_idx'),
+            models.Index(fields=['project', 'duration_seconds'], name='task_project_duration_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        task._loaded_work_day_id = task.__dict__.get('work_day_id')
+        return task
+
+    def save(self, *args, **kwargs):
+        # a task moved to another workday takes its day along
+        if self.work_date is None or self.work_day_id != getattr(self, '_loaded_work_day_id', None):
+            self.work_date = self.work_day.work_date
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'work_date'}
+        self.duration_seconds = seconds_between(self.start, self.stop)
+        if kwargs.get('update_fields') is not None and {'start', 'stop'} & set(kwargs['update_fields']):
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'duration_seconds'}
+        super().save(*args, **kwargs)
+        self._loaded_work_day_id = self.work_day_id
 
     def __str__(self):
         work_mode_read = WorkModeStatus(self.work_mode).label
@@ -60,6 +118,60 @@ class Task(models.Model):
         len_strip = 6
         return label[0:(len_label-len_strip):]
 
+class WorkhoursRegistryArchive(models.Model):
+    """
+    Finished workdays of closed settlement years, moved out of WorkhoursRegistry by `manage.py archive_workdays`.
+    Rows keep their primary key and columns, management.archive reads them when a requested day range reaches back here.
+    """
+    start = models.DateTimeField(verbose_name="Start pracy")
+    stop = models.DateTimeField(verbose_name="Koniec pracy")
+    employee = models.ForeignKey(get_user_model(), verbose_name="Pracownik", on_delete=models.PROTECT)
+    status = models.CharField(verbose_name="Status", choices=WorkDayStatus.choices, max_length=20)
+    work_date = models.DateField(verbose_name="Dzień")
+    duration_seconds = models.BigIntegerField(verbose_name="Czas trwania [s]")
+
+    objects = WorkhoursRegistryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Archiwalny dzień pracy"
+        verbose_name_plural = "Archiwalne dni pracy"
+        indexes = [
+            models.Index(fields=['employee', 'work_date'], name='archive_employee_date_idx'),
+            models.Index(fields=['work_date'], name='archive_date_idx'),
+            models.Index(fields=['start', 'id'], name='archive_start_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.employee} dzień {self.work_date}'
+
+
+class TaskArchive(models.Model):
+    """ Tasks of the archived workdays"""
+    start = models.DateTimeField(verbose_name="Początek zadania")
+    stop = models.DateTimeField(verbose_name="Zakończenie zadania")
+    location = models.CharField(verbose_name="Miejsce pracy", max_length=50)
+    project = models.ForeignKey(Projects, verbose_name="Projekt", on_delete=models.PROTECT)
+    work_mode = models.CharField(verbose_name="Tryb pracy", choices=WorkModeStatus.choices, max_length=20)
+    # related_name as on Task, so templates read workday.task_set of both
+    work_day = models.ForeignKey(WorkhoursRegistryArchive, verbose_name="Dzień pracy", on_delete=models.CASCADE, related_name='task_set')
+    work_date = models.DateField(verbose_name="Dzień")
+    duration_seconds = models.BigIntegerField(verbose_name="Czas trwania [s]")
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Archiwalne zadanie"
+        verbose_name_plural = "Archiwalne zadania"
+        indexes = [
+            models.Index(fields=['project', 'work_date'], name='task_archive_project_date_idx'),
+            models.Index(fields=['work_date'], name='task_archive_date_idx'),
+            models.Index(fields=['start', 'id'], name='task_archive_start_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_work_mode_display()} {self.project} dnia {self.work_date}'
+
+
 class OvertimeParameters(models.Model):
 
     overtime_after = models.IntegerField(verbose_name="Nadgodziny po")
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# sent by the employee views when a workday or a task is started or ended, with workday= or task= argument
+workday_started = Signal()
+workday_ended = Signal()
+task_started = Signal()
+task_ended = Signal()
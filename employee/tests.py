@@ -1,3 +1,155 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate, make_aware, now as utcnow
+
+from accounts.models import UserCustom
+from employee.enums import WorkDayStatus
+from employee.models import WorkhoursRegistry, Task, Projects
+from employee.workday_state import WorkdayState, cache_key, get_cache, resolve_workday_state, workday_state_cache_stats
+from management.metrics import reset_metrics
+
+
+class TodayWorkdayIndexTest(TestCase):
+    """ the today's workday lookups have to be answered from the composite indexes, not a table scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = UserCustom.objects.create_user('jan@example.com', 'Jan', 'Kowalski', '123456789', '90010112345', 'haslo')
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # on an almost empty table postgres prefers a sequential scan, we only care that the index is usable
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_today_workday_uses_employee_date_index(self):
+        today = localdate()
+        queryset = WorkhoursRegistry.objects.filter(employee=self.employee.id, status=WorkDayStatus.WORK).worked_between(today, today + timedelta(days=1))
+        self.assertIn('workday_employee_date_idx', self.explain(queryset))
+
+    def test_open_workday_uses_status_stop_index(self):
+        queryset = WorkhoursRegistry.objects.filter(employee=self.employee.id, status=WorkDayStatus.WORK, stop=None)
+        self.assertIn('workday_emp_status_stop_idx', self.explain(queryset))
+
+    def test_project_tasks_use_project_date_index(self):
+        today = localdate()
+        queryset = Task.objects.filter(project=1).worked_between(today, today)
+        self.assertIn('task_project_date_idx', self.explain(queryset))
+
+    def test_worked_between_matches_date_range(self):
+        today = localdate()
+        for days in range(-2, 4):
+            WorkhoursRegistry.objects.create(employee=self.employee, start=utcnow() + timedelta(days=days))
+        expected = WorkhoursRegistry.objects.filter(start__date__range=(today, today + timedelta(days=1)))
+        self.assertQuerysetEqual(
+            WorkhoursRegistry.objects.worked_between(today, today + timedelta(days=1)).order_by('id'),
+            expected.order_by('id'),
+        )
+
+    def test_night_shift_tasks_keep_the_day_of_the_workday(self):
+        start = make_aware(datetime.combine(localdate() - timedelta(days=1), time(22)))
+        workday = WorkhoursRegistry.objects.create(employee=self.employee, start=start)
+        project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        task = Task.objects.create(start=start + timedelta(hours=3), location='Opole', project=project, work_mode='F', work_day=workday)
+        self.assertEqual((workday.work_date, task.work_date), (localdate(start), localdate(start)))
+
+        workday.start = start + timedelta(hours=12)
+        workday.save()
+        task.refresh_from_db()
+        self.assertEqual(task.work_date, localdate())
+
+    def test_long_project_tasks_use_project_duration_index(self):
+        queryset = Task.objects.filter(project=1).longer_than(10)
+        self.assertIn('task_project_duration_idx', self.explain(queryset))
+
+    def test_duration_follows_edited_times(self):
+        start = utcnow() - timedelta(hours=11)
+        workday = WorkhoursRegistry.objects.create(employee=self.employee, start=start)
+        self.assertIsNone(workday.duration_seconds)
+
+        workday.stop = start + timedelta(hours=10, minutes=30, seconds=15, microseconds=900)
+        workday.save(update_fields=['stop'])
+        workday.refresh_from_db()
+        self.assertEqual(workday.duration_seconds, 10 * 3600 + 30 * 60 + 15)
+
+        workday.start = start + timedelta(hours=1)
+        workday.save()
+        self.assertQuerysetEqual(WorkhoursRegistry.objects.longer_than(10), [])
+
+
+class WorkdayStateTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = UserCustom.objects.create_user('anna@example.com', 'Anna', 'Nowak', '123456789', '90010112345', 'haslo')
+
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        self.client.force_login(self.employee)
+
+    def test_night_shift_from_yesterday_is_active(self):
+        workday = WorkhoursRegistry.objects.create(employee=self.employee, start=utcnow() - timedelta(days=1))
+        request = self.client.get('/').wsgi_request
+        state = resolve_workday_state(request)
+        self.assertEqual(state.active_workday, workday)
+        self.assertFalse(state.is_finished)
+        self.assertIs(resolve_workday_state(request), state)
+
+    def test_workday_list_resolves_state_once(self):
+        workday = WorkhoursRegistry.objects.create(employee=self.employee)
+        Task.objects.create(location='Biuro', project=Projects.objects.create(name='P', client_company='K', location='L'), work_mode='F', work_day=workday)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('workdaylist'))
+        self.assertEqual(response.status_code, 200)
+        workday_queries = [query for query in queries if 'FROM "employee_workhoursregistry"' in query['sql']]
+        self.assertEqual(len(workday_queries), 1)
+
+    def test_ending_task_stores_its_duration(self):
+        workday = WorkhoursRegistry.objects.create(employee=self.employee, start=utcnow() - timedelta(hours=3))
+        task = Task.objects.create(start=utcnow() - timedelta(hours=2), location='Biuro', work_mode='F', work_day=workday,
+                                   project=Projects.objects.create(name='P', client_company='K', location='L'))
+        self.client.post(reverse('taskend', args=(task.id, )), {'location': 'Biuro'})
+        task.refresh_from_db()
+        self.assertEqual(task.duration_seconds, (task.stop - task.start) // timedelta(seconds=1))
+        self.assertGreaterEqual(task.duration_seconds, 2 * 3600)
+
+    def test_open_task_blocks_ending_workday(self):
+        workday = WorkhoursRegistry.objects.create(employee=self.employee)
+        Task.objects.create(location='Biuro', project=Projects.objects.create(name='P', client_company='K', location='L'), work_mode='F', work_day=workday)
+        response = self.client.get(reverse('workdayend', args=(workday.id, )))
+        self.assertRedirects(response, reverse('errors', args=("Masz niezakończone zadania", )), fetch_redirect_response=False)
+
+    def test_state_is_cached_until_employee_saves(self):
+        self.client.get(reverse('workdaylist'))
+        self.client.get(reverse('workdaylist'))
+        self.assertEqual(workday_state_cache_stats(), {'hits': 1, 'misses': 1})
+
+        self.client.post(reverse('workdaycreate'), {'start': localdate().isoformat() + ' 08:00'})    # reads the database
+        response = self.client.get(reverse('workdaylist'))
+        self.assertIsNotNone(response.context['task_list'])
+        self.assertEqual(workday_state_cache_stats(), {'hits': 1, 'misses': 3})
+
+    def test_writes_read_the_state_from_the_database(self):
+        """ a workday saved by another process, whose cache still holds the state from before"""
+        stale = WorkdayState([], utcnow().date())
+        workday = WorkhoursRegistry.objects.create(employee=self.employee)
+        get_cache().set(cache_key(self.employee.id, utcnow().date()), stale)
+        self.client.post(reverse('workdaycreate'), {'start': localdate().isoformat() + ' 08:00'})
+        self.assertQuerysetEqual(WorkhoursRegistry.objects.all(), [workday])
+
+        get_cache().set(cache_key(self.employee.id, utcnow().date()), stale)
+        project = Projects.objects.create(name='P', client_company='K', location='L')
+        self.client.post(reverse('taskcreate'), {'start': localdate().isoformat() + ' 09:00', 'location': 'Biuro', 'project': project.id, 'work_mode': 'F'})
+        self.assertEqual(Task.objects.get().work_day, workday)
 
-# Create your tests here.
+    def test_saves_anywhere_drop_the_cached_state(self):
+        self.client.get(reverse('workdaylist'))
+        workday = WorkhoursRegistry.objects.create(employee=self.employee)
+        self.assertEqual(resolve_workday_state(self.client.get('/').wsgi_request).active_workday, workday)
@@ -7,12 +7,12 @@ from django.utils.timezone import now as utcnow
 from employee.mixins import RestrictWhenWorkdayAccessMixin, RestrictUnfinishedTaskAccessMixin, RestrictAbsentOrFinishedAccessMixin
 from employee.models import WorkhoursRegistry, Task
 from employee.enums import WorkDayStatus
-
-from datetime import timedelta
+from employee.signals import workday_started, workday_ended, task_started, task_ended
+from employee.workday_state import resolve_workday_state, invalidate_workday_state
 
 
 class HomeTemplateView(TemplateView):
-    template_name = 'employee\employee_home.html'
+    template_name = 'employee/employee_home.html'
 
 
 class CreateAbsenceView(LoginRequiredMixin, RestrictWhenWorkdayAccessMixin, CreateView):
@@ -21,10 +21,13 @@ class CreateAbsenceView(LoginRequiredMixin, RestrictWhenWorkdayAccessMixin, Crea
     fields = ['start', 'status']
 
     def form_valid(self, form):
+        if resolve_workday_state(self.request, fresh=True).today_any:
+            return redirect(reverse(self.redirect_url, args=(self.error_msg, )))
         objct = form.save(commit=False)
         objct.employee = self.request.user
         objct.stop = objct.start
         objct.save()
+        invalidate_workday_state(self.request)
         return redirect('emp_home')
 
 
@@ -33,16 +36,7 @@ class WorkDayListView(LoginRequiredMixin, RestrictAbsentOrFinishedAccessMixin, L
     template_name = 'employee/work_day_list.html'
 
     def get_queryset(self):
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-
-        yesterday = today - timedelta(days=1)
-        workday_yesterday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(yesterday, today), stop=None, status__exact=WorkDayStatus.WORK).first()
-        if workday_yesterday:
-            tasks_daybefore = workday_yesterday.task_set.all()
-            return tasks_daybefore
-
-        workday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow), status__exact=WorkDayStatus.WORK).first()
+        workday = resolve_workday_state(self.request).active_workday
         if workday:
             tasks = workday.task_set.all()
             return tasks
@@ -55,9 +49,7 @@ class CreateWorkDayView(LoginRequiredMixin, CreateView):
     fields = ['start']
 
     def form_valid(self, form):
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-        workday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow), status__exact=WorkDayStatus.WORK).first()
+        workday = resolve_workday_state(self.request, fresh=True).today_workday
         if workday:
             return redirect('workdaylist')
         else:
@@ -66,6 +58,8 @@ class CreateWorkDayView(LoginRequiredMixin, CreateView):
             objct.stop = None
             objct.status = WorkDayStatus.WORK
             objct.save()
+            invalidate_workday_state(self.request)
+            workday_started.send(sender=WorkhoursRegistry, workday=objct)
             return redirect('workdaylist')
 
 
@@ -75,21 +69,16 @@ class CreateTaskView(LoginRequiredMixin, CreateView):
     fields = ['start', 'location', 'project', 'work_mode']
 
     def form_valid(self, form):
+        # yesterday's unfinished workday (night shift) goes first, then today's one
+        workday = resolve_workday_state(self.request, fresh=True).active_workday
+        if workday is None:
+            return redirect('workdaycreate')
         objct = form.save(commit=False)
-        today = utcnow().date()
-        tomorrow = today + timedelta(days=1)
-
-        yesterday = today - timedelta(days=1)
-        workday_yesterday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(yesterday, today), stop=None, status__exact=WorkDayStatus.WORK).first()
-
-        if workday_yesterday:
-            objct.work_day = workday_yesterday
-        else:
-            workday = WorkhoursRegistry.objects.filter(employee=self.request.user.id, start__date__range=(today, tomorrow), status__exact=WorkDayStatus.WORK).first()
-            objct.work_day = workday
-        
+        objct.work_day = workday
         objct.stop = None
         objct.save()
+        invalidate_workday_state(self.request)
+        task_started.send(sender=Task, task=objct)
         return redirect('workdaylist')
 
 class UpdateTaskView(LoginRequiredMixin, UpdateView):
@@ -108,8 +97,12 @@ class EndTaskView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         objct = form.save(commit=False)
+        was_open = objct.stop is None
         objct.stop = utcnow()
         objct.save()
+        invalidate_workday_state(self.request)
+        if was_open:
+            task_ended.send(sender=Task, task=objct)
         return redirect('workdaylist')
 
 
@@ -120,11 +113,18 @@ class EndWorkDayView(LoginRequiredMixin, RestrictUnfinishedTaskAccessMixin, Upda
 
     def form_valid(self, form):
         objct = form.save(commit=False)
+        was_open = objct.stop is None
         objct.stop = utcnow()
         objct.save()
+        invalidate_workday_state(self.request)
+        if was_open:
+            workday_ended.send(sender=WorkhoursRegistry, workday=objct)
         return redirect('emp_home')
 
 
 class EmployeeDetailView(LoginRequiredMixin, DetailView):
     model = get_user_model()
-    template_name = 'employee/emp_detail.html' 
\ No newline at end of file
+    template_name = 'employee/emp_detail.html'
+
+    def get_queryset(self):
+        return super().get_queryset().with_absence_days()
\ No newline at end of file
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.utils.timezone import now as utcnow
+
+from employee.enums import WorkDayStatus
+from employee.models import WorkhoursRegistry
+from management.metrics import cache_request, counter_value
+
+
+class WorkdayState:
+    """
+    What the employee has going on today, built from the workdays started between yesterday and tomorrow.
+    Night shifts are handled like before: a workday left open since yesterday is still the active one.
+    """
+
+    def __init__(self, workdays, today):
+        yesterday = today - timedelta(days=1)
+        tomorrow = today + timedelta(days=1)
+
+        self.open_workday = None    # unfinished work started yesterday or today
+        self.today_workday = None   # work started today, finished or not
+        self.absence = None         # holiday, sick leave etc. reported for today
+        self.today_any = None       # anything reported for today
+
+        for workday in workdays:
+            day = workday.work_date
+            is_work = workday.status == WorkDayStatus.WORK
+            if is_work and workday.stop is None and yesterday <= day <= today:
+                self.open_workday = self.open_workday or workday
+            if today <= day <= tomorrow:
+                self.today_any = self.today_any or workday
+                if is_work:
+                    self.today_workday = self.today_workday or workday
+                else:
+                    self.absence = self.absence or workday
+
+    @property
+    def active_workday(self):
+        """ workday new tasks are added to and listed from"""
+        return self.open_workday or self.today_workday
+
+    @property
+    def is_absent(self):
+        return self.absence is not None
+
+    @property
+    def is_finished(self):
+        return self.today_workday is not None and self.today_workday.stop is not None
+
+    @property
+    def has_open_task(self):
+        return self.active_workday is not None and self.active_workday.open_task_count > 0
+
+
+def get_cache():
+    return caches[getattr(settings, 'WORKDAY_STATE_CACHE', 'default')]
+
+
+def cache_key(user_id, today):
+    return f'workday_state:{user_id}:{today.isoformat()}'
+
+
+def workday_state_cache_stats():
+    """ hit/miss counters of the workday state cache, kept in management.metrics"""
+    return {
+        'hits': counter_value('cache_requests_total', (('cache', 'workday_state'), ('result', 'hit'))),
+        'misses': counter_value('cache_requests_total', (('cache', 'workday_state'), ('result', 'miss'))),
+    }
+
+
+def forget_workday_state(user_id):
+    """ drops the cached state of the user, the receivers in management.signals call it on every workday and task save"""
+    get_cache().delete(cache_key(user_id, utcnow().date()))
+
+
+def invalidate_workday_state(request):
+    """ call from every view that saves a workday or a task of request.user"""
+    forget_workday_state(request.user.id)
+    request._workday_state = None
+
+
+def resolve_workday_state(request, fresh=False):
+    """
+    Returns WorkdayState of request.user, computed with a single query.
+    It is memoized on the request, so access mixins and views share it,
+    and cached per user and day until a workday or task of the user is saved.
+    Views about to write pass fresh=True: the state is read from the database, since the cache
+    of another process may still hold the state from before a save made there.
+    """
+    state = None if fresh else getattr(request, '_workday_state', None)
+    if state is None:
+        today = utcnow().date()
+        key = cache_key(request.user.id, today)
+        cache = get_cache()
+        state = None if fresh else cache.get(key)
+        if state is None:
+            cache_request('workday_state', hit=False)
+            workdays = WorkhoursRegistry.objects.filter(employee=request.user.id).worked_between(
+                today - timedelta(days=1), today + timedelta(days=1)
+            ).annotate(open_task_count=Count('task', filter=Q(task__stop=None))).order_by('id')
+            state = WorkdayState(list(workdays), today)
+            cache.set(key, state, timeout=getattr(settings, 'WORKDAY_STATE_CACHE_TIMEOUT', 900))
+        else:
+            cache_request('workday_state', hit=True)
+        request._workday_state = state
+    return state
@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils.timezone import localdate
+
+from employee.models import WorkhoursRegistry, Task, WorkhoursRegistryArchive, TaskArchive
+from management.choices import invalidate_choices
+from management.report_cache import bump_all
+from management.utilities import settlement_period
+
+
+WORKDAY_COLUMNS = ('id', 'start', 'stop', 'employee_id', 'status', 'work_date', 'duration_seconds')
+TASK_COLUMNS = ('id', 'start', 'stop', 'location', 'project_id', 'work_mode', 'work_day_id', 'work_date', 'duration_seconds')
+
+
+# (workday model, task model) pairs, archived rows are older so they go first
+LIVE_SOURCES = [(WorkhoursRegistry, Task)]
+ARCHIVE_SOURCES = [(WorkhoursRegistryArchive, TaskArchive), (WorkhoursRegistry, Task)]
+
+# True while archive_before deletes the rows it copied, the receivers in management.signals leave them alone
+archiving = ContextVar('archiving', default=False)
+
+
+def archived_until():
+    """
+    last work_date in the archive tables or None; read from the database every time, one lookup of archive_date_idx,
+    so the processes serving the reports see an archive_before run by a command at once
+    """
+    return WorkhoursRegistryArchive.objects.aggregate(last=Max('work_date'))['last']
+
+
+async def aarchived_until():
+    return (await WorkhoursRegistryArchive.objects.aaggregate(last=Max('work_date')))['last']
+
+
+def reaches(until, first_day):
+    return until is not None and (first_day is None or first_day <= until)
+
+
+def reaches_archive(first_day):
+    """ True when days from first_day on (None means from the beginning) include archived days"""
+    return reaches(archived_until(), first_day)
+
+
+def sources(first_day=None):
+    """ models holding the days from first_day on, the archive is only read when it is needed"""
+    return ARCHIVE_SOURCES if reaches_archive(first_day) else LIVE_SOURCES
+
+
+async def asources(first_day=None):
+    return ARCHIVE_SOURCES if reaches(await aarchived_until(), first_day) else LIVE_SOURCES
+
+
+def workday_models(first_day=None):
+    return [workday_model for workday_model, task_model in sources(first_day)]
+
+
+def task_models(first_day=None):
+    return [task_model for workday_model, task_model in sources(first_day)]
+
+
+def archivable_cutoff(keep_years=1):
+    """
+    first day kept in the live tables: the start of the settlement year `keep_years` before the current one,
+    a settlement year being the twelve settlement periods from the 10-th of January
+    """
+    current_year = settlement_period(localdate())[0].year
+    return date(current_year - keep_years, 1, 10)
+
+
+def archive_before(cutoff, batch_size=1000):
+    """
+    Moves finished workdays of days before cutoff, and their tasks, to the archive tables in batches of batch_size
+    workdays, one transaction per batch. Workdays with an open task stay where they are.
+    Rollups are left alone, they already hold the archived days. Returns {'workdays': n, 'tasks': n}.
+
+    The copied rows are removed with QuerySet.delete(), so the PROTECT foreign keys still guard them, but the delete
+    receivers of management.signals skip them: the rollups they would refresh sum the same rows from the archive tables,
+    nobody edits workdays of closed years and the filter choices and cached reports are invalidated once at the end.
+    """
+    workdays = WorkhoursRegistry.objects.filter(work_date__lt=cutoff).finished().exclude(
+        Exists(Task.objects.filter(work_day=OuterRef('pk'), stop=None)),
+    ).order_by('pk')
+    moved = {'workdays': 0, 'tasks': 0}
+    token = archiving.set(True)
+    try:
+        while True:
+            with transaction.atomic():
+                batch = list(workdays.values(*WORKDAY_COLUMNS)[:batch_size])
+                if not batch:
+                    break
+                workday_ids = [row['id'] for row in batch]
+                tasks = list(Task.objects.filter(work_day__in=workday_ids).values(*TASK_COLUMNS))
+                WorkhoursRegistryArchive.objects.bulk_create([WorkhoursRegistryArchive(**row) for row in batch])
+                TaskArchive.objects.bulk_create([TaskArchive(**row) for row in tasks])
+                Task.objects.filter(work_day__in=workday_ids).delete()
+                WorkhoursRegistry.objects.filter(pk__in=workday_ids).delete()
+            moved['workdays'] += len(batch)
+            moved['tasks'] += len(tasks)
+    finally:
+        archiving.reset(token)
+
+    invalidate_choices(Task)
+    bump_all()
+    return moved
@@ -0,0 +1,19 @@
+from django.urls import path
+
+from management.urls import urlpatterns as sync_urlpatterns
+from management.views import AsyncWorkDayListView, AsyncProjectTodayListView, AsyncProjectHoursView, AsyncOvertimeView
+
+
+# url name -> async view replacing the synchronous one when the project runs under KRemployee.asgi
+ASYNC_VIEWS = {
+    'today_info': AsyncWorkDayListView,
+    'today_project': AsyncProjectTodayListView,
+    'project_hours': AsyncProjectHoursView,
+    'overtime': AsyncOvertimeView,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(template_name=ASYNC_VIEWS[pattern.name].template_name), name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
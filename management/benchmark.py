@@ -0,0 +1,151 @@
+import math
+import time
+import tracemalloc
+from importlib import import_module
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from django.utils.timezone import now as utcnow
+
+from accounts.models import UserCustom
+from employee.models import WorkhoursRegistry, Task
+from management.enums import ReportJobStatus
+from management.models import ReportJob
+
+
+BENCHMARK_URLCONFS = ('employee.urls', 'management.urls', 'accounts.urls')
+MANAGER_URLCONFS = ('management.urls', )     # driven as a superuser, like the management link of the menu
+MANAGER_EMAIL = 'benchmark.manager@example.com'
+
+
+def benchmark_routes():
+    """ names of every named route of the benchmarked url modules, in declaration order"""
+    return [pattern.name for module in BENCHMARK_URLCONFS for pattern in import_module(module).urlpatterns if pattern.name]
+
+
+def manager_routes():
+    return {pattern.name for module in MANAGER_URLCONFS for pattern in import_module(module).urlpatterns if pattern.name}
+
+
+def benchmark_manager():
+    """ the superuser the management routes are requested as, created once in the benchmark database"""
+    manager = UserCustom.objects.filter(email=MANAGER_EMAIL).first()
+    if manager is None:
+        manager = UserCustom.objects.create_superuser(MANAGER_EMAIL, 'Benchmark', 'Manager', '000000000', '00000000000', 'benchmark')
+    return manager
+
+
+def route_kwargs(employee):
+    """ url kwargs of every route that needs one, taken from the open workday and task of the employee"""
+    workday = WorkhoursRegistry.objects.filter(employee=employee).order_by('-start').first()
+    task = Task.objects.filter(work_day=workday).order_by('-start').first()
+    return {
+        'taskupdate': {'pk': task.pk},
+        'taskend': {'pk': task.pk},
+        'workdayend': {'pk': workday.pk},
+        'emp_detail': {'pk': employee.pk},
+        'errors': {'msg': 'benchmark'},
+        'project_hours': {'pk': task.project_id},
+        'overtime': {'pk': employee.pk},
+        'tasklist': {'pk': workday.pk},
+        'report_job_download': {'pk': ReportJob.objects.filter(status=ReportJobStatus.DONE).values_list('pk', flat=True).last() or 0},
+        'password_reset_confirm': {'uidb64': urlsafe_base64_encode(force_bytes(employee.pk)), 'token': default_token_generator.make_token(employee)},
+    }
+
+
+def percentile(values, percent):
+    """ nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class QueryCounter:
+    """ execute_wrapper counting queries, unlike connection.queries it is not reset when a request starts"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def timed_get(client, url):
+    """ streamed responses are read to the end so the whole export is timed"""
+    started = time.perf_counter()
+    response = client.get(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response, time.perf_counter() - started
+
+
+def measure_route(client, employee, url, repeat):
+    client.force_login(employee)    # logout and password routes may have logged the client out
+    response, elapsed = timed_get(client, url)     # warm up: lazily filled rollups, choice and state caches
+    if response.status_code != 200:
+        # a redirect or an error page would be timed instead of the page, the route is listed without numbers
+        return {'url': url, 'status': response.status_code, 'queries': None, 'p50_ms': None, 'p95_ms': None, 'peak_memory_kb': None}
+    timings = []
+    for _ in range(repeat):
+        client.force_login(employee)
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            response, elapsed = timed_get(client, url)
+        timings.append(elapsed * 1000)
+
+    client.force_login(employee)
+    tracemalloc.start()
+    timed_get(client, url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': queries.count,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(employee, repeat=20):
+    """
+    Drives every route of employee and accounts urls with GET as `employee`, the management urls as a superuser,
+    and returns the report: query count of a warm request, p50/p95 latency and peak python memory per route.
+    Only routes answering 200 are measured.
+    """
+    client = Client(raise_request_exception=False)
+    kwargs = route_kwargs(employee)
+    manager, managed = benchmark_manager(), manager_routes()
+    routes = {}
+    for name in benchmark_routes():
+        user = manager if name in managed else employee
+        routes[name] = measure_route(client, user, reverse(name, kwargs=kwargs.get(name)), repeat)
+    return {
+        'created': utcnow().isoformat(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'routes': routes,
+    }
+
+
+def compare_reports(previous, current, tolerance=0.1):
+    """ (route, field, previous, current) of every changed query count and of p95 moved by more than tolerance"""
+    changes = []
+    for name, route in current['routes'].items():
+        before = previous['routes'].get(name)
+        if before is None:
+            continue
+        if before['queries'] != route['queries']:
+            changes.append((name, 'queries', before['queries'], route['queries']))
+        if None in (before['p95_ms'], route['p95_ms']):
+            continue
+        if abs(route['p95_ms'] - before['p95_ms']) > tolerance * before['p95_ms']:
+            changes.append((name, 'p95_ms', before['p95_ms'], route['p95_ms']))
+    return changes
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+
+@register(Tags.caches, deploy=True)
+def check_live_board_cache(app_configs, **kwargs):
+    """ events published by the WSGI workers and commands reach the ASGI streams only through a shared cache"""
+    alias = getattr(settings, 'LIVE_BOARD_CACHE', 'default')
+    if settings.CACHES.get(alias, {}).get('BACKEND') in LOCAL_CACHES:
+        return [Warning(
+            f"LIVE_BOARD_CACHE '{alias}' is not shared between processes.",
+            hint='Point it to a redis, memcached or database cache, otherwise the live board misses the events of other processes.',
+            id='management.W001',
+        )]
+    return []
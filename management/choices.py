@@ -0,0 +1,39 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+
+from employee.models import Projects, Task
+from management.metrics import cache_request
+
+
+# fields of each model offered as filter choices, keeps invalidation in one place
+CHOICE_FIELDS = {
+    Projects: ('name', 'client_company', 'location'),
+    Task: ('location', ),
+}
+
+
+def choices_cache_key(model, field):
+    return f'filter_choices:{model._meta.label_lower}:{field}'
+
+
+def distinct_choices(model, field):
+    """ [(value, value), ...] of distinct values of model.field, cached for FILTER_CHOICES_CACHE_TIMEOUT seconds"""
+    key = choices_cache_key(model, field)
+    choices = cache.get(key)
+    cache_request('filter_choices', hit=choices is not None)
+    if choices is None:
+        values = model.objects.order_by(field).values_list(field, flat=True).distinct()
+        choices = [(value, value) for value in values]
+        cache.set(key, choices, timeout=getattr(settings, 'FILTER_CHOICES_CACHE_TIMEOUT', 60))
+    return choices
+
+
+def lazy_choices(model, field):
+    """ callable for ChoiceFilter(choices=...), evaluated when the form is rendered, not on import"""
+    return partial(distinct_choices, model, field)
+
+
+def invalidate_choices(model):
+    cache.delete_many([choices_cache_key(model, field) for field in CHOICE_FIELDS.get(model, ())])
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class ReportKind(models.TextChoices):
+    OVERTIME = 'overtime', 'Nadgodziny firmy'
+    PROJECT_HOURS = 'project_hours', 'Godziny projektu'
+
+
+class ReportJobStatus(models.TextChoices):
+    QUEUED = 'queued', 'W kolejce'
+    RUNNING = 'running', 'W trakcie'
+    DONE = 'done', 'Gotowy'
+    FAILED = 'failed', 'Błąd'
@@ -0,0 +1,23 @@
+from django import forms
+from django.utils.timezone import now as utcnow
+
+from employee.models import Projects
+from management.enums import ReportKind
+
+
+class ReportJobForm(forms.Form):
+    kind = forms.ChoiceField(label="Raport", choices=ReportKind.choices)
+    day = forms.DateField(label="Dzień z okresu", required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    project = forms.ModelChoiceField(label="Projekt", queryset=Projects.objects.all(), required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('kind') == ReportKind.PROJECT_HOURS and not cleaned_data.get('project'):
+            self.add_error('project', "Wybierz projekt")
+        return cleaned_data
+
+    def parameters(self):
+        """ the keyword arguments of the report function in management.jobs.REPORTS"""
+        if self.cleaned_data['kind'] == ReportKind.PROJECT_HOURS:
+            return {'project': self.cleaned_data['project'].pk}
+        return {'day': (self.cleaned_data['day'] or utcnow().date()).isoformat()}
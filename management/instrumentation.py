@@ -0,0 +1,115 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from management import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """ execute_wrapper counting queries and their time, the same sql with the same parameters twice is a duplicate"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """ {sql: times it was repeated} of the statements run more than once with identical parameters"""
+        return {sql: count - 1 for (sql, params), count in self.statements.items() if count > 1}
+
+
+def record(view_name, status_code, wall, recorder):
+    labels = (('view', view_name), )
+    metrics.inc('http_requests_total', (*labels, ('status', status_code)))
+    metrics.observe('http_request_duration_seconds', labels, wall, metrics.LATENCY_BUCKETS, scale=metrics.SECONDS)
+    metrics.observe('db_queries_per_request', labels, recorder.count, metrics.QUERY_BUCKETS)
+    metrics.observe('db_query_duration_seconds', labels, recorder.duration, metrics.LATENCY_BUCKETS, scale=metrics.SECONDS)
+    duplicates = sum(recorder.duplicates.values())
+    if duplicates:
+        metrics.inc('db_duplicate_queries_total', labels, duplicates)
+
+
+def request_stats():
+    """ totals per url name for the request stats page, slowest in total first"""
+    views = {}
+    for kind, name, labels, value in metrics.collect():
+        labels = dict(labels)
+        if 'view' not in labels:
+            continue
+        row = views.setdefault(labels['view'], {'view': labels['view'], 'requests': 0, 'wall': 0, 'queries': 0, 'sql': 0, 'duplicate_queries': 0})
+        if name == 'http_request_duration_seconds':
+            row['requests'], row['wall'] = value[1][-1], value[2]
+        elif name == 'db_queries_per_request':
+            row['queries'] = value[2]
+        elif name == 'db_query_duration_seconds':
+            row['sql'] = value[2]
+        elif name == 'db_duplicate_queries_total':
+            row['duplicate_queries'] = value
+
+    stats = []
+    for row in views.values():
+        requests = row['requests'] or 1
+        stats.append({
+            'view': row['view'],
+            'requests': row['requests'],
+            'total_ms': round(row['wall'] * 1000, 1),
+            'avg_ms': round(row['wall'] * 1000 / requests, 2),
+            'avg_queries': round(row['queries'] / requests, 1),
+            'avg_sql_ms': round(row['sql'] * 1000 / requests, 2),
+            'duplicate_queries': row['duplicate_queries'],
+        })
+    return sorted(stats, key=lambda row: row['total_ms'], reverse=True)
+
+
+class RequestStatsMiddleware:
+    """
+    Opt-in with REQUEST_STATS = True. Measures wall time, number and time of SQL queries of every request,
+    records them per url name in management.metrics (request stats page and /metrics), adds a Server-Timing header
+    and logs queries repeated with identical parameters.
+    Streamed responses are measured until the response object is returned, not until the last row is sent.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_STATS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall = time.perf_counter() - started
+
+        match = request.resolver_match
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+        record(view_name, response.status_code, wall, recorder)
+
+        duplicates = recorder.duplicates
+        if duplicates:
+            logger.warning("%s repeated %d queries: %s", view_name, sum(duplicates.values()), '; '.join(duplicates))
+        response['Server-Timing'] = (
+            f'app;dur={wall * 1000:.1f}, '
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries, {sum(duplicates.values())} duplicated"'
+        )
+        return response
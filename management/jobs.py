@@ -0,0 +1,117 @@
+import csv
+import io
+import logging
+import traceback
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.dateparse import parse_date
+from django.utils.timezone import now as utcnow
+
+from employee.models import Projects
+from management.archive import sources
+from management.enums import ReportKind, ReportJobStatus
+from management.export import cell
+from management.models import ReportJob
+from management.reports import project_hours_data, project_tasks
+from management.rollups import workforce_overtime
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_TASK_COLUMNS = (('Start', 'start'), ('Stop', 'stop'), ('Pracownik', 'work_day.employee'), ('Lokalizacja', 'location'),
+                        ('Tryb pracy', 'get_work_mode_display'))
+
+
+def overtime_report(progress, day):
+    """ overtime of the whole company for the settlement period of day, like `manage.py overtime_report`"""
+    tenth, next_tenth, employees_overtime = workforce_overtime(parse_date(day), progress=progress)
+    rows = [('email', 'first_name', 'last_name', 'overtime')]
+    rows += [(employee.email, employee.first_name, employee.last_name, overtime) for employee, overtime in employees_overtime]
+    return f'nadgodziny_{tenth}_{next_tenth}', rows
+
+
+def project_hours_report(progress, project):
+    """ the sums of the project hours page followed by every finished task of the project"""
+    name = Projects.objects.values_list('name', flat=True).get(pk=project)
+    report = project_hours_data(project)
+    tasks = [queryset.order_by('start') for queryset in project_tasks(project, sources())]
+
+    def rows():
+        yield 'Projekt', name, report['hours']
+        for row in report['employee_hours']:
+            yield 'Pracownik', row['employee'], row['hours']
+        for row in report['work_mode_hours']:
+            yield 'Tryb pracy', row['work_mode'], row['hours']
+        yield ()
+        yield [header for header, accessor in PROJECT_TASK_COLUMNS]
+        total = sum(queryset.count() for queryset in tasks)
+        for number, task in enumerate(chain.from_iterable(queryset.iterator(chunk_size=2000) for queryset in tasks), 1):
+            yield [cell(task, accessor) for header, accessor in PROJECT_TASK_COLUMNS]
+            if number % 1000 == 0:
+                progress(number, total)
+
+    return f'godziny_projektu_{project}', rows()
+
+
+# kind -> function(progress, **parameters) returning (filename without extension, rows)
+REPORTS = {
+    ReportKind.OVERTIME: overtime_report,
+    ReportKind.PROJECT_HOURS: project_hours_report,
+}
+
+
+def claim_job():
+    """
+    pk of the oldest queued job, marked as running, or None. The status is switched with a conditional update,
+    so when several workers race for a job only one of them gets it, no row locks needed.
+    """
+    queued = ReportJob.objects.filter(status=ReportJobStatus.QUEUED).order_by('created', 'id').values_list('id', flat=True)
+    for job_id in queued[:10]:
+        moment = utcnow()
+        if ReportJob.objects.filter(pk=job_id, status=ReportJobStatus.QUEUED).update(status=ReportJobStatus.RUNNING, started=moment, heartbeat=moment):
+            return job_id
+    return None
+
+
+def requeue_stale(timeout=None):
+    """ running jobs without progress for `timeout` seconds lost their worker, they are queued again"""
+    timeout = timeout or getattr(settings, 'REPORT_JOB_STALE_TIMEOUT', 600)
+    return ReportJob.objects.filter(status=ReportJobStatus.RUNNING, heartbeat__lt=utcnow() - timedelta(seconds=timeout)).update(
+        status=ReportJobStatus.QUEUED, progress=0, started=None, heartbeat=None,
+    )
+
+
+def release_job(job_id):
+    """ a claimed job that never reached a process goes back to the queue"""
+    ReportJob.objects.filter(pk=job_id, status=ReportJobStatus.RUNNING).update(status=ReportJobStatus.QUEUED, progress=0, started=None, heartbeat=None)
+
+
+def fail_job(job_id, error):
+    ReportJob.objects.filter(pk=job_id, status=ReportJobStatus.RUNNING).update(status=ReportJobStatus.FAILED, error=error, finished=utcnow())
+
+
+def run_job(job_id):
+    """ computes a claimed job and stores the CSV or the traceback, runs in a process of the report worker"""
+    job = ReportJob.objects.get(pk=job_id)
+
+    def progress(done, total):
+        ReportJob.objects.filter(pk=job_id).update(progress=min(done * 100 // max(total, 1), 99), heartbeat=utcnow())
+
+    try:
+        filename, rows = REPORTS[job.kind](progress, **job.parameters)
+        content = io.StringIO()
+        csv.writer(content, delimiter=';').writerows(rows)
+    except Exception:
+        logger.exception("report job %s failed", job_id)
+        fail_job(job_id, traceback.format_exc())
+        return False
+    else:
+        ReportJob.objects.filter(pk=job_id).update(
+            status=ReportJobStatus.DONE, progress=100, filename=f'{filename}.csv', result=content.getvalue(), finished=utcnow(),
+        )
+        return True
+    finally:
+        close_old_connections()
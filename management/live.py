@@ -0,0 +1,176 @@
+import asyncio
+import json
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.cache import caches
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+from django.utils.formats import date_format
+from django.utils.timezone import localtime
+
+
+LIVE_EVENTS_PATH = '/management/live/events'
+SEQUENCE_KEY = 'live_board:sequence'
+HEARTBEAT = 15      # seconds between keep-alive comments on an idle stream
+QUEUE_SIZE = 100    # a client this many events behind is dropped, the browser reconnects and replays from the cache
+
+
+def get_cache():
+    return caches[getattr(settings, 'LIVE_BOARD_CACHE', 'default')]
+
+
+def event_key(sequence):
+    return f'live_board:event:{sequence}'
+
+
+def clock(moment):
+    return date_format(localtime(moment), 'H:i') if moment else None
+
+
+def task_card(task):
+    if task is None:
+        return None
+    return {'project': task.project.name, 'location': task.location, 'work_mode': task.get_work_mode_display(), 'start': clock(task.start)}
+
+
+def workday_card(workday, task=None):
+    """ what the live board shows of a workday, the same dict is rendered on page load and sent in events"""
+    return {
+        'id': workday.id,
+        'employee': f'{workday.employee.first_name} {workday.employee.last_name}',
+        'start': clock(workday.start),
+        'stop': clock(workday.stop),
+        'task': task_card(task),
+    }
+
+
+def publish(kind, data):
+    """
+    Appends an event to the log kept in the cache, every process serving live_events picks it up on its next poll.
+    Events expire after LIVE_BOARD_EVENT_TIMEOUT, a client reconnecting later just reloads the board.
+    """
+    cache = get_cache()
+    cache.add(SEQUENCE_KEY, 0, timeout=None)
+    sequence = cache.incr(SEQUENCE_KEY)
+    cache.set(event_key(sequence), (kind, data), timeout=getattr(settings, 'LIVE_BOARD_EVENT_TIMEOUT', 300))
+    return sequence
+
+
+def format_event(sequence, kind, data):
+    return f'id: {sequence}\nevent: {kind}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+class Broadcaster:
+    """
+    One poller per process reads new events from the cache and copies them to the queue of every open stream,
+    so hundreds of boards cost one cache read per poll interval instead of hundreds of database queries.
+    """
+
+    def __init__(self):
+        self.queues = set()
+        self.sequence = 0
+        self.poller = None
+
+    async def events_between(self, first, last):
+        events = await get_cache().aget_many([event_key(sequence) for sequence in range(first, last + 1)])
+        return [(sequence, *events[event_key(sequence)]) for sequence in range(first, last + 1) if event_key(sequence) in events]
+
+    async def subscribe(self, last_event_id=None):
+        if self.poller is None or self.poller.done():
+            self.sequence = await get_cache().aget(SEQUENCE_KEY, 0)
+            self.poller = asyncio.ensure_future(self.poll())
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        if last_event_id is not None and last_event_id < self.sequence:
+            for event in (await self.events_between(last_event_id + 1, self.sequence))[-QUEUE_SIZE:]:
+                queue.put_nowait(event)
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+
+    async def poll(self):
+        """ stops with the last subscriber, the next one starts it again"""
+        while True:
+            await asyncio.sleep(getattr(settings, 'LIVE_BOARD_POLL_INTERVAL', 1))
+            if not self.queues:
+                break
+            sequence = await get_cache().aget(SEQUENCE_KEY, 0)
+            if sequence > self.sequence:
+                events = await self.events_between(self.sequence + 1, sequence)
+                for queue in list(self.queues):
+                    try:
+                        for event in events:
+                            queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        self.unsubscribe(queue)
+            self.sequence = sequence    # also when the cache was cleared and the sequence started again
+
+
+broadcaster = Broadcaster()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def may_watch(user):
+    """ the live board is for managers, like the rest of the management pages linked from the menu"""
+    return user.is_active and user.is_superuser
+
+
+def session_user(headers):
+    """ user of the Django session whose cookie came with the request, AnonymousUser without a valid one"""
+    cookies = parse_cookie(headers.get(b'cookie', b'').decode('latin-1'))
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+    return get_user(request)
+
+
+async def forbidden(send):
+    await send({'type': 'http.response.start', 'status': 403, 'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': b'Forbidden'})
+
+
+async def live_events(scope, receive, send):
+    """
+    Plain ASGI app streaming the live board events as Server-Sent Events. It runs before Django's middleware,
+    so the session cookie is checked here, with the same rule as LiveBoardView.
+    """
+    headers = dict(scope['headers'])
+    if not may_watch(await sync_to_async(session_user)(headers)):
+        return await forbidden(send)
+    try:
+        last_event_id = int(headers.get(b'last-event-id', b''))
+    except ValueError:
+        last_event_id = None
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')],
+    })
+    queue = await broadcaster.subscribe(last_event_id)
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+        while queue in broadcaster.queues or not queue.empty():
+            event = asyncio.ensure_future(queue.get())
+            done, pending = await asyncio.wait({event, disconnect}, timeout=HEARTBEAT, return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                event.cancel()
+                return
+            if event in done:
+                body = format_event(*event.result())
+            else:
+                event.cancel()
+                body = b': heartbeat\n\n'
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        broadcaster.unsubscribe(queue)
+        disconnect.cancel()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from management.archive import archivable_cutoff, archive_before
+
+
+class Command(BaseCommand):
+    help = "Moves finished workdays and tasks of closed settlement years to the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-years', type=int, default=1, help="closed settlement years kept in the live tables")
+        parser.add_argument('--before', help="YYYY-MM-DD, archive the days before it instead, at most the start of the current settlement year")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        latest = archivable_cutoff(keep_years=0)
+        cutoff = parse_date(options['before']) if options['before'] else archivable_cutoff(keep_years=options['keep_years'])
+        if cutoff is None or cutoff > latest:
+            raise CommandError(f"--before has to be a date not later than {latest}")
+        moved = archive_before(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved['workdays']} workdays and {moved['tasks']} tasks of the days before {cutoff}"))
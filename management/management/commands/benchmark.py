@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from accounts.models import UserCustom
+from management.benchmark import run_benchmark, compare_reports
+from management.synthetic import seed_company
+
+
+class Command(BaseCommand):
+    help = "Seeds a synthetic company into a throwaway test database and benchmarks every url, report is written as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=50)
+        parser.add_argument('--years', type=float, default=1)
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--tasks-per-day', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare', help="previous report, changed query counts and p95 latencies are listed")
+        parser.add_argument('--keepdb', action='store_true', help="keep the test database between runs")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            company = seed_company(employees=options['employees'], years=options['years'], projects=options['projects'],
+                                   tasks_per_day=options['tasks_per_day'], seed=options['seed'])
+            employee = UserCustom.objects.order_by('id').first()
+            report = run_benchmark(employee, repeat=options['repeat'])
+            report['company'] = company
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+
+        for name, route in report['routes'].items():
+            if route['p50_ms'] is None:
+                self.stdout.write(self.style.WARNING(f"{name:<24} {route['status']} not measured"))
+                continue
+            self.stdout.write(f"{name:<24} {route['status']} {route['queries']:>4} q  p50 {route['p50_ms']:>8} ms  p95 {route['p95_ms']:>8} ms  {route['peak_memory_kb']:>9} KB")
+
+        if options['compare']:
+            with open(options['compare']) as previous:
+                changes = compare_reports(json.load(previous), report)
+            for name, field, before, after in changes:
+                self.stdout.write(self.style.WARNING(f"{name} {field}: {before} -> {after}"))
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
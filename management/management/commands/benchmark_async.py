@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from accounts.models import UserCustom
+from management.synthetic import seed_company
+from management.throughput import run_throughput
+
+
+class Command(BaseCommand):
+    help = "Seeds a synthetic company into a throwaway test database and compares the throughput of the sync and async management reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=50)
+        parser.add_argument('--years', type=float, default=1)
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=200, help="requests per report and concurrency level")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+        parser.add_argument('--output', default='benchmark_async.json')
+        parser.add_argument('--keepdb', action='store_true', help="keep the test database between runs")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            company = seed_company(employees=options['employees'], years=options['years'], projects=options['projects'], seed=options['seed'])
+            employee = UserCustom.objects.order_by('id').first()
+            with override_settings(ROOT_URLCONF='management.throughput', ASGI_ROOT_URLCONF=None):
+                results = run_throughput(employee, requests=options['requests'], concurrency=options['concurrency'])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump({'company': company, 'results': results}, output, indent=2)
+
+        for name, levels in results.items():
+            for level, modes in levels.items():
+                for mode, row in modes.items():
+                    self.stdout.write(f"{name:<16} x{level:<4} {mode:<6} {row['requests_per_second']:>8} req/s  p50 {row['p50_ms']:>8} ms  p95 {row['p95_ms']:>8} ms  {row['errors']} errors")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from accounts.models import UserCustom
+from management.sqlite import pragma, run_writes
+
+
+class Command(BaseCommand):
+    help = "Starts workdays from concurrent threads in a throwaway SQLite file and compares writes per second of the default and the SQLITE_TUNING profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200)
+        parser.add_argument('--writers', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--output', default='benchmark_sqlite.json')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError("the default database is not SQLite")
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            # WAL needs a database file, the test database of SQLite is in memory by default
+            connections['default'].settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                employee_ids = [employee.pk for employee in UserCustom.objects.bulk_create([
+                    UserCustom(email=f'pracownik{number}@example.com', first_name='Pracownik', last_name=str(number), mobile_nr='123456789',
+                               pesel='90010112345', holiday_allowance=26, password='!')
+                    for number in range(options['employees'])
+                ])]
+                # default first: journal_mode=wal set by the tuned profile stays in the file
+                for profile, tuning in (('default', False), ('tuned', True)):
+                    with override_settings(SQLITE_TUNING=tuning):
+                        connections.close_all()
+                        results[profile] = {'journal_mode': pragma('default', 'journal_mode')[0]}
+                        for writers in options['writers']:
+                            results[profile][writers] = run_writes(employee_ids, writers, options['seconds'])
+                connections.close_all()
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+
+        for profile, levels in results.items():
+            self.stdout.write(f"{profile} (journal_mode={levels.pop('journal_mode')})")
+            for writers, row in levels.items():
+                self.stdout.write(f"  x{writers:<4} {row['writes_per_second']:>9} writes/s  p50 {row['p50_ms']} ms  p95 {row['p95_ms']} ms  {row['locked']} locked")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
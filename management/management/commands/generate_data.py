@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from management.synthetic import seed_company
+
+
+class Command(BaseCommand):
+    help = "Generates a synthetic company for load testing: employees, years of workdays with absences and night shifts, tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000)
+        parser.add_argument('--years', type=float, default=3)
+        parser.add_argument('--projects', type=int, default=200)
+        parser.add_argument('--tasks-per-day', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-rollups', action='store_true', help="skip rebuilding the rollup tables at the end")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(created):
+            self.stdout.write(f"{created['workdays']} workdays, {created['tasks']} tasks ({time.monotonic() - started:.0f} s)")
+
+        created = seed_company(employees=options['employees'], years=options['years'], projects=options['projects'],
+                               tasks_per_day=options['tasks_per_day'], seed=options['seed'], batch_size=options['batch_size'],
+                               rollups=not options['no_rollups'], progress=progress if options['verbosity'] > 1 else None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created['employees']} employees, {created['projects']} projects, "
+            f"{created['workdays']} workdays and {created['tasks']} tasks in {time.monotonic() - started:.0f} s"
+        ))
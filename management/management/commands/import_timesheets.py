@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from management.rollups import rebuild_rollups
+from management.timesheets import TimesheetImport, TIMESHEET_COLUMNS
+
+
+class Command(BaseCommand):
+    help = f"Imports workdays and tasks from a CSV timesheet, columns: {', '.join(TIMESHEET_COLUMNS)}"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--delimiter', default=';')
+        parser.add_argument('--encoding', default='utf-8-sig')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--no-rollups', action='store_true', help="skip rebuilding the rollup tables at the end")
+
+    def handle(self, *args, **options):
+        try:
+            timesheet = open(options['path'], newline='', encoding=options['encoding'])
+        except OSError as error:
+            raise CommandError(error)
+        with timesheet:
+            result = TimesheetImport(batch_size=options['batch_size']).run(timesheet, delimiter=options['delimiter'])
+
+        for line, message in result.errors:
+            self.stderr.write(f"linia {line}: {message}")
+        if result.workday_count and not options['no_rollups']:
+            rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.workday_count} workdays and {result.task_count} tasks, {len(result.errors)} rows rejected"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from django.utils.timezone import now as utcnow
+
+from management.rollups import workforce_overtime
+
+
+class Command(BaseCommand):
+    help = "Prints overtime of every employee for a settlement period (10-th to 10-th) as CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--day', help="any day of the settlement period, YYYY-MM-DD (default: today)")
+        parser.add_argument('--delimiter', default=';')
+
+    def handle(self, *args, **options):
+        day = utcnow().date()
+        if options['day']:
+            try:
+                day = parse_date(options['day'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError(f"Invalid date: {options['day']}")
+
+        tenth, next_tenth, employees_overtime = workforce_overtime(day)
+        delimiter = options['delimiter']
+
+        self.stderr.write(f"Okres {tenth} - {next_tenth}")
+        self.stdout.write(delimiter.join(['email', 'first_name', 'last_name', 'overtime']))
+        for employee, overtime in employees_overtime:
+            self.stdout.write(delimiter.join([employee.email, employee.first_name, employee.last_name, str(overtime)]))
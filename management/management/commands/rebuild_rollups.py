@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from management.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Builds the day and month rollup tables again from all workdays and tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS("Rollups rebuilt"))
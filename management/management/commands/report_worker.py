@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from management.jobs import claim_job, fail_job, release_job, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = "Computes the reports queued from the management panel in a pool of processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--poll', type=float, default=2, help="seconds between looks at the queue when it is empty")
+        parser.add_argument('--once', action='store_true', help="exit when the queue is empty")
+
+    def start_pool(self, processes):
+        # spawned processes set Django up themselves instead of inheriting the open connections of this one
+        connections.close_all()
+        return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup)
+
+    def restart_pool(self, pool, processes):
+        """ a process killed while computing (e.g. by the OOM killer) breaks the whole pool, later submits would raise"""
+        self.stderr.write(self.style.WARNING("a report process died, starting a new pool"))
+        pool.shutdown(wait=False, cancel_futures=True)
+        return self.start_pool(processes)
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        stale_timeout = getattr(settings, 'REPORT_JOB_STALE_TIMEOUT', 600)
+        pool = self.start_pool(processes)
+        running = {}
+        try:
+            while True:
+                requeued = requeue_stale(stale_timeout)
+                if requeued:
+                    self.stderr.write(self.style.WARNING(f"{requeued} stale jobs queued again"))
+                while len(running) < processes:
+                    job_id = claim_job()
+                    if job_id is None:
+                        break
+                    try:
+                        running[pool.submit(run_job, job_id)] = job_id
+                    except BrokenProcessPool:
+                        release_job(job_id)
+                        pool = self.restart_pool(pool, processes)
+                        break
+                    self.stdout.write(f"job {job_id} started")
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                done, pending = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                broken = any(isinstance(future.exception(), BrokenProcessPool) for future in done)
+                if broken:
+                    # every job of a broken pool ends with it; which one killed the process is unknown, so none is retried
+                    # automatically, a job that runs out of memory would otherwise kill the next pool too
+                    done |= wait(running).done
+                for future in done:
+                    job_id = running.pop(future)
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        fail_job(job_id, "The process computing the report stopped unexpectedly, request the report again.")
+                        self.stdout.write(self.style.ERROR(f"job {job_id} failed, its process died"))
+                    elif future.exception() is None and future.result():
+                        self.stdout.write(self.style.SUCCESS(f"job {job_id} done"))
+                    else:
+                        self.stdout.write(self.style.ERROR(f"job {job_id} failed"))
+                if broken:
+                    pool = self.restart_pool(pool, processes)
+        finally:
+            pool.shutdown()
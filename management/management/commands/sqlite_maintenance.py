@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from management.sqlite import analyze, checkpoint, pragma, vacuum
+
+
+class Command(BaseCommand):
+    help = "SQLite upkeep: ANALYZE for the query planner, WAL checkpoint, VACUUM on request. Without options runs analyze and checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true')
+        parser.add_argument('--checkpoint', action='store_true')
+        parser.add_argument('--vacuum', action='store_true', help="rewrites the whole file, writers wait until it is done")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError(f"database '{using}' is not SQLite")
+        if not (options['analyze'] or options['checkpoint'] or options['vacuum']):
+            options['analyze'] = options['checkpoint'] = True
+
+        if options['analyze']:
+            analyze(using)
+            self.stdout.write("Statistics analyzed")
+        if options['vacuum']:
+            before, after = vacuum(using)
+            self.stdout.write(f"Vacuumed: {before} -> {after} pages")
+        if options['checkpoint']:
+            journal_mode = pragma(using, 'journal_mode')[0]
+            if journal_mode != 'wal':
+                # without a WAL there is nothing to checkpoint, the pragma would report -1 pages
+                self.stdout.write(f"Checkpoint skipped, the database is in {journal_mode} journal mode, not WAL")
+            else:
+                busy, wal_pages, checkpointed = checkpoint(using)
+                if busy:
+                    self.stdout.write(self.style.WARNING("Checkpoint incomplete, a reader or writer was busy"))
+                else:
+                    self.stdout.write(f"Checkpointed {checkpointed} of {wal_pages} WAL pages")
+        self.stdout.write(self.style.SUCCESS("SQLite maintenance done"))
@@ -0,0 +1,197 @@
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import caches
+
+from employee.enums import WorkDayStatus
+from employee.models import WorkhoursRegistry, Task
+
+
+PREFIX = 'kremployee_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SECONDS = 1000000   # float values are kept as integer microseconds, cache.incr only takes integers
+SERIES_COUNT_KEY = 'metrics:series'    # the registry is numbered slots metrics:series:1..count, one series each
+REGISTRY_RECHECK = 60   # seconds a process trusts its own registrations before checking the cache again
+
+# series this process registered, with the time of the last check, so an inc costs no registry round trip
+registered_here = {}
+
+# gauges kept as counters, adjusted by the employee signals and recounted from the database once per timeout
+OPEN_COUNTS = {
+    'open_workdays': lambda: WorkhoursRegistry.objects.filter(status=WorkDayStatus.WORK, stop=None).count(),
+    'open_tasks': lambda: Task.objects.filter(stop=None).count(),
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'METRICS_CACHE', 'default')]
+
+
+def incr(cache, key, delta):
+    if not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:  # evicted between add and incr
+            cache.add(key, delta, timeout=None)
+
+
+def series_key(name, labels):
+    return f'metrics:{name}{format_labels(labels)}'
+
+
+def format_labels(labels, *extra):
+    pairs = (*labels, *extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{label}="{value}"' for label, value in pairs) + '}'
+
+
+def cache_request(cache_name, hit):
+    inc('cache_requests_total', (('cache', cache_name), ('result', 'hit' if hit else 'miss')))
+
+
+def register(cache, series):
+    """
+    series is (kind, name, labels, buckets, scale), the registry lets the exposition find every key.
+    cache.add of a claim key is atomic, so of all processes registering a series only one appends it to a new slot.
+    A process checks its series again after REGISTRY_RECHECK seconds, series dropped by reset_metrics or evicted
+    come back then.
+    """
+    checked = registered_here.get(series)
+    if checked is not None and time.monotonic() - checked < REGISTRY_RECHECK:
+        return
+    if cache.add(f'{series_key(series[1], series[2])}:registered', True, timeout=None):
+        slot = 1 if cache.add(SERIES_COUNT_KEY, 1, timeout=None) else cache.incr(SERIES_COUNT_KEY)
+        cache.set(f'{SERIES_COUNT_KEY}:{slot}', series, timeout=None)
+    registered_here[series] = time.monotonic()
+
+
+def registered_series(cache):
+    slots = [f'{SERIES_COUNT_KEY}:{slot}' for slot in range(1, (cache.get(SERIES_COUNT_KEY) or 0) + 1)]
+    return set(cache.get_many(slots).values()), slots
+
+
+def inc(name, labels=(), value=1, scale=1):
+    cache = get_cache()
+    register(cache, ('counter', name, labels, None, scale))
+    incr(cache, series_key(name, labels), round(value * scale))
+
+
+def observe(name, labels, value, buckets, scale=1):
+    """ histogram buckets are stored non-cumulative, so an observation costs two increments"""
+    cache = get_cache()
+    register(cache, ('histogram', name, labels, buckets, scale))
+    key = series_key(name, labels)
+    incr(cache, f'{key}:bucket:{bisect_left(buckets, value)}', 1)
+    incr(cache, f'{key}:sum', round(value * scale))
+
+
+def unscale(value, scale):
+    return value / scale if scale != 1 else value
+
+
+def collect():
+    """
+    [(kind, name, labels, value)] of every registered series, value of a histogram is
+    (cumulative bucket counts including +Inf, sum), read with one get_many.
+    """
+    cache = get_cache()
+    registered = sorted(registered_series(cache)[0], key=lambda series: (series[1], series[2]))
+    keys = []
+    for kind, name, labels, buckets, scale in registered:
+        key = series_key(name, labels)
+        if kind == 'histogram':
+            keys.extend(f'{key}:bucket:{index}' for index in range(len(buckets) + 1))
+            keys.append(f'{key}:sum')
+        else:
+            keys.append(key)
+    values = cache.get_many(keys)
+
+    samples = []
+    for kind, name, labels, buckets, scale in registered:
+        key = series_key(name, labels)
+        if kind == 'histogram':
+            cumulative, total = [], 0
+            for index in range(len(buckets) + 1):
+                total += values.get(f'{key}:bucket:{index}', 0)
+                cumulative.append(total)
+            samples.append((kind, name, labels, (buckets, cumulative, unscale(values.get(f'{key}:sum', 0), scale))))
+        else:
+            samples.append((kind, name, labels, unscale(values.get(key, 0), scale)))
+    return samples
+
+
+def reset_metrics():
+    cache = get_cache()
+    registered, slots = registered_series(cache)
+    keys = [SERIES_COUNT_KEY, *slots]
+    for kind, name, labels, buckets, scale in registered:
+        key = series_key(name, labels)
+        keys.append(f'{key}:registered')
+        if kind == 'histogram':
+            keys.extend(f'{key}:bucket:{index}' for index in range(len(buckets) + 1))
+            keys.append(f'{key}:sum')
+        else:
+            keys.append(key)
+    cache.delete_many(keys)
+    registered_here.clear()
+
+
+def open_count(name):
+    cache = get_cache()
+    key = f'metrics:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = OPEN_COUNTS[name]()
+        cache.add(key, value, timeout=getattr(settings, 'METRICS_RECOUNT_TIMEOUT', 3600))
+    return value
+
+
+def adjust_open(name, delta):
+    """ a missing counter is left alone, the next scrape counts it from the database"""
+    try:
+        get_cache().incr(f'metrics:{name}', delta)
+    except ValueError:
+        pass
+
+
+def counter_value(name, labels=()):
+    return get_cache().get(series_key(name, labels), 0)
+
+
+def exposition():
+    """ everything in the Prometheus text format, series of one metric are kept together"""
+    lines = []
+    typed = set()
+
+    def header(kind, name):
+        if name not in typed:
+            lines.append(f'# TYPE {PREFIX}{name} {kind}')
+            typed.add(name)
+
+    cache_requests = {}
+    for kind, name, labels, value in collect():
+        header(kind, name)
+        if kind == 'histogram':
+            buckets, cumulative, total = value
+            for bound, count in zip((*buckets, '+Inf'), cumulative):
+                lines.append(f'{PREFIX}{name}_bucket{format_labels(labels, ("le", bound))} {count}')
+            lines.append(f'{PREFIX}{name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{PREFIX}{name}_count{format_labels(labels)} {cumulative[-1]}')
+        else:
+            lines.append(f'{PREFIX}{name}{format_labels(labels)} {value}')
+        if name == 'cache_requests_total':
+            labels = dict(labels)
+            cache_requests.setdefault(labels['cache'], {'hit': 0, 'miss': 0})[labels['result']] = value
+
+    for cache_name, requests in sorted(cache_requests.items()):
+        header('gauge', 'cache_hit_ratio')
+        total = requests['hit'] + requests['miss']
+        lines.append(f'{PREFIX}cache_hit_ratio{format_labels((("cache", cache_name), ))} {round(requests["hit"] / total, 4) if total else 0}')
+
+    for name in OPEN_COUNTS:
+        header('gauge', name)
+        lines.append(f'{PREFIX}{name} {open_count(name)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,27 @@
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """
+    Requests coming through KRemployee.asgi are resolved with ASGI_ROOT_URLCONF, where the reports are async views.
+    Under WSGI an async view runs through async_to_sync and is slower than the sync one, so ROOT_URLCONF keeps those.
+    """
+    def route(request):
+        urlconf = getattr(settings, 'ASGI_ROOT_URLCONF', None)
+        if urlconf and isinstance(request, ASGIRequest):
+            request.urlconf = urlconf
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            route(request)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            route(request)
+            return get_response(request)
+    return middleware
@@ -0,0 +1,132 @@
+# Generated by Django 4.1.1 on 2026-10-18 11:24
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.timezone import localdate
+
+from management.utilities import seconds_to_hours_from_timedelta
+
+
+BATCH_SIZE = 1000
+
+
+def fill_day_rollups(apps, schema_editor):
+    """
+    day rollups of the finished workdays and tasks already in the database, added up in python because
+    work_date and duration_seconds do not exist yet. Month rollups are computed when a report first needs them.
+    """
+    WorkhoursRegistry = apps.get_model('employee', 'WorkhoursRegistry')
+    Task = apps.get_model('employee', 'Task')
+    EmployeeDayRollup = apps.get_model('management', 'EmployeeDayRollup')
+    ProjectDayRollup = apps.get_model('management', 'ProjectDayRollup')
+
+    def summed(rows):
+        sums = defaultdict(lambda: {'count': 0, 'full_hours': 0, 'clock_minutes': 0})
+        for key, start, stop in rows:
+            hours = seconds_to_hours_from_timedelta(stop - start)
+            sums[key]['count'] += 1
+            sums[key]['full_hours'] += hours['full_hours']
+            sums[key]['clock_minutes'] += hours['clock_minutes']
+        return sums
+
+    workdays = WorkhoursRegistry.objects.exclude(stop=None).values_list('employee', 'status', 'start', 'stop').iterator(chunk_size=BATCH_SIZE)
+    employee_days = summed(((employee_id, localdate(start), status), start, stop) for employee_id, status, start, stop in workdays)
+    EmployeeDayRollup.objects.bulk_create((
+        EmployeeDayRollup(employee_id=employee_id, day=day, status=status, workday_count=row['count'],
+                          full_hours=row['full_hours'], clock_minutes=row['clock_minutes'])
+        for (employee_id, day, status), row in employee_days.items()
+    ), batch_size=BATCH_SIZE)
+
+    # a task belongs to the local day its workday started on
+    tasks = Task.objects.exclude(stop=None).values_list('project', 'work_day__employee', 'work_mode', 'work_day__start', 'start', 'stop').iterator(chunk_size=BATCH_SIZE)
+    project_days = summed(((project_id, localdate(workday_start), employee_id, work_mode), start, stop)
+                          for project_id, employee_id, work_mode, workday_start, start, stop in tasks)
+    ProjectDayRollup.objects.bulk_create((
+        ProjectDayRollup(project_id=project_id, day=day, employee_id=employee_id, work_mode=work_mode, task_count=row['count'],
+                         full_hours=row['full_hours'], clock_minutes=row['clock_minutes'])
+        for (project_id, day, employee_id, work_mode), row in project_days.items()
+    ), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employee', '0007_overtimeparameters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDayRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dzień')),
+                ('work_mode', models.CharField(choices=[('HO', 'Home office'), ('F', 'W Firmie'), ('D', 'Delegacja'), ('S', 'Serwis')], max_length=20, verbose_name='Tryb pracy')),
+                ('task_count', models.IntegerField(default=0, verbose_name='Liczba zadań')),
+                ('full_hours', models.IntegerField(default=0, verbose_name='Pełne godziny')),
+                ('clock_minutes', models.IntegerField(default=0, verbose_name='Minuty')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Pracownik')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='employee.projects', verbose_name='Projekt')),
+            ],
+            options={
+                'verbose_name': 'Podsumowanie dnia projektu',
+                'verbose_name_plural': 'Podsumowania dni projektów',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeeMonthRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(verbose_name='Początek okresu')),
+                ('period_stop', models.DateField(verbose_name='Koniec okresu')),
+                ('overtime_after', models.IntegerField(verbose_name='Nadgodziny po')),
+                ('overtime_days', models.IntegerField(verbose_name='Dzien nadgodzin')),
+                ('overtime', models.IntegerField(default=0, verbose_name='Nadgodziny')),
+                ('full_hours', models.IntegerField(default=0, verbose_name='Pełne godziny')),
+                ('clock_minutes', models.IntegerField(default=0, verbose_name='Minuty')),
+                ('work_days', models.IntegerField(default=0, verbose_name='Dni pracy')),
+                ('holiday_days', models.IntegerField(default=0, verbose_name='Dni urlopu')),
+                ('sick_leave_days', models.IntegerField(default=0, verbose_name='Dni choroby')),
+                ('child_care_days', models.IntegerField(default=0, verbose_name='Dni opieki')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Pracownik')),
+            ],
+            options={
+                'verbose_name': 'Podsumowanie okresu pracownika',
+                'verbose_name_plural': 'Podsumowania okresów pracowników',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeeDayRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dzień')),
+                ('status', models.CharField(choices=[('P', 'Praca'), ('U', 'Urlop'), ('C', 'Choroba'), ('O', 'Opieka')], max_length=20, verbose_name='Status')),
+                ('workday_count', models.IntegerField(default=0, verbose_name='Liczba dni pracy')),
+                ('full_hours', models.IntegerField(default=0, verbose_name='Pełne godziny')),
+                ('clock_minutes', models.IntegerField(default=0, verbose_name='Minuty')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Pracownik')),
+            ],
+            options={
+                'verbose_name': 'Podsumowanie dnia pracownika',
+                'verbose_name_plural': 'Podsumowania dni pracowników',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectdayrollup',
+            constraint=models.UniqueConstraint(fields=('project', 'day', 'employee', 'work_mode'), name='unique_project_day_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='employeemonthrollup',
+            constraint=models.UniqueConstraint(fields=('employee', 'period_start'), name='unique_employee_month_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='employeedayrollup',
+            constraint=models.UniqueConstraint(fields=('employee', 'day', 'status'), name='unique_employee_day_rollup'),
+        ),
+        migrations.RunPython(fill_day_rollups, migrations.RunPython.noop),
+    ]
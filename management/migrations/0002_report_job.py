@@ -0,0 +1,42 @@
+# Generated by Django 4.1.1 on 2026-10-18 11:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('overtime', 'Nadgodziny firmy'), ('project_hours', 'Godziny projektu')], max_length=20, verbose_name='Raport')),
+                ('parameters', models.JSONField(default=dict, verbose_name='Parametry')),
+                ('status', models.CharField(choices=[('queued', 'W kolejce'), ('running', 'W trakcie'), ('done', 'Gotowy'), ('failed', 'Błąd')], default='queued', max_length=20, verbose_name='Status')),
+                ('progress', models.IntegerField(default=0, verbose_name='Postęp %')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Zlecono')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='Rozpoczęto')),
+                ('heartbeat', models.DateTimeField(blank=True, null=True, verbose_name='Ostatni postęp')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Zakończono')),
+                ('filename', models.CharField(blank=True, max_length=100, verbose_name='Plik')),
+                ('result', models.TextField(blank=True, verbose_name='Wynik')),
+                ('error', models.TextField(blank=True, verbose_name='Błąd')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Zlecił')),
+            ],
+            options={
+                'verbose_name': 'Raport w tle',
+                'verbose_name_plural': 'Raporty w tle',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(fields=['status', 'created'], name='report_job_queue'),
+        ),
+    ]
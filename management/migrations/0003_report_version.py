@@ -0,0 +1,24 @@
+# Generated by Django 4.1.1 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0002_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Klucz')),
+                ('token', models.CharField(max_length=32, verbose_name='Wersja')),
+            ],
+            options={
+                'verbose_name': 'Wersja raportów',
+                'verbose_name_plural': 'Wersje raportów',
+            },
+        ),
+    ]
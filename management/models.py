@@ -1,3 +1,124 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+from employee.enums import WorkDayStatus, WorkModeStatus
+from management.enums import ReportKind, ReportJobStatus
+
+
+class EmployeeDayRollup(models.Model):
+    """
+    Finished workdays of one employee summed per local day and status.
+    Rows are derived data, refreshed by the receivers in management.signals and rebuilt with `manage.py rebuild_rollups`.
+    """
+    employee = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Pracownik", on_delete=models.CASCADE)
+    day = models.DateField(verbose_name="Dzień")
+    status = models.CharField(verbose_name="Status", choices=WorkDayStatus.choices, max_length=20)
+    workday_count = models.IntegerField(verbose_name="Liczba dni pracy", default=0)
+    full_hours = models.IntegerField(verbose_name="Pełne godziny", default=0)
+    clock_minutes = models.IntegerField(verbose_name="Minuty", default=0)
+
+    class Meta:
+        verbose_name = "Podsumowanie dnia pracownika"
+        verbose_name_plural = "Podsumowania dni pracowników"
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'day', 'status'], name='unique_employee_day_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} {self.day} {self.get_status_display()}"
+
+
+class ProjectDayRollup(models.Model):
+    """ Finished tasks of a project summed per local day, employee and work mode"""
+    project = models.ForeignKey('employee.Projects', verbose_name="Projekt", on_delete=models.CASCADE)
+    day = models.DateField(verbose_name="Dzień")
+    employee = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Pracownik", on_delete=models.CASCADE)
+    work_mode = models.CharField(verbose_name="Tryb pracy", choices=WorkModeStatus.choices, max_length=20)
+    task_count = models.IntegerField(verbose_name="Liczba zadań", default=0)
+    full_hours = models.IntegerField(verbose_name="Pełne godziny", default=0)
+    clock_minutes = models.IntegerField(verbose_name="Minuty", default=0)
+
+    class Meta:
+        verbose_name = "Podsumowanie dnia projektu"
+        verbose_name_plural = "Podsumowania dni projektów"
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'day', 'employee', 'work_mode'], name='unique_project_day_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.project} {self.day} {self.employee}"
+
+
+class EmployeeMonthRollup(models.Model):
+    """
+    One settlement month (10-th to 10-th) of an employee.
+    Overtime depends on OvertimeParameters, so the parameters used are stored with the row
+    and rows computed with other parameters are treated as missing.
+    """
+    employee = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Pracownik", on_delete=models.CASCADE)
+    period_start = models.DateField(verbose_name="Początek okresu")
+    period_stop = models.DateField(verbose_name="Koniec okresu")
+    overtime_after = models.IntegerField(verbose_name="Nadgodziny po")
+    overtime_days = models.IntegerField(verbose_name="Dzien nadgodzin")
+    overtime = models.IntegerField(verbose_name="Nadgodziny", default=0)
+    full_hours = models.IntegerField(verbose_name="Pełne godziny", default=0)
+    clock_minutes = models.IntegerField(verbose_name="Minuty", default=0)
+    work_days = models.IntegerField(verbose_name="Dni pracy", default=0)
+    holiday_days = models.IntegerField(verbose_name="Dni urlopu", default=0)
+    sick_leave_days = models.IntegerField(verbose_name="Dni choroby", default=0)
+    child_care_days = models.IntegerField(verbose_name="Dni opieki", default=0)
+
+    class Meta:
+        verbose_name = "Podsumowanie okresu pracownika"
+        verbose_name_plural = "Podsumowania okresów pracowników"
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'period_start'], name='unique_employee_month_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} {self.period_start} - {self.period_stop}"
+
+
+class ReportVersion(models.Model):
+    """
+    Current token of a piece of data the cached reports read, see management.report_cache.
+    Kept in the database, so a bump made by any process, commands included, retires the reports cached by every process.
+    """
+    key = models.CharField(verbose_name="Klucz", max_length=100, primary_key=True)
+    token = models.CharField(verbose_name="Wersja", max_length=32)
+
+    class Meta:
+        verbose_name = "Wersja raportów"
+        verbose_name_plural = "Wersje raportów"
+
+    def __str__(self):
+        return self.key
+
+
+class ReportJob(models.Model):
+    """
+    A report requested from the management panel and computed by `manage.py report_worker`, see management.jobs.
+    The finished report is kept as CSV text until the job is deleted.
+    """
+    kind = models.CharField(verbose_name="Raport", choices=ReportKind.choices, max_length=20)
+    parameters = models.JSONField(verbose_name="Parametry", default=dict)
+    status = models.CharField(verbose_name="Status", choices=ReportJobStatus.choices, max_length=20, default=ReportJobStatus.QUEUED)
+    progress = models.IntegerField(verbose_name="Postęp %", default=0)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Zlecił", on_delete=models.SET_NULL, null=True, blank=True)
+    created = models.DateTimeField(verbose_name="Zlecono", auto_now_add=True)
+    started = models.DateTimeField(verbose_name="Rozpoczęto", null=True, blank=True)
+    heartbeat = models.DateTimeField(verbose_name="Ostatni postęp", null=True, blank=True)
+    finished = models.DateTimeField(verbose_name="Zakończono", null=True, blank=True)
+    filename = models.CharField(verbose_name="Plik", max_length=100, blank=True)
+    result = models.TextField(verbose_name="Wynik", blank=True)
+    error = models.TextField(verbose_name="Błąd", blank=True)
+
+    class Meta:
+        verbose_name = "Raport w tle"
+        verbose_name_plural = "Raporty w tle"
+        indexes = [
+            models.Index(fields=['status', 'created'], name='report_job_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.created:%Y-%m-%d %H:%M}"
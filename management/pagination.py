@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class KeysetPage:
+    """ page of a seek (keyset) pagination, enough of django Page for the templates"""
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, next_cursor, is_first):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return not self.is_first
+
+
+class KeysetPaginationMixin:
+    """
+    Paginates a FilterView/ListView by seeking on (keyset_field, id) instead of OFFSET,
+    so a deep page costs the same as the first one. Nothing is counted unless ?count=1 is given.
+    MANAGEMENT_PAGINATION = 'pages' in settings switches back to django's numbered pages.
+    Rows of several querysets (see source_querysets) are merged page by page, each queryset is seeked on its own.
+    """
+    keyset_field = 'start'
+    cursor_kwarg = 'after'
+    count_kwarg = 'count'
+
+    def get_paginate_by(self, queryset):
+        return getattr(settings, 'MANAGEMENT_PAGINATE_BY', 50)
+
+    def get_cursor(self):
+        """ cursor is '<iso datetime>_<id>' of the last row of the previous page"""
+        value, _, pk = self.request.GET.get(self.cursor_kwarg, '').rpartition('_')
+        try:
+            return parse_datetime(value), int(pk)
+        except ValueError:
+            return None
+
+    def make_cursor(self, obj):
+        return f'{getattr(obj, self.keyset_field).isoformat()}_{obj.pk}'
+
+    def source_querysets(self, queryset):
+        """ querysets the page is read from, ids have to be unique across them"""
+        return [queryset]
+
+    def keyset(self, obj):
+        return getattr(obj, self.keyset_field), obj.pk
+
+    def paginate_queryset(self, queryset, page_size):
+        if getattr(settings, 'MANAGEMENT_PAGINATION', 'keyset') != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+
+        cursor = self.get_cursor()
+        if not (cursor and cursor[0]):
+            cursor = None
+        rows = []
+        for source in self.source_querysets(queryset):
+            source = source.order_by(self.keyset_field, 'id')
+            if cursor:
+                value, pk = cursor
+                source = source.filter(Q(**{f'{self.keyset_field}__gt': value}) | Q(**{self.keyset_field: value, 'id__gt': pk}))
+            rows.extend(source[:page_size + 1])
+        rows.sort(key=self.keyset)
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = self.make_cursor(rows[-1]) if has_next else None
+        page = KeysetPage(rows, has_next, next_cursor, is_first=cursor is None)
+        return (None, page, rows, has_next or cursor is not None)
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        if self.request.GET.get(self.count_kwarg):
+            context['total_count'] = sum(queryset.count() for queryset in self.source_querysets(self.object_list))
+        return context
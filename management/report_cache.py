@@ -0,0 +1,96 @@
+import hashlib
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from management.metrics import cache_request
+from management.models import ReportVersion
+from management.utilities import periods_containing
+
+
+# every cached report depends on ALL_VERSION, bumped by bulk loads that bypass the model signals
+ALL_VERSION = 'report_version:all'
+PARAMETERS_VERSION = 'report_version:parameters'   # OvertimeParameters
+NAMES_VERSION = 'report_version:names'             # project and employee names shown in the reports
+
+
+def get_cache():
+    return caches[getattr(settings, 'REPORT_CACHE', 'default')]
+
+
+def employee_period_version(employee_id, period_start):
+    return f'report_version:employee:{employee_id}:{period_start}'
+
+
+def project_version(project_id):
+    return f'report_version:project:{project_id}'
+
+
+def workday_versions(employee_id, work_date):
+    return [employee_period_version(employee_id, period_start) for period_start in periods_containing(work_date)]
+
+
+def bump(*version_keys):
+    """
+    Versions are random tokens rather than counters, so reports cached before the rows were restored or flushed
+    can never be served again. The bump is written after the change it follows, in its transaction when there is one:
+    a report computed from the old rows meanwhile is stored under the old token, which nobody reads any more.
+    """
+    ReportVersion.objects.bulk_create(
+        [ReportVersion(key=key, token=uuid4().hex) for key in version_keys], update_conflicts=True, unique_fields=['key'], update_fields=['token'],
+    )
+
+
+def bump_all():
+    bump(ALL_VERSION)
+
+
+def report_key(report, params, versions):
+    digest = hashlib.md5(repr((params, versions)).encode()).hexdigest()
+    return f'report:{report}:{digest}'
+
+
+def current_versions(version_keys):
+    """
+    Tokens of version_keys, read from the primary database also in the replica views, so a bump made by any process
+    is seen at once. Versions never bumped yet are started, ignore_conflicts keeps the token of a concurrent request.
+    """
+    versions = dict(ReportVersion.objects.using(DEFAULT_DB_ALIAS).filter(key__in=version_keys).values_list('key', 'token'))
+    missing = [key for key in version_keys if key not in versions]
+    if missing:
+        ReportVersion.objects.bulk_create([ReportVersion(key=key, token=uuid4().hex) for key in missing], ignore_conflicts=True)
+        versions.update(ReportVersion.objects.using(DEFAULT_DB_ALIAS).filter(key__in=missing).values_list('key', 'token'))
+    return [versions[key] for key in version_keys]
+
+
+def cached_report(report, params, version_keys, compute):
+    """
+    Result of compute(), cached under (report, params, current versions of the data it reads).
+    The versions are read before computing, so a write during the computation stores the result
+    under versions that are already stale instead of serving it later.
+    """
+    cache = get_cache()
+    versions = current_versions((ALL_VERSION, *version_keys))
+    key = report_key(report, params, versions)
+    result = cache.get(key)
+    cache_request('reports', hit=result is not None)
+    if result is None:
+        result = compute()
+        cache.set(key, result, timeout=getattr(settings, 'REPORT_CACHE_TIMEOUT', 24 * 60 * 60))
+    return result
+
+
+async def acached_report(report, params, version_keys, compute):
+    """ cached_report for the async views, compute is a coroutine function"""
+    cache = get_cache()
+    versions = await sync_to_async(current_versions)((ALL_VERSION, *version_keys))
+    key = report_key(report, params, versions)
+    result = await cache.aget(key)
+    await sync_to_async(cache_request)('reports', hit=result is not None)
+    if result is None:
+        result = await compute()
+        await cache.aset(key, result, timeout=getattr(settings, 'REPORT_CACHE_TIMEOUT', 24 * 60 * 60))
+    return result
@@ -0,0 +1,63 @@
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from employee.enums import WorkModeStatus
+from management.models import ProjectDayRollup
+from management.utilities import hours_from_clock_parts
+
+
+# columns the management templates show, used with select_related so each list page costs a fixed number of queries
+WORKDAY_CARD_FIELDS = ('start', 'stop', 'status', 'employee__first_name', 'employee__last_name', 'employee__mobile_nr')
+TASK_CARD_FIELDS = ('start', 'stop', 'location', 'work_mode', 'project__name', 'project__client_company',
+                    'work_day__start', 'work_day__employee__first_name', 'work_day__employee__last_name')
+
+
+def workday_cards(queryset):
+    return queryset.select_related('employee').only(*WORKDAY_CARD_FIELDS)
+
+
+def task_cards(queryset):
+    return queryset.select_related('project', 'work_day__employee').only(*TASK_CARD_FIELDS)
+
+
+def project_tasks(project_id, models):
+    """ finished tasks of the project, one queryset per (workday, task) model pair of management.archive.sources"""
+    return [task_cards(task_model.objects.filter(project=project_id).finished()) for workday_model, task_model in models]
+
+
+def project_hours_querysets(project_id):
+    """ lazy querysets of the sums of the project hours report: the per day rollups and their sums per employee and work mode"""
+    # sums are read from the per day rollup, see management.rollups
+    rollups = ProjectDayRollup.objects.filter(project=project_id).order_by()
+    employee_rows = rollups.values('employee', 'employee__first_name', 'employee__last_name').annotate(full_hours_sum=Sum('full_hours'), clock_minutes_sum=Sum('clock_minutes')).order_by('employee')
+    work_mode_rows = rollups.values('work_mode').annotate(full_hours_sum=Sum('full_hours'), clock_minutes_sum=Sum('clock_minutes')).order_by('work_mode')
+    return rollups, employee_rows, work_mode_rows
+
+
+ROLLUP_TOTALS = {'full_hours': Coalesce(Sum('full_hours'), 0), 'clock_minutes': Coalesce(Sum('clock_minutes'), 0)}
+
+
+def project_hours_context(totals, employee_rows, work_mode_rows):
+    return {
+        'hours': hours_from_clock_parts(totals['full_hours'], totals['clock_minutes']),
+        'employee_hours': [
+            {'employee': f"{row['employee__first_name']} {row['employee__last_name']}",
+             'hours': hours_from_clock_parts(row['full_hours_sum'], row['clock_minutes_sum'])}
+            for row in employee_rows
+        ],
+        'work_mode_hours': [
+            {'work_mode': WorkModeStatus(row['work_mode']).label,
+             'hours': hours_from_clock_parts(row['full_hours_sum'], row['clock_minutes_sum'])}
+            for row in work_mode_rows
+        ],
+    }
+
+
+def project_hours_data(project_id):
+    rollups, employee_rows, work_mode_rows = project_hours_querysets(project_id)
+    return project_hours_context(rollups.aggregate(**ROLLUP_TOTALS), employee_rows, work_mode_rows)
+
+
+async def aproject_hours_data(project_id):
+    rollups, employee_rows, work_mode_rows = project_hours_querysets(project_id)
+    return project_hours_context(await rollups.aaggregate(**ROLLUP_TOTALS), [row async for row in employee_rows], [row async for row in work_mode_rows])
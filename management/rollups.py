@@ -0,0 +1,185 @@
+import heapq
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils.timezone import localdate, now as utcnow
+
+from accounts.models import UserCustom
+from employee.enums import WorkDayStatus
+from employee.models import OvertimeParameters
+from management.archive import task_models, workday_models
+from management.models import EmployeeDayRollup, ProjectDayRollup, EmployeeMonthRollup
+from management.report_cache import bump_all
+from management.routers import reading_from
+from management.utilities import periods_containing, settlement_period
+
+
+STATUS_DAYS_FIELDS = {
+    WorkDayStatus.WORK: 'work_days',
+    WorkDayStatus.HOLIDAY: 'holiday_days',
+    WorkDayStatus.SICK_LEAVE: 'sick_leave_days',
+    WorkDayStatus.CHILD_CARE: 'child_care_days',
+}
+
+
+def summed_rows(querysets, *fields):
+    """
+    rows of the same grouped query over the live and archive tables added up per value of fields,
+    the querysets are ordered by fields so they are merged as streams
+    """
+    def key(row):
+        return tuple(row[field] for field in fields)
+
+    for _, rows in groupby(heapq.merge(*querysets, key=key), key=key):
+        row, *rest = rows
+        for other in rest:
+            for name, value in other.items():
+                if name not in fields:
+                    row[name] += value
+        yield row
+
+
+# the functions writing rollups read from the primary even when called from a replica view, a rollup computed
+# from lagging rows would stay wrong until the next edit of its day
+
+
+@reading_from(None)
+def refresh_employee_day(employee_id, day):
+    rows = summed_rows((
+        model.objects.filter(employee=employee_id).worked_between(day, day).duration_breakdown('status').annotate(workday_count=Count('id'))
+        for model in workday_models(day)
+    ), 'status')
+    with transaction.atomic():
+        EmployeeDayRollup.objects.filter(employee=employee_id, day=day).delete()
+        EmployeeDayRollup.objects.bulk_create([
+            EmployeeDayRollup(employee_id=employee_id, day=day, status=row['status'], workday_count=row['workday_count'],
+                              full_hours=row['full_hours_sum'], clock_minutes=row['clock_minutes_sum'])
+            for row in rows
+        ])
+
+
+@reading_from(None)
+def refresh_project_day(project_id, day):
+    rows = summed_rows((
+        model.objects.filter(project=project_id).worked_between(day, day).duration_breakdown('work_day__employee', 'work_mode').annotate(task_count=Count('id'))
+        for model in task_models(day)
+    ), 'work_day__employee', 'work_mode')
+    with transaction.atomic():
+        ProjectDayRollup.objects.filter(project=project_id, day=day).delete()
+        ProjectDayRollup.objects.bulk_create([
+            ProjectDayRollup(project_id=project_id, day=day, employee_id=row['work_day__employee'], work_mode=row['work_mode'],
+                             task_count=row['task_count'], full_hours=row['full_hours_sum'], clock_minutes=row['clock_minutes_sum'])
+            for row in rows
+        ])
+
+
+@reading_from(None)
+def refresh_employee_months(employee_ids, period_start):
+    """ recomputes one settlement period for many employees with a few grouped queries, returns {employee_id: rollup}"""
+    tenth, next_tenth = settlement_period(period_start)
+    parameters = OvertimeParameters.objects.last()
+    if parameters is None:
+        return {}
+    rollups = {
+        employee_id: EmployeeMonthRollup(employee_id=employee_id, period_start=tenth, period_stop=next_tenth,
+                                         overtime_after=parameters.overtime_after, overtime_days=parameters.overtime_days)
+        for employee_id in employee_ids
+    }
+    # a period is added up from both tables while it reaches into the archive
+    for model in workday_models(tenth):
+        workdays = model.objects.filter(employee__in=employee_ids).worked_between(tenth, next_tenth)
+        work = workdays.filter(status=WorkDayStatus.WORK)
+        for employee_id, overtime in work.overtime_per_employee(parameters.overtime_after, parameters.overtime_days).items():
+            rollups[employee_id].overtime += overtime
+        for row in work.duration_breakdown('employee'):
+            rollups[row['employee']].full_hours += row['full_hours_sum']
+            rollups[row['employee']].clock_minutes += row['clock_minutes_sum']
+        for row in workdays.finished().order_by().values('employee', 'status').annotate(days=Count('id')):
+            rollup, field = rollups[row['employee']], STATUS_DAYS_FIELDS[row['status']]
+            setattr(rollup, field, getattr(rollup, field) + row['days'])
+
+    with transaction.atomic():
+        EmployeeMonthRollup.objects.filter(employee__in=employee_ids, period_start=tenth).delete()
+        EmployeeMonthRollup.objects.bulk_create(rollups.values())
+    return rollups
+
+
+def month_rollups(employee_ids, day):
+    """
+    {employee_id: EmployeeMonthRollup} for the settlement period of day.
+    Rows that are missing or were computed with other OvertimeParameters are recomputed on the way.
+    """
+    tenth, next_tenth = settlement_period(day)
+    parameters = OvertimeParameters.objects.last()
+    rollups = EmployeeMonthRollup.objects.filter(employee__in=employee_ids, period_start=tenth,
+                                                 overtime_after=parameters.overtime_after, overtime_days=parameters.overtime_days)
+    rollups = {rollup.employee_id: rollup for rollup in rollups}
+    missing = [employee_id for employee_id in employee_ids if employee_id not in rollups]
+    if missing:
+        rollups.update(refresh_employee_months(missing, tenth))
+    return rollups
+
+
+def workforce_overtime(day, progress=None, chunk_size=500):
+    """
+    overtime of every employee for the settlement period of the given day, read from EmployeeMonthRollup,
+    progress(done, total) is called after every chunk of employees
+    """
+    tenth, next_tenth = settlement_period(day)
+    employees = list(UserCustom.objects.filter(
+        Q(is_active=True) | Q(employeemonthrollup__period_start=tenth, employeemonthrollup__overtime__gt=0)
+    ).distinct().order_by('last_name', 'first_name'))
+    rollups = {}
+    for index in range(0, len(employees), chunk_size):
+        rollups.update(month_rollups([employee.pk for employee in employees[index:index + chunk_size]], day))
+        if progress:
+            progress(min(index + chunk_size, len(employees)), len(employees))
+    employees_overtime = [(employee, rollups[employee.pk].overtime) for employee in employees]
+    return tenth, next_tenth, employees_overtime
+
+
+def refresh_employee(employee_id, day):
+    """ day rollups of the employee and the settlement periods holding day, after a workday of that day changed"""
+    refresh_employee_day(employee_id, day)
+    for period_start in periods_containing(day):
+        refresh_employee_months([employee_id], period_start)
+
+
+@reading_from(None)
+def rebuild_rollups(batch_size=1000):
+    """ drops every rollup row and builds them again from WorkhoursRegistry and Task, and their archive tables"""
+    employee_days = summed_rows((
+        model.objects.annotate(day=F('work_date')).duration_breakdown('employee', 'day', 'status').annotate(workday_count=Count('id')).iterator()
+        for model in workday_models()
+    ), 'employee', 'day', 'status')
+    project_days = summed_rows((
+        model.objects.annotate(day=F('work_date')).duration_breakdown('project', 'day', 'work_day__employee', 'work_mode').annotate(task_count=Count('id')).iterator()
+        for model in task_models()
+    ), 'project', 'day', 'work_day__employee', 'work_mode')
+
+    with transaction.atomic():
+        transaction.on_commit(bump_all)     # cached reports were computed from the old rows
+        EmployeeDayRollup.objects.all().delete()
+        ProjectDayRollup.objects.all().delete()
+        EmployeeMonthRollup.objects.all().delete()
+
+        EmployeeDayRollup.objects.bulk_create((
+            EmployeeDayRollup(employee_id=row['employee'], day=row['day'], status=row['status'], workday_count=row['workday_count'],
+                              full_hours=row['full_hours_sum'], clock_minutes=row['clock_minutes_sum'])
+            for row in employee_days
+        ), batch_size=batch_size)
+        ProjectDayRollup.objects.bulk_create((
+            ProjectDayRollup(project_id=row['project'], day=row['day'], employee_id=row['work_day__employee'], work_mode=row['work_mode'],
+                             task_count=row['task_count'], full_hours=row['full_hours_sum'], clock_minutes=row['clock_minutes_sum'])
+            for row in project_days
+        ), batch_size=batch_size)
+
+        first_day = min(filter(None, (model.objects.aggregate(first=Min('work_date'))['first'] for model in workday_models())), default=None)
+        if first_day is None or OvertimeParameters.objects.last() is None:
+            return
+        employee_ids = list({employee_id for model in workday_models() for employee_id in model.objects.order_by().values_list('employee', flat=True).distinct()})
+        period_start, last_period_start = settlement_period(first_day)[0], settlement_period(localdate(utcnow()))[0]
+        while period_start <= last_period_start:
+            refresh_employee_months(employee_ids, period_start)
+            period_start = settlement_period(period_start)[1]
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+
+PIN_COOKIE = 'replica_pinned'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# alias the reads of the current request go to, None outside the replica views
+read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_alias():
+    """ settings.REPLICA_DATABASE when it names a configured database, otherwise None"""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def reading_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads made while a ReplicaReadMixin view runs go to REPLICA_DATABASE, every other read and all writes
+    go to default. The replica is filled by replication (or is a copy of the database file), never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True     # both databases hold the same rows
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db != DEFAULT_DB_ALIAS and db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware(MiddlewareMixin):
+    """
+    After a request that may have written (POST, PUT, DELETE...) the browser gets a cookie keeping its reads
+    on the primary for REPLICA_PIN_SECONDS, so users see their own changes however far the replica lags.
+    """
+
+    def __init__(self, get_response):
+        if replica_alias() is None:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10), httponly=True, samesite='Lax')
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Read-only views whose queries, template rendering included, go to the replica unless the request is pinned.
+    Reports cached in management.report_cache may be computed from rows as old as the replication lag.
+    """
+
+    def replica_for(self, request):
+        alias = replica_alias()
+        if alias is None or request.COOKIES.get(PIN_COOKIE):
+            return None
+        return alias
+
+    def dispatch(self, request, *args, **kwargs):
+        alias = self.replica_for(request)
+        if alias is None:
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.adispatch_on(alias, request, *args, **kwargs)
+        with reading_from(alias):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()   # lazy querysets of the context are evaluated by the template
+        return response
+
+    async def adispatch_on(self, alias, request, *args, **kwargs):
+        with reading_from(alias):
+            response = await super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                await sync_to_async(response.render)()
+        return response
@@ -0,0 +1,181 @@
+from functools import wraps
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import UserCustom
+from employee.models import Projects, Task, WorkhoursRegistry, OvertimeParameters
+from employee.signals import workday_started, workday_ended, task_started, task_ended
+from employee.workday_state import forget_workday_state
+from management.archive import archiving
+from management.choices import invalidate_choices
+from management.live import publish, workday_card, task_card
+from management.metrics import adjust_open
+from management.rollups import refresh_employee, refresh_project_day
+from management.report_cache import NAMES_VERSION, PARAMETERS_VERSION, bump, project_version, workday_versions
+from management.sqlite import apply_pragmas
+
+
+def task_employee_id(task):
+    """ employee of the task's workday, None when the task goes with its deleted workday; looked up once for all receivers"""
+    if Task.work_day.is_cached(task):
+        return task.work_day.employee_id
+    work_day_id, employee_id = getattr(task, '_workday_employee', (None, None))
+    if work_day_id != task.work_day_id:
+        employee_id = WorkhoursRegistry.objects.filter(pk=task.work_day_id).values_list('employee', flat=True).first()
+        task._workday_employee = (task.work_day_id, employee_id)
+    return employee_id
+
+
+def unless_archiving(function):
+    """ receivers of the live workdays and tasks ignore the rows archive_before moves, see its docstring"""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not archiving.get():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    apply_pragmas(connection)
+
+
+@receiver([post_save, post_delete], sender=Projects)
+@receiver([post_save, post_delete], sender=Task)
+@unless_archiving
+def refresh_filter_choices(sender, **kwargs):
+    invalidate_choices(sender)
+
+
+@receiver(workday_started)
+def count_started_workday(sender, **kwargs):
+    adjust_open('open_workdays', 1)
+
+
+@receiver(workday_ended)
+def count_ended_workday(sender, **kwargs):
+    adjust_open('open_workdays', -1)
+
+
+@receiver(task_started)
+def count_started_task(sender, **kwargs):
+    adjust_open('open_tasks', 1)
+
+
+@receiver(task_ended)
+def count_ended_task(sender, **kwargs):
+    adjust_open('open_tasks', -1)
+
+
+@receiver([workday_started, workday_ended])
+def push_workday(sender, workday, **kwargs):
+    card = workday_card(workday)
+    transaction.on_commit(lambda: publish('workday', card))
+
+
+@receiver(task_started)
+def push_started_task(sender, task, **kwargs):
+    card = task_card(task)
+    transaction.on_commit(lambda: publish('task', {'work_day': task.work_day_id, 'task': card}))
+
+
+@receiver(task_ended)
+def push_ended_task(sender, task, **kwargs):
+    transaction.on_commit(lambda: publish('task', {'work_day': task.work_day_id, 'task': None}))
+
+
+@receiver([post_save, post_delete], sender=WorkhoursRegistry)
+@unless_archiving
+def forget_workday_owner_state(sender, instance, **kwargs):
+    forget_workday_state(instance.employee_id)
+
+
+@receiver([post_save, post_delete], sender=Task)
+@unless_archiving
+def forget_task_owner_state(sender, instance, **kwargs):
+    employee_id = task_employee_id(instance)
+    if employee_id:
+        forget_workday_state(employee_id)
+
+
+@receiver(pre_save, sender=WorkhoursRegistry)
+def remember_workday_day(sender, instance, **kwargs):
+    """ a workday moved to another day or employee changes the rollups of both"""
+    if not instance._state.adding:
+        instance._previous_day = WorkhoursRegistry.objects.filter(pk=instance.pk).values_list('employee', 'work_date').first()
+
+
+@receiver([post_save, post_delete], sender=WorkhoursRegistry)
+@unless_archiving
+def refresh_workday_rollups(sender, instance, created=False, **kwargs):
+    """ rollups follow every save and delete, the employee views, the admin panel and the shell alike"""
+    if created and instance.stop is None:
+        return  # open workdays are not summed yet
+    day = (instance.employee_id, instance.work_date)
+    previous_day = getattr(instance, '_previous_day', None) or day
+    for employee_id, work_date in {day, previous_day}:
+        refresh_employee(employee_id, work_date)
+    if previous_day != day:     # the tasks moved along, see WorkhoursRegistry.save
+        for project_id in set(instance.task_set.finished().values_list('project', flat=True)):
+            for work_date in {previous_day[1], day[1]}:
+                refresh_project_day(project_id, work_date)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_project(sender, instance, **kwargs):
+    """ a task moved to another project or workday changes the rollups and reports of both places"""
+    if not instance._state.adding:
+        instance._previous_place = Task.objects.filter(pk=instance.pk).values_list('project', 'work_date', 'work_day__employee').first()
+
+
+def task_places(instance, employee_id=None):
+    """ {(project_id, work_date, employee_id)} of the task now and before its last save"""
+    place = (instance.project_id, instance.work_date, employee_id)
+    return {place, getattr(instance, '_previous_place', None) or place}
+
+
+@receiver([post_save, post_delete], sender=Task)
+@unless_archiving
+def refresh_task_rollups(sender, instance, created=False, **kwargs):
+    if created and instance.stop is None:
+        return
+    for project_id, work_date in {(project_id, work_date) for project_id, work_date, employee_id in task_places(instance)}:
+        refresh_project_day(project_id, work_date)
+
+
+@receiver([post_save, post_delete], sender=WorkhoursRegistry)
+@unless_archiving
+def bump_workday_reports(sender, instance, **kwargs):
+    day = (instance.employee_id, instance.work_date)
+    previous_day = getattr(instance, '_previous_day', None) or day
+    versions = {version for employee_id, work_date in {day, previous_day} for version in workday_versions(employee_id, work_date)}
+    if previous_day != day:
+        versions.update(project_version(project_id) for project_id in instance.task_set.values_list('project', flat=True).distinct())
+    bump(*versions)
+
+
+@receiver([post_save, post_delete], sender=Task)
+@unless_archiving
+def bump_task_reports(sender, instance, **kwargs):
+    versions = set()
+    for project_id, work_date, employee_id in task_places(instance, task_employee_id(instance)):
+        versions.add(project_version(project_id))
+        if employee_id:
+            versions.update(workday_versions(employee_id, work_date))
+    bump(*versions)
+
+
+@receiver([post_save, post_delete], sender=OvertimeParameters)
+def bump_overtime_parameters(sender, **kwargs):
+    bump(PARAMETERS_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Projects)
+@receiver([post_save, post_delete], sender=UserCustom)
+def bump_report_names(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login', 'password'}:
+        return  # every login saves the user
+    bump(NAMES_VERSION)
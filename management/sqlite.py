@@ -0,0 +1,91 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.utils.timezone import now as utcnow
+
+from employee.models import WorkhoursRegistry
+from management.benchmark import percentile
+
+
+def apply_pragmas(connection):
+    """ SQLITE_PRAGMAS on a new SQLite connection when SQLITE_TUNING is on, journal_mode=wal stays in the database file"""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def pragma(using, name):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()
+
+
+def analyze(using='default'):
+    """ refreshes the statistics the query planner picks indexes by"""
+    with connections[using].cursor() as cursor:
+        cursor.execute('ANALYZE')
+        cursor.execute('PRAGMA optimize')
+
+
+def vacuum(using='default'):
+    """ rebuilds the database file without free pages, returns (pages before, pages after); blocks every writer meanwhile"""
+    before = pragma(using, 'page_count')[0]
+    with connections[using].cursor() as cursor:
+        cursor.execute('VACUUM')
+    return before, pragma(using, 'page_count')[0]
+
+
+def checkpoint(using='default'):
+    """ copies the WAL back into the database file and truncates it, returns (busy, wal pages, checkpointed pages)"""
+    return pragma(using, 'wal_checkpoint(TRUNCATE)')
+
+
+def start_workday(employee_id):
+    """ what CreateWorkDayView does at the start of a shift: look for an open workday, then insert one"""
+    WorkhoursRegistry.objects.filter(employee=employee_id, stop=None).exists()
+    WorkhoursRegistry.objects.create(employee_id=employee_id, start=utcnow())
+
+
+def run_writes(employee_ids, writers, seconds):
+    """
+    `writers` threads start workdays for `seconds`, each with its own connection like the threads of a WSGI server.
+    Returns writes per second, latency percentiles and the number of writes that failed with "database is locked".
+    """
+    timings, locked = [], []
+    deadline = time.perf_counter() + seconds
+
+    def writer(number):
+        try:
+            count = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    start_workday(employee_ids[(number + count * writers) % len(employee_ids)])
+                except OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    locked.append(error)
+                else:
+                    timings.append(time.perf_counter() - started)
+                count += 1
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=writer, args=(number, )) for number in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'writes': len(timings),
+        'locked': len(locked),
+        'writes_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50) * 1000, 2) if timings else None,
+        'p95_ms': round(percentile(timings, 95) * 1000, 2) if timings else None,
+    }
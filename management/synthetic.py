@@ -0,0 +1,118 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.timezone import localdate, make_aware, now as utcnow
+
+from accounts.models import UserCustom
+from employee.enums import WorkDayStatus, WorkModeStatus
+from employee.managers import seconds_between
+from employee.models import WorkhoursRegistry, Task, Projects, OvertimeParameters
+from management.report_cache import bump_all
+from management.rollups import rebuild_rollups
+
+
+CITIES = ('Opole', 'Wrocław', 'Katowice', 'Kraków', 'Poznań', 'Łódź')
+# chance that a weekday is reported as the given absence instead of work
+ABSENCE_RATES = ((WorkDayStatus.HOLIDAY, 0.08), (WorkDayStatus.SICK_LEAVE, 0.03), (WorkDayStatus.CHILD_CARE, 0.01))
+NIGHT_SHIFT_RATE = 0.1
+SATURDAY_RATE = 0.1
+
+
+def employee_history(rng, employee, days, project_list, tasks_per_day):
+    """ yields (workday, tasks) of one employee, absences have no tasks and night shifts end on the next day"""
+    for day in days:
+        weekday = day.isoweekday()
+        if weekday == 7 or (weekday == 6 and rng.random() > SATURDAY_RATE):
+            continue
+
+        chance = rng.random()
+        status = None
+        for absence, rate in ABSENCE_RATES:
+            if chance < rate:
+                status = absence
+                break
+            chance -= rate
+        if status:
+            start = make_aware(datetime.combine(day, time(8)))
+            yield WorkhoursRegistry(employee_id=employee.pk, status=status, start=start, stop=start, work_date=day, duration_seconds=0), []
+            continue
+
+        if rng.random() < NIGHT_SHIFT_RATE:
+            start = make_aware(datetime.combine(day, time(21))) + timedelta(minutes=rng.randrange(0, 120))
+        else:
+            start = make_aware(datetime.combine(day, time(6))) + timedelta(minutes=rng.randrange(0, 180))
+        stop = start + timedelta(minutes=rng.randrange(360, 660))
+        workday = WorkhoursRegistry(employee_id=employee.pk, start=start, stop=stop, work_date=day, duration_seconds=seconds_between(start, stop))
+        yield workday, list(workday_tasks(rng, workday, project_list, tasks_per_day))
+
+    start = utcnow() - timedelta(minutes=rng.randrange(30, 240))
+    workday = WorkhoursRegistry(employee_id=employee.pk, start=start, work_date=localdate(start))
+    yield workday, list(workday_tasks(rng, workday, project_list, tasks_per_day))
+
+
+def workday_tasks(rng, workday, project_list, tasks_per_day):
+    """ splits the workday into a few consecutive tasks, the last one stays open while the workday is"""
+    stop = workday.stop or utcnow()
+    count = rng.randint(max(tasks_per_day - 1, 1), tasks_per_day + 1)
+    cuts = sorted(rng.random() for _ in range(count - 1))
+    bounds = [workday.start] + [workday.start + (stop - workday.start) * cut for cut in cuts] + [stop]
+    for number in range(count):
+        project = rng.choice(project_list)
+        task_stop = bounds[number + 1] if workday.stop or number < count - 1 else None
+        # work_day_id is filled by bulk_create once the workday got its primary key
+        yield Task(start=bounds[number], stop=task_stop, location=project.location, project_id=project.pk,
+                   work_mode=rng.choice(WorkModeStatus.values), work_day=workday, work_date=workday.work_date,
+                   duration_seconds=seconds_between(bounds[number], task_stop))
+
+
+def seed_company(employees=20, years=1, projects=10, tasks_per_day=3, seed=0, batch_size=1000, rollups=True, progress=None):
+    """
+    Fills the database with a synthetic company: `years` of history for every employee with absences,
+    saturdays and night shifts crossing midnight, several tasks per workday, and an unfinished workday
+    with an open task today. Each employee draws from its own generator seeded with (seed, employee number),
+    so the same seed gives the same data whatever the batch size.
+    Rows are written with bulk_create, each transaction holds about `batch_size` workdays and their tasks.
+    """
+    rng = random.Random(seed)
+    password = make_password('synthetic')
+    if not OvertimeParameters.objects.exists():
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+
+    project_list = Projects.objects.bulk_create([
+        Projects(name=f'Projekt {number}', client_company=f'Klient {number % 7}', location=rng.choice(CITIES))
+        for number in range(projects)
+    ])
+    first = UserCustom.objects.count()
+    employee_list = UserCustom.objects.bulk_create([
+        UserCustom(email=f'pracownik{number}@example.com', first_name='Pracownik', last_name=str(number), mobile_nr='123456789',
+                   pesel='90010112345', holiday_allowance=26, is_staff=True, password=password)
+        for number in range(first, first + employees)
+    ], batch_size=batch_size)
+
+    today = localdate()
+    days = [today - timedelta(days=offset) for offset in range(round(365 * years), 0, -1)]
+    created = {'employees': len(employee_list), 'projects': len(project_list), 'workdays': 0, 'tasks': 0}
+    employees_per_batch = max(batch_size // max(len(days), 1), 1)
+
+    for index in range(0, len(employee_list), employees_per_batch):
+        workdays, tasks = [], []
+        for employee in employee_list[index:index + employees_per_batch]:
+            employee_rng = random.Random(f'{seed}:{employee.last_name}')
+            for workday, workday_tasks_list in employee_history(employee_rng, employee, days, project_list, tasks_per_day):
+                workdays.append(workday)
+                tasks.extend(workday_tasks_list)
+        with transaction.atomic():
+            WorkhoursRegistry.objects.bulk_create(workdays, batch_size=batch_size)
+            Task.objects.bulk_create(tasks, batch_size=batch_size)
+
+        created['workdays'] += len(workdays)
+        created['tasks'] += len(tasks)
+        if progress:
+            progress(created)
+
+    bump_all()
+    if rollups:
+        rebuild_rollups(batch_size=batch_size)
+    return created
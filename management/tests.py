@@ -1,3 +1,1002 @@
-from django.test import TestCase
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+from unittest.mock import patch
+from urllib.parse import quote
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localtime, now as utcnow
+
+from accounts.models import UserCustom
+from employee.enums import WorkDayStatus, WorkModeStatus
+from employee.models import WorkhoursRegistry, Task, TaskArchive, Projects, OvertimeParameters
+from management.archive import archivable_cutoff, archive_before
+from management.benchmark import benchmark_routes, manager_routes, run_benchmark, compare_reports
+from management.enums import ReportKind, ReportJobStatus
+from management.jobs import claim_job, requeue_stale, run_job
+from management.models import EmployeeDayRollup, EmployeeMonthRollup, ProjectDayRollup, ReportJob
+from management.rollups import month_rollups, rebuild_rollups
+from management.routers import PIN_COOKIE, ReplicaRouter, reading_from
+from management.instrumentation import QueryRecorder
+from management.live import LIVE_EVENTS_PATH, broadcaster, live_events, publish
+from management.metrics import get_cache as get_metrics_cache, reset_metrics
+from management.synthetic import seed_company
+from management.throughput import REPORTS, report_url
+from management.timesheets import TimesheetImport
+from management.reports import project_hours_data
+from management.utilities import seconds_to_hours_from_timedelta, settlement_period
+from management.views import OvertimeView, AsyncOvertimeView
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ManagementTestCase(TestCase):
+    """ base of the management tests: fast password hashing and the employee fixture"""
+
+    @staticmethod
+    def create_employee(email='jan@example.com', first_name='Jan', last_name='Kowalski'):
+        return UserCustom.objects.create_user(email, first_name, last_name, '123456789', '90010112345', 'haslo')
+
+
+# REPORT_CACHE_TIMEOUT=0 counts the queries of computing the reports, ReportCacheTest covers the cache
+@override_settings(REPORT_CACHE_TIMEOUT=0)
+class ManagementQueryCountTest(ManagementTestCase):
+    """ every management page costs the same number of queries no matter how many rows it shows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        cls.employee = cls.create_employee()
+
+    def add_workdays(self, count):
+        """ each new employee gets a finished workday with two tasks and an absence yesterday"""
+        workday = None
+        first = UserCustom.objects.count()
+        for number in range(first, first + count):
+            employee = self.create_employee(f'pracownik{number}@example.com', 'Pracownik', str(number))
+            start = utcnow() - timedelta(hours=9)
+            workday = WorkhoursRegistry.objects.create(employee=employee, start=start, stop=start + timedelta(hours=9))
+            WorkhoursRegistry.objects.create(employee=employee, start=start - timedelta(days=1), stop=start - timedelta(days=1), status=WorkDayStatus.HOLIDAY)
+            for hour in range(2):
+                Task.objects.create(start=start + timedelta(hours=hour), stop=start + timedelta(hours=hour + 1), location='Opole',
+                                    project=self.project, work_mode=WorkModeStatus.ON_SITE, work_day=workday)
+        return workday
+
+    def assertConstantQueries(self, url_for, expected):
+        workday = self.add_workdays(2)
+        self.client.get(url_for(workday))   # fills lazily computed rollups
+        with self.assertNumQueries(expected):
+            response = self.client.get(url_for(workday))
+        self.assertEqual(response.status_code, 200)
+
+        workday = self.add_workdays(5)
+        self.client.get(url_for(workday))
+        with self.assertNumQueries(expected):
+            self.client.get(url_for(workday))
+
+    def test_today_info(self):
+        self.assertConstantQueries(lambda workday: reverse('today_info'), 2)
+
+    def test_today_project(self):
+        self.assertConstantQueries(lambda workday: reverse('today_project'), 2)
+
+    def test_task_list(self):
+        self.assertConstantQueries(lambda workday: reverse('tasklist', args=(workday.id, )), 1)
+
+    def test_project_hours(self):
+        self.assertConstantQueries(lambda workday: reverse('project_hours', args=(self.project.id, )), 6)
+
+    def test_overtime(self):
+        self.assertConstantQueries(lambda workday: reverse('overtime', args=(workday.employee_id, )), 7)
+
+    def test_workday_filter(self):
+        self.assertConstantQueries(lambda workday: reverse('workdayfilter'), 3)
+
+    def test_task_filter(self):
+        self.assertConstantQueries(lambda workday: reverse('taskfilter'), 3)
+
+    def test_project_filter(self):
+        self.assertConstantQueries(lambda workday: reverse('projectfilter'), 2)
+
+    def test_worker_filter(self):
+        self.assertConstantQueries(lambda workday: reverse('workerfilter'), 2)
+
+
+class RollupMaintenanceTest(ManagementTestCase):
+    """ rollups follow saves and deletes made anywhere, the admin panel and the shell included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        cls.employee = cls.create_employee()
+        start = utcnow() - timedelta(days=40)
+        cls.workday = WorkhoursRegistry.objects.create(employee=cls.employee, start=start, stop=start + timedelta(hours=10))
+        cls.task = Task.objects.create(start=start, stop=start + timedelta(hours=10), location='Opole', project=cls.project,
+                                       work_mode=WorkModeStatus.ON_SITE, work_day=cls.workday)
+
+    def overtime(self):
+        return EmployeeMonthRollup.objects.get(employee=self.employee, period_start=settlement_period(self.workday.work_date)[0]).overtime
+
+    def test_edits_and_deletes(self):
+        self.assertEqual(self.overtime(), 2)
+        self.workday.stop += timedelta(hours=1)
+        self.workday.save()
+        self.assertEqual(self.overtime(), 3)
+
+        first_day = self.workday.work_date
+        self.workday.start -= timedelta(days=1)
+        self.workday.save()
+        self.assertEqual(list(EmployeeDayRollup.objects.values_list('day', 'full_hours')), [(first_day - timedelta(days=1), 35)])
+        self.assertEqual(list(ProjectDayRollup.objects.values_list('day', flat=True)), [first_day - timedelta(days=1)])
+
+        self.task.refresh_from_db()
+        self.task.delete()
+        self.assertFalse(ProjectDayRollup.objects.exists())
+        self.workday.delete()
+        self.assertFalse(EmployeeDayRollup.objects.exists())
+        self.assertEqual(self.overtime(), 0)
+
+    def test_task_moved_to_another_workday(self):
+        start = self.workday.start - timedelta(days=3)
+        other = WorkhoursRegistry.objects.create(employee=self.employee, start=start, stop=start + timedelta(hours=10))
+        task = Task.objects.get(pk=self.task.pk)
+        task.work_day = other
+        task.save()
+        self.assertEqual(Task.objects.get(pk=task.pk).work_date, other.work_date)
+        self.assertEqual(list(ProjectDayRollup.objects.values_list('day', 'full_hours')), [(other.work_date, 10)])
+        self.assertEqual(Task.objects.filter(work_date=self.workday.work_date).count(), 0)
+
+    @override_settings(ROOT_URLCONF='management.throughput')
+    def test_overtime_of_a_missing_employee(self):
+        for name in ('sync_overtime', 'async_overtime'):
+            self.assertEqual(self.client.get(reverse(name, args=(0, ))).status_code, 404)
+
+
+class OvertimeTest(ManagementTestCase):
+    """ the grouped overtime query against the per workday loop OvertimeView used to run"""
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.tenth, cls.next_tenth = settlement_period(localtime().date() - timedelta(days=60))
+        days = [cls.tenth + timedelta(days=number) for number in range(1, 15)]
+        saturday = next(day for day in days if day.isoweekday() == 6)
+        weekdays = [day for day in days if day.isoweekday() < 6]
+        # (employee, [(day, status, length)]): weekday hours past overtime_after, 30 minutes as the bonus threshold,
+        # a short weekday whose 30+ minutes do not count, hours on the overtime day, absences only, no workdays at all
+        plan = {
+            cls.create_employee('anna@example.com', 'Anna', 'Nowak'): [
+                (weekdays[0], WorkDayStatus.WORK, timedelta(hours=9)),
+                (weekdays[1], WorkDayStatus.WORK, timedelta(hours=8, minutes=29)),
+                (weekdays[2], WorkDayStatus.WORK, timedelta(hours=8, minutes=30)),
+                (weekdays[3], WorkDayStatus.WORK, timedelta(hours=7, minutes=45)),
+                (saturday, WorkDayStatus.WORK, timedelta(hours=3, minutes=29)),
+                (saturday + timedelta(days=7), WorkDayStatus.WORK, timedelta(hours=3, minutes=30)),
+            ],
+            cls.create_employee('ewa@example.com', 'Ewa', 'Lis'): [
+                (weekdays[0], WorkDayStatus.HOLIDAY, timedelta(0)),
+                (weekdays[1], WorkDayStatus.SICK_LEAVE, timedelta(0)),
+            ],
+            cls.create_employee('piotr@example.com', 'Piotr', 'Kot'): [],
+            cls.create_employee(): [
+                (weekdays[4], WorkDayStatus.SICK_LEAVE, timedelta(0)),
+                (weekdays[5], WorkDayStatus.WORK, timedelta(hours=10, minutes=30)),
+            ],
+        }
+        for employee, workdays in plan.items():
+            for day, status, length in workdays:
+                start = datetime.combine(day, time(8), tzinfo=dt_timezone.utc)
+                WorkhoursRegistry.objects.create(employee=employee, start=start, stop=start + length, status=status)
+        cls.employees = list(plan)
+
+    def python_overtime(self, employee):
+        parameters = OvertimeParameters.objects.last()
+        overtime = 0
+        workdays = WorkhoursRegistry.objects.filter(employee=employee, status=WorkDayStatus.WORK, start__date__range=(self.tenth, self.next_tenth)).exclude(stop=None)
+        for workday in workdays:
+            parts = seconds_to_hours_from_timedelta(workday.stop - workday.start)
+            if parts['full_hours'] < parameters.overtime_after and workday.start.isoweekday() != parameters.overtime_days:
+                continue
+            if workday.start.isoweekday() == parameters.overtime_days:
+                overtime += parts['full_hours']
+            else:
+                overtime += parts['full_hours'] - parameters.overtime_after
+            if parts['clock_minutes'] >= 30:
+                overtime += 1
+        return overtime
+
+    def expected(self):
+        return {employee.pk: self.python_overtime(employee) for employee in self.employees}
+
+    def test_grouped_query_matches_the_loop(self):
+        expected = self.expected()
+        self.assertEqual(expected, {self.employees[0].pk: 9, self.employees[1].pk: 0, self.employees[2].pk: 0, self.employees[3].pk: 3})
+        workdays = WorkhoursRegistry.objects.filter(status=WorkDayStatus.WORK).worked_between(self.tenth, self.next_tenth)
+        per_employee = workdays.overtime_per_employee(8, 6)
+        self.assertEqual({pk: per_employee.get(pk, 0) for pk in expected}, expected)
+        self.assertEqual({pk: rollup.overtime for pk, rollup in month_rollups(list(expected), self.tenth).items()}, expected)
+
+    def test_company_overtime_page_and_command(self):
+        expected = self.expected()
+        response = self.client.get(reverse('overtime_all'), {'day': self.tenth + timedelta(days=1)})
+        self.assertEqual((response.context['tenth'], response.context['next_tenth']), (self.tenth, self.next_tenth))
+        self.assertEqual({employee.pk: overtime for employee, overtime in response.context['employees_overtime']}, expected)
+
+        out = io.StringIO()
+        call_command('overtime_report', '--day', str(self.tenth + timedelta(days=1)), stdout=out, stderr=io.StringIO())
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'email;first_name;last_name;overtime')
+        self.assertEqual(sorted(lines[1:]), sorted(f'{employee.email};{employee.first_name};{employee.last_name};{expected[employee.pk]}' for employee in self.employees))
+
+
+class ProjectHoursSumTest(ManagementTestCase):
+    """ the sums read from the rollups equal the per task python sum ProjectHoursView used to make"""
+
+    # task lengths in seconds: minutes rounded at :29/:30/:31 seconds, rounded up to a full hour,
+    # minute totals landing on half hours (30, 90, 150) and a task longer than a day
+    LENGTHS = {
+        'minute boundaries': [29 * 60 + 29, 29 * 60 + 30, 29 * 60 + 31, 30 * 60 + 30, 59 * 60 + 29, 59 * 60 + 30, 8 * 3600 + 59 * 60 + 30],
+        'half an hour': [30 * 60],
+        'an hour and a half': [45 * 60, 45 * 60],
+        'two hours and a half': [50 * 60, 50 * 60, 50 * 60],
+        'just under half an hour': [29 * 60 + 29],
+        'over a day': [26 * 3600 + 15 * 60 + 30, 3600 + 44 * 60 + 30],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        employees = [cls.create_employee(), cls.create_employee('anna@example.com', 'Anna', 'Nowak')]
+        start = utcnow().replace(microsecond=0) - timedelta(days=3)
+        workdays = [WorkhoursRegistry.objects.create(employee=employee, start=start, stop=start + timedelta(days=2)) for employee in employees]
+        modes = list(WorkModeStatus)
+        cls.projects = {}
+        for name, lengths in cls.LENGTHS.items():
+            project = cls.projects[name] = Projects.objects.create(name=name, client_company='Klient', location='Opole')
+            for number, seconds in enumerate(lengths):
+                task_start = start + timedelta(minutes=number)
+                Task.objects.create(start=task_start, stop=task_start + timedelta(seconds=seconds), location='Opole', project=project,
+                                    work_mode=modes[number % len(modes)], work_day=workdays[number % 2])
+
+    @staticmethod
+    def python_hours(tasks):
+        hours = minutes = 0
+        for task in tasks:
+            parts = seconds_to_hours_from_timedelta(task.stop - task.start)
+            hours += parts['full_hours']
+            minutes += parts['clock_minutes']
+        return hours + round(minutes / 60)
+
+    def test_sums_match_the_python_sum(self):
+        for name, project in self.projects.items():
+            with self.subTest(name):
+                tasks = list(Task.objects.filter(project=project).select_related('work_day__employee').order_by('work_day__employee', 'start'))
+                report = project_hours_data(project.id)
+                self.assertEqual(report['hours'], self.python_hours(tasks))
+                employees = sorted({task.work_day.employee for task in tasks}, key=lambda employee: employee.pk)
+                self.assertEqual(report['employee_hours'], [
+                    {'employee': f'{employee.first_name} {employee.last_name}',
+                     'hours': self.python_hours(task for task in tasks if task.work_day.employee == employee)}
+                    for employee in employees
+                ])
+                modes = sorted({task.work_mode for task in tasks})
+                self.assertEqual(report['work_mode_hours'], [
+                    {'work_mode': WorkModeStatus(mode).label, 'hours': self.python_hours(task for task in tasks if task.work_mode == mode)}
+                    for mode in modes
+                ])
+
+    def test_every_task_is_rounded_like_python(self):
+        for task in Task.objects.with_duration():
+            with self.subTest(seconds=task.duration_seconds):
+                self.assertEqual({'full_hours': task.full_hours, 'clock_minutes': task.clock_minutes},
+                                 seconds_to_hours_from_timedelta(task.stop - task.start))
+
+
+@override_settings(MANAGEMENT_PAGINATE_BY=2, MANAGEMENT_PAGINATION='keyset')
+class KeysetPaginationTest(ManagementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        employee = cls.create_employee()
+        start = utcnow().replace(microsecond=0)
+        # two workdays share a start, the id decides their order
+        cls.workdays = [WorkhoursRegistry.objects.create(employee=employee, start=start + timedelta(days=days)) for days in (0, 1, 1, 2, 3)]
+
+    def test_pages_cover_every_row_once_without_count(self):
+        seen = []
+        url = reverse('workdayfilter')
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                page = response.context['page_obj']
+                seen.extend(workday.id for workday in page)
+                url = f"{reverse('workdayfilter')}?after={quote(page.next_cursor)}" if page.has_next() else None
+        self.assertEqual(seen, [workday.id for workday in self.workdays])
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+
+    def test_count_on_request(self):
+        response = self.client.get(reverse('workdayfilter'), {'count': 1})
+        self.assertEqual(response.context['total_count'], 5)
+
+    def test_project_hours_pages_its_tasks(self):
+        project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        tasks = [Task.objects.create(start=workday.start, stop=workday.start + timedelta(hours=1), location='Opole', project=project,
+                                     work_mode=WorkModeStatus.ON_SITE, work_day=workday) for workday in self.workdays]
+        seen = []
+        url = reverse('project_hours', args=(project.id, ))
+        while url:
+            page = self.client.get(url).context['page_obj']
+            seen.extend(task.id for task in page)
+            url = f"{reverse('project_hours', args=(project.id, ))}?after={quote(page.next_cursor)}" if page.has_next() else None
+        self.assertEqual(seen, [task.id for task in tasks])
+
+
+class FilterChoicesTest(ManagementTestCase):
+
+    def test_new_project_shows_up_in_choices(self):
+        self.client.get(reverse('projectfilter'))
+        Projects.objects.create(name='Magazyn', client_company='Nowy klient', location='Opole')
+        response = self.client.get(reverse('projectfilter'))
+        self.assertIn(('Nowy klient', 'Nowy klient'), list(response.context['filter'].form.fields['client_company'].choices))
+
+    def test_locations_are_distinct(self):
+        project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        employee = self.create_employee()
+        workday = WorkhoursRegistry.objects.create(employee=employee)
+        for _ in range(3):
+            Task.objects.create(location='Wrocław', project=project, work_mode=WorkModeStatus.ON_SITE, work_day=workday)
+        response = self.client.get(reverse('taskfilter'))
+        choices = list(response.context['filter'].form.fields['location'].choices)
+        self.assertEqual(choices.count(('Wrocław', 'Wrocław')), 1)
+
+
+class CsvExportTest(ManagementTestCase):
+
+    def test_export_uses_filter_parameters(self):
+        employee = self.create_employee()
+        WorkhoursRegistry.objects.create(employee=employee, status=WorkDayStatus.WORK)
+        WorkhoursRegistry.objects.create(employee=employee, status=WorkDayStatus.HOLIDAY)
+        response = self.client.get(reverse('workdayfilter_export'), {'status': WorkDayStatus.HOLIDAY})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'Start;Stop;Imie;Nazwisko;Status')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith(';Jan;Kowalski;Urlop'))
+
+
+class AbsenceDaysTest(ManagementTestCase):
+
+    def test_whole_worker_list_in_one_query(self):
+        year = utcnow().year
+        anna = self.create_employee('anna@example.com', 'Anna', 'Nowak')
+        jan = self.create_employee()
+        UserCustom.objects.filter(pk=anna.pk).update(holiday_allowance=26)
+        for day, status, count in ((date(year, 1, 2), WorkDayStatus.HOLIDAY, 1), (date(year, 1, 3), WorkDayStatus.HOLIDAY, 1),
+                                   (date(year, 2, 1), WorkDayStatus.SICK_LEAVE, 1), (date(year, 2, 2), WorkDayStatus.WORK, 1),
+                                   (date(year - 1, 12, 30), WorkDayStatus.HOLIDAY, 1)):
+            EmployeeDayRollup.objects.create(employee=anna, day=day, status=status, workday_count=count)
+
+        with self.assertNumQueries(1):
+            workers = {worker.pk: worker for worker in UserCustom.objects.with_absence_days()}
+        self.assertEqual((workers[anna.pk].remaining_holiday, workers[anna.pk].sick_leave_days, workers[anna.pk].child_care_days), (24, 1, 0))
+        self.assertEqual(workers[jan.pk].remaining_holiday, 0)
+        self.assertEqual(workers[anna.pk].get_remaining_holiday, UserCustom.objects.get(pk=anna.pk).get_remaining_holiday)
+
+    def test_worker_pages_count_the_current_year(self):
+        anna = self.create_employee('anna@example.com', 'Anna', 'Nowak')
+        UserCustom.objects.filter(pk=anna.pk).update(holiday_allowance=26)
+        EmployeeDayRollup.objects.create(employee=anna, day=date(utcnow().year, 1, 2), status=WorkDayStatus.HOLIDAY, workday_count=1)
+
+        def remaining():
+            workers = self.client.get(reverse('workerfilter')).context['object_list']
+            export = b''.join(self.client.get(reverse('workerfilter_export')).streaming_content).decode('utf-8-sig')
+            return [worker.remaining_holiday for worker in workers if worker.pk == anna.pk][0], ';25;' in export
+
+        self.assertEqual(remaining(), (25, True))
+        # a process started last year reads the year again on every request
+        with patch('accounts.models.utcnow', return_value=utcnow() + timedelta(days=366)):
+            self.assertEqual(remaining(), (26, False))
+
+
+class BenchmarkTest(ManagementTestCase):
+
+    def test_every_route_is_measured(self):
+        company = seed_company(employees=2, years=0.1, projects=3, tasks_per_day=2)
+        self.assertEqual(company['employees'], 2)
+        ReportJob.objects.create(kind=ReportKind.OVERTIME, status=ReportJobStatus.DONE, filename='raport.csv', result='email')
+        report = run_benchmark(UserCustom.objects.order_by('id').first(), repeat=2)
+        self.assertEqual(list(report['routes']), benchmark_routes())
+        for name, route in report['routes'].items():
+            self.assertLess(route['status'], 500, name)
+            if name in manager_routes():
+                self.assertEqual(route['status'], 200, name)    # the pages themselves, not the login redirect or 403
+            if route['status'] != 200:
+                self.assertIsNone(route['p50_ms'], name)
+                continue
+            self.assertGreater(route['queries'], 0, name)
+            self.assertLessEqual(route['p50_ms'], route['p95_ms'], name)
+
+        measured = {name: route for name, route in report['routes'].items() if route['queries'] is not None}
+        slower = {'routes': {name: dict(route, queries=route['queries'] + 1) for name, route in measured.items()}}
+        self.assertEqual(len([change for change in compare_reports(report, slower) if change[1] == 'queries']), len(measured))
+
+
+class SyntheticDataTest(ManagementTestCase):
+
+    def history(self):
+        workdays = WorkhoursRegistry.objects.exclude(stop=None).order_by('employee__last_name', 'start')
+        tasks = Task.objects.exclude(work_day__stop=None).order_by('work_day__employee__last_name', 'start')
+        return (list(workdays.values_list('employee__last_name', 'start', 'stop', 'status')),
+                list(tasks.values_list('work_day__employee__last_name', 'start', 'stop', 'project__name', 'work_mode')))
+
+    def test_same_seed_gives_same_history(self):
+        with transaction.atomic():     # rolled back instead of deleting row by row through the rollup receivers
+            created = seed_company(employees=3, years=0.2, projects=4, seed=7, batch_size=50, rollups=False)
+            first = self.history()
+            self.assertEqual(created['workdays'], WorkhoursRegistry.objects.count())
+            self.assertEqual(created['tasks'], Task.objects.count())
+            self.assertTrue(any(localtime(stop).date() > localtime(start).date() for name, start, stop, status in first[0]))
+            transaction.set_rollback(True)
+
+        seed_company(employees=3, years=0.2, projects=4, seed=7, batch_size=1000, rollups=False)
+        self.assertEqual(self.history(), first)
+
+
+class TimesheetImportTest(ManagementTestCase):
+    timesheet = (
+        'email;workday_start;workday_stop;status;task_start;task_stop;project;location;work_mode\n'
+        'jan@example.com;2022-03-01 07:00;2022-03-01 15:00;P;2022-03-01 07:00;2022-03-01 11:00;Hala;Opole;F\n'
+        'JAN@example.com;2022-03-01 07:00;2022-03-01 15:00;Praca;2022-03-01 11:00;2022-03-01 15:00;hala;Opole;Serwis\n'
+        'nikt@example.com;2022-03-02 07:00;;P;;;;;\n'
+        'jan@example.com;2022-03-02 07:00;2022-03-02 15:00;P;2022-03-02 07:00;;Magazyn;Opole;F\n'
+        'jan@example.com;2022-03-03 08:00;;Urlop;;;;;\n'
+        'jan@example.com;wczoraj;;P;;;;;\n'
+        'jan@example.com;2022-03-04 22:00;2022-03-05 06:00;P;2022-03-04 22:00;2022-03-05 06:00;Hala;Opole;D\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = cls.create_employee()
+        Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        result = TimesheetImport(batch_size=2).run(io.StringIO(self.timesheet))
+        self.assertEqual([line for line, message in result.errors], [4, 5, 7])
+        self.assertEqual((result.workday_count, result.task_count), (3, 3))
+        workday = WorkhoursRegistry.objects.get(start__date=date(2022, 3, 1))
+        self.assertEqual(workday.task_set.count(), 2)
+        absence = WorkhoursRegistry.objects.get(status=WorkDayStatus.HOLIDAY)
+        self.assertEqual(absence.start, absence.stop)
+
+    def test_import_again_adds_nothing(self):
+        TimesheetImport().run(io.StringIO(self.timesheet))
+        result = TimesheetImport().run(io.StringIO(self.timesheet))
+        self.assertEqual((result.workday_count, result.task_count), (0, 0))
+        self.assertEqual(WorkhoursRegistry.objects.count(), 3)
+
+    def test_admin_upload(self):
+        admin = UserCustom.objects.create_superuser('szef@example.com', 'Szef', 'Firmy', '123456789', '90010112345', 'haslo')
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('timesheet.csv', self.timesheet.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(reverse('admin:employee_workhoursregistry_import'), {'timesheet': upload, 'delimiter': ';'})
+        self.assertRedirects(response, reverse('admin:employee_workhoursregistry_changelist'))
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(EmployeeDayRollup.objects.filter(employee=self.employee, status=WorkDayStatus.HOLIDAY).count(), 1)
+
+        rollups = lambda model: sorted(model.objects.values_list(*[field.attname for field in model._meta.concrete_fields if field.name != 'id']))
+        refreshed = [rollups(model) for model in (EmployeeDayRollup, ProjectDayRollup)]
+        rebuild_rollups()
+        self.assertEqual(refreshed, [rollups(model) for model in (EmployeeDayRollup, ProjectDayRollup)])
+
+
+@override_settings(REQUEST_STATS=True)
+class RequestStatsTest(ManagementTestCase):
+
+    def setUp(self):
+        reset_metrics()
+
+    def test_requests_are_measured_per_url_name(self):
+        self.client.get(reverse('today_info'))
+        response = self.client.get(reverse('today_info'))
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries, 0 duplicated"$')
+
+        admin = UserCustom.objects.create_superuser('szef@example.com', 'Szef', 'Firmy', '123456789', '90010112345', 'haslo')
+        self.client.force_login(admin)
+        stats = {row['view']: row for row in self.client.get(reverse('request_stats')).context['stats']}
+        self.assertEqual(stats['today_info']['requests'], 2)
+        self.assertGreater(stats['today_info']['avg_queries'], 0)
+
+    def test_stats_page_is_for_superusers(self):
+        employee = self.create_employee()
+        self.client.force_login(employee)
+        self.assertEqual(self.client.get(reverse('request_stats')).status_code, 403)
+
+    def test_repeated_query_is_a_duplicate(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(Projects.objects.filter(pk=1))
+            list(Projects.objects.filter(pk=1))
+            list(Projects.objects.filter(pk=2))
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(sum(recorder.duplicates.values()), 1)
+
+
+@override_settings(REQUEST_STATS=True, METRICS_TOKEN=None)
+class MetricsTest(ManagementTestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_metrics_cache().clear()
+        reset_metrics()     # the registrations remembered by this process
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode().splitlines()
+
+    def test_request_counters_and_histograms(self):
+        self.client.get(reverse('today_info'))
+        lines = self.scrape()
+        self.assertIn('kremployee_http_requests_total{view="today_info",status="200"} 1', lines)
+        self.assertIn('kremployee_http_request_duration_seconds_count{view="today_info"} 1', lines)
+        self.assertIn('kremployee_http_request_duration_seconds_bucket{view="today_info",le="+Inf"} 1', lines)
+        self.assertTrue([line for line in lines if line.startswith('kremployee_db_queries_per_request_bucket{view="today_info"')])
+
+    def test_open_gauges_follow_employee_views(self):
+        employee = self.create_employee()
+        project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        self.assertIn('kremployee_open_workdays 0', self.scrape())
+
+        self.client.force_login(employee)
+        self.client.post(reverse('workdaycreate'), {'start': localtime().strftime('%Y-%m-%d %H:%M')})
+        self.client.post(reverse('taskcreate'), {'start': localtime().strftime('%Y-%m-%d %H:%M'), 'location': 'Opole', 'project': project.id, 'work_mode': WorkModeStatus.ON_SITE})
+        with self.assertNumQueries(0):
+            lines = [line for line in self.scrape() if line.startswith('kremployee_open_')]
+        self.assertEqual(lines, ['kremployee_open_workdays 1', 'kremployee_open_tasks 1'])
+
+        task = Task.objects.get()
+        self.client.post(reverse('taskend', args=(task.id, )), {'location': 'Opole'})
+        self.assertIn('kremployee_open_tasks 0', self.scrape())
+
+    def test_series_are_registered_once_per_process(self):
+        self.client.get(reverse('today_info'))
+        with patch.object(get_metrics_cache(), 'add', wraps=get_metrics_cache().add) as add:
+            self.client.get(reverse('today_info'))
+        self.assertFalse([call for call in add.call_args_list if call.args[0].endswith(':registered')])
+        self.assertIn('kremployee_http_requests_total{view="today_info",status="200"} 2', self.scrape())
+
+    @override_settings(METRICS_TOKEN='sekret')
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer sekret').status_code, 200)
+
+
+@override_settings(LIVE_BOARD_POLL_INTERVAL=0.01)
+class LiveBoardTest(ManagementTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.employee = self.create_employee()
+        self.manager = UserCustom.objects.create_superuser('szef@example.com', 'Szef', 'Firmy', '123456789', '90010112345', 'haslo')
+        self.project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+
+    def session_cookie(self, user):
+        self.client.force_login(user)
+        return f'{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}'.encode()
+
+    def test_employee_views_publish_events(self):
+        self.client.force_login(self.employee)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('workdaycreate'), {'start': localtime().strftime('%Y-%m-%d %H:%M')})
+            self.client.post(reverse('taskcreate'), {'start': localtime().strftime('%Y-%m-%d %H:%M'), 'location': 'Opole', 'project': self.project.id, 'work_mode': WorkModeStatus.ON_SITE})
+
+        workday = WorkhoursRegistry.objects.get()
+        events = async_to_sync(broadcaster.events_between)(1, 2)
+        self.assertEqual([(kind, data['id'] if kind == 'workday' else data['work_day']) for sequence, kind, data in events],
+                         [('workday', workday.id), ('task', workday.id)])
+        self.assertEqual(events[1][2]['task']['project'], 'Hala')
+        self.assertNotIn('mobile_nr', events[0][2])
+
+        self.assertEqual(self.client.get(reverse('live_board')).status_code, 403)
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse('live_board'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(card['employee'], card['task']['project']) for card in response.context['cards']], [('Jan Kowalski', 'Hala')])
+
+    def test_board_shows_only_todays_workdays(self):
+        yesterday = localtime() - timedelta(days=1)
+        WorkhoursRegistry.objects.create(employee=self.create_employee('anna@example.com', 'Anna'), start=yesterday, status=WorkDayStatus.WORK)
+        today = WorkhoursRegistry.objects.create(employee=self.employee, start=localtime(), status=WorkDayStatus.WORK)
+        self.client.force_login(self.manager)
+        self.assertEqual([card['id'] for card in self.client.get(reverse('live_board')).context['cards']], [today.id])
+
+    def test_stream_replays_and_pushes_events(self):
+        first = publish('workday', {'id': 1})
+        cookie = self.session_cookie(self.manager)
+
+        async def stream():
+            communicator = ApplicationCommunicator(live_events, {
+                'type': 'http', 'path': LIVE_EVENTS_PATH, 'headers': [(b'last-event-id', str(first - 1).encode()), (b'cookie', cookie)],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(1)
+            bodies = [(await communicator.receive_output(1))['body'] for _ in range(2)]
+            await sync_to_async(publish)('task', {'work_day': 1, 'task': None})
+            bodies.append((await communicator.receive_output(1))['body'])
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(1)
+            return start, bodies
+
+        start, bodies = async_to_sync(stream)()
+        self.assertEqual(dict(start['headers'])[b'content-type'], b'text/event-stream')
+        self.assertEqual(bodies[1], f'id: {first}\nevent: workday\ndata: {{"id": 1}}\n\n'.encode())
+        self.assertEqual(bodies[2], f'id: {first + 1}\nevent: task\ndata: {{"work_day": 1, "task": null}}\n\n'.encode())
+        self.assertFalse(broadcaster.queues)
+
+    def test_stream_is_for_managers(self):
+        async def status(headers):
+            communicator = ApplicationCommunicator(live_events, {'type': 'http', 'path': LIVE_EVENTS_PATH, 'headers': headers})
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(1)
+            await communicator.wait(1)
+            return start['status']
+
+        self.assertEqual(async_to_sync(status)([]), 403)
+        self.assertEqual(async_to_sync(status)([(b'cookie', self.session_cookie(self.employee))]), 403)
+        self.assertFalse(broadcaster.queues)
+
+
+@override_settings(ROOT_URLCONF='management.throughput')
+class AsyncReportsTest(ManagementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_company(employees=3, years=0.05, projects=2, seed=1)
+        cls.employee = UserCustom.objects.order_by('id').first()
+        cls.manager = UserCustom.objects.create_superuser('szef@example.com', 'Szef', 'Firmy', '123456789', '90010112345', 'haslo')
+
+    def test_async_views_render_the_same_pages(self):
+        for name, sync_view, async_view in REPORTS:
+            with self.subTest(name):
+                sync_response = self.client.get(report_url('sync', name, self.employee))
+                async_response = self.client.get(report_url('async', name, self.employee))
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(async_response.content, sync_response.content)
+
+    def test_async_filter(self):
+        response = self.client.get(reverse('async_today_info', args=(0, )), {'employee': self.employee.id})
+        self.assertEqual({workday.employee_id for workday in response.context['workhoursregistry_list']}, {self.employee.id})
+        response = self.client.get(reverse('async_today_info', args=(0, )), {'employee': 'x'})
+        self.assertEqual(response.context['workhoursregistry_list'], [])
+
+    @override_settings(ROOT_URLCONF='KRemployee.urls')
+    def test_async_views_only_under_asgi(self):
+        self.client.force_login(self.manager)
+        url = reverse('overtime', args=(self.employee.id, ))
+        self.assertIs(self.client.get(url).resolver_match.func.view_class, OvertimeView)
+        self.async_client.force_login(self.manager)
+
+        async def get():
+            return await self.async_client.get(url)
+
+        response = async_to_sync(get)()
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(response.resolver_match.func.view_class, AsyncOvertimeView)
+
+
+class ReportJobTest(ManagementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_company(employees=3, years=0.05, projects=2, seed=2)
+        cls.project = Projects.objects.order_by('id').first()
+        cls.manager = UserCustom.objects.create_superuser('szef@example.com', 'Szef', 'Firmy', '123456789', '90010112345', 'haslo')
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_reports_are_for_superusers(self):
+        job = ReportJob.objects.create(kind=ReportKind.OVERTIME, parameters={'day': '2022-09-15'}, status=ReportJobStatus.DONE, result='email')
+        for user in (None, self.create_employee()):
+            self.client.logout()
+            if user:
+                self.client.force_login(user)
+            with self.subTest(user=user):
+                expected = 403 if user else 302     # anonymous users are sent to the login page
+                self.assertEqual(self.client.get(reverse('report_jobs')).status_code, expected)
+                self.assertEqual(self.client.post(reverse('report_jobs'), {'kind': ReportKind.OVERTIME, 'day': '2022-09-15'}).status_code, expected)
+                self.assertEqual(self.client.get(reverse('report_job_download', args=(job.id, ))).status_code, expected)
+        self.assertQuerysetEqual(ReportJob.objects.all(), [job])
+
+    def test_request_run_and_download(self):
+        response = self.client.post(reverse('report_jobs'), {'kind': ReportKind.PROJECT_HOURS, 'project': self.project.id})
+        self.assertRedirects(response, reverse('report_jobs'))
+        self.client.post(reverse('report_jobs'), {'kind': ReportKind.OVERTIME, 'day': '2022-09-15'})
+        project_job, overtime_job = ReportJob.objects.order_by('id')
+        self.assertEqual(overtime_job.parameters, {'day': '2022-09-15'})
+        self.assertTrue(self.client.get(reverse('report_jobs')).context['pending'])
+        self.assertEqual(self.client.get(reverse('report_job_download', args=(project_job.id, ))).status_code, 404)
+
+        self.assertEqual(claim_job(), project_job.id)
+        self.assertEqual(claim_job(), overtime_job.id)
+        self.assertIsNone(claim_job())
+        self.assertTrue(run_job(project_job.id))
+        self.assertTrue(run_job(overtime_job.id))
+
+        response = self.client.get(reverse('report_job_download', args=(project_job.id, )))
+        lines = response.content.decode('utf-8-sig').splitlines()
+        self.assertTrue(lines[0].startswith(f'Projekt;{self.project.name};'))
+        finished_tasks = Task.objects.filter(project=self.project).exclude(stop=None).count()
+        self.assertEqual(len(lines) - lines.index('Start;Stop;Pracownik;Lokalizacja;Tryb pracy') - 1, finished_tasks)
+        overtime_job.refresh_from_db()
+        self.assertEqual((overtime_job.status, overtime_job.progress, overtime_job.filename),
+                         (ReportJobStatus.DONE, 100, 'nadgodziny_2022-09-10_2022-10-10.csv'))
+        self.assertEqual(len(overtime_job.result.splitlines()), UserCustom.objects.count() + 1)
+        self.assertFalse(self.client.get(reverse('report_jobs')).context['pending'])
+
+    def test_failed_and_stale_jobs(self):
+        job = ReportJob.objects.create(kind=ReportKind.PROJECT_HOURS, parameters={'project': 0})
+        claim_job()
+        with self.assertLogs('management.jobs', 'ERROR'):
+            self.assertFalse(run_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJobStatus.FAILED)
+        self.assertIn('DoesNotExist', job.error)
+
+        job = ReportJob.objects.create(kind=ReportKind.OVERTIME, parameters={'day': '2022-09-15'})
+        claim_job()
+        self.assertEqual(requeue_stale(60), 0)
+        ReportJob.objects.filter(pk=job.id).update(heartbeat=utcnow() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(60), 1)
+        self.assertEqual(claim_job(), job.id)
+
+    def test_worker_survives_a_dead_process(self):
+        class DeadPool:
+            started = 0
+
+            def __init__(self, *args, **kwargs):
+                DeadPool.started += 1
+
+            def submit(self, function, *args):
+                future = Future()
+                future.set_exception(BrokenProcessPool())
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        job = ReportJob.objects.create(kind=ReportKind.OVERTIME, parameters={'day': '2022-09-15'})
+        with patch('management.management.commands.report_worker.ProcessPoolExecutor', DeadPool):
+            call_command('report_worker', '--once', '--poll', '0', stdout=io.StringIO(), stderr=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJobStatus.FAILED)
+        self.assertIn('stopped unexpectedly', job.error)
+        self.assertEqual(DeadPool.started, 2)
+
+    def test_project_is_required(self):
+        response = self.client.post(reverse('report_jobs'), {'kind': ReportKind.PROJECT_HOURS})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('project', response.context['form'].errors)
+        self.assertFalse(ReportJob.objects.exists())
+
+
+class ReportCacheTest(ManagementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        cls.employee = cls.create_employee()
+        start = utcnow() - timedelta(days=40)
+        cls.workday = WorkhoursRegistry.objects.create(employee=cls.employee, start=start, stop=start + timedelta(hours=10))
+        cls.task = Task.objects.create(start=start, stop=start + timedelta(hours=10), location='Opole', project=cls.project,
+                                       work_mode=WorkModeStatus.ON_SITE, work_day=cls.workday)
+
+    def setUp(self):
+        cache.clear()
+
+    def overtime(self, day=None):
+        url = reverse('overtime', args=(self.employee.id, )) + f'?day={day or localtime(self.workday.start).date()}'
+        return self.client.get(url).context['overtime']
+
+    def test_closed_period_is_cached_until_its_data_changes(self):
+        self.assertEqual(self.overtime(), 2)
+        with self.assertNumQueries(1):     # the versions
+            self.assertEqual(self.overtime(), 2)
+
+        self.workday.stop += timedelta(hours=1)
+        self.workday.save()
+        self.assertEqual(self.overtime(), 3)
+
+        OvertimeParameters.objects.create(overtime_after=6, overtime_days=6)
+        self.assertEqual(self.overtime(), 5)
+
+    def test_write_in_another_period_keeps_the_cache(self):
+        self.overtime()
+        start = utcnow()
+        WorkhoursRegistry.objects.create(employee=self.employee, start=start, stop=start + timedelta(hours=9))
+        with self.assertNumQueries(1):
+            self.overtime()
+
+    def test_workday_moved_to_another_period_leaves_the_old_one(self):
+        old_day = localtime(self.workday.start).date()
+        self.assertEqual(self.overtime(old_day), 2)
+        self.workday.refresh_from_db()
+        self.workday.start += timedelta(days=35)
+        self.workday.stop += timedelta(days=35)
+        self.workday.save()
+        self.assertEqual(self.overtime(old_day), 0)
+        self.assertEqual(self.overtime(self.workday.work_date), 2)
+
+    def test_versions_are_shared_by_all_processes(self):
+        self.assertEqual(self.overtime(), 2)
+        # a command or another worker writes to the database only, not to the cache of this process
+        start = localtime(self.workday.start) + timedelta(days=1)
+        with patch('management.report_cache.get_cache', return_value=caches['metrics']):
+            WorkhoursRegistry.objects.create(employee=self.employee, start=start, stop=start + timedelta(hours=9))
+        self.assertEqual(self.overtime(), 3)
+
+    def test_project_hours_follow_moved_tasks(self):
+        other = Projects.objects.create(name='Magazyn', client_company='Klient', location='Opole')
+        self.assertEqual(self.client.get(reverse('project_hours', args=(self.project.id, ))).context['hours'], 10)
+        self.assertEqual(self.client.get(reverse('project_hours', args=(other.id, ))).context['hours'], 0)
+        with self.assertNumQueries(3):     # the versions, the last archived day and the page of tasks, the sums are cached
+            self.client.get(reverse('project_hours', args=(self.project.id, )))
+
+        self.client.force_login(self.employee)
+        self.client.post(reverse('taskupdate', args=(self.task.id, )), {'location': 'Opole', 'project': other.id, 'work_mode': WorkModeStatus.ON_SITE})
+        self.assertEqual(self.client.get(reverse('project_hours', args=(self.project.id, ))).context['hours'], 0)
+        self.assertEqual(self.client.get(reverse('project_hours', args=(other.id, ))).context['hours'], 10)
+
+
+class ArchiveTest(ManagementTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.project = Projects.objects.create(name='Hala', client_company='Klient', location='Opole')
+        cls.employee = cls.create_employee()
+        for start in (utcnow() - timedelta(days=800), utcnow() - timedelta(hours=12)):
+            workday = WorkhoursRegistry.objects.create(employee=cls.employee, start=start, stop=start + timedelta(hours=10))
+            Task.objects.create(start=start, stop=start + timedelta(hours=10), location='Opole', project=cls.project,
+                                work_mode=WorkModeStatus.ON_SITE, work_day=workday)
+        cls.old_workday, cls.workday = WorkhoursRegistry.objects.order_by('start')
+        rebuild_rollups()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def overtime(self):
+        url = reverse('overtime', args=(self.employee.id, )) + f'?day={self.old_workday.work_date}'
+        return self.client.get(url).context
+
+    def rollups(self):
+        return [list(model.objects.order_by('pk').values_list('day', 'full_hours', 'clock_minutes')) for model in (EmployeeDayRollup, ProjectDayRollup)]
+
+    def test_archived_days_stay_in_the_reports(self):
+        overtime = self.overtime()['overtime']
+        rollups = self.rollups()
+        self.assertEqual(archive_before(archivable_cutoff()), {'workdays': 1, 'tasks': 1})
+        self.assertQuerysetEqual(WorkhoursRegistry.objects.all(), [self.workday])
+        self.assertEqual(TaskArchive.objects.get().work_day_id, self.old_workday.id)
+        self.assertEqual(self.rollups(), rollups)
+
+        rebuild_rollups()
+        context = self.overtime()
+        self.assertEqual((context['overtime'], [workday.id for workday in context['workdays']]), (overtime, [self.old_workday.id]))
+        response = self.client.get(reverse('project_hours', args=(self.project.id, )))
+        self.assertEqual((response.context['hours'], len(response.context['tasks'])), (20, 2))
+        self.assertEqual(len(self.client.get(reverse('tasklist', args=(self.old_workday.id, ))).context['task_list']), 1)
+
+    def test_filters_read_the_archive_only_for_archived_days(self):
+        archive_before(archivable_cutoff())
+        response = self.client.get(reverse('workdayfilter'))
+        self.assertEqual([workday.id for workday in response.context['page_obj']], [self.old_workday.id, self.workday.id])
+
+        recent = {'start_min': self.workday.work_date.isoformat()}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('workdayfilter'), recent)
+        self.assertEqual([workday.id for workday in response.context['page_obj']], [self.workday.id])
+        # only the last archived day is looked up, no archived rows are read
+        self.assertEqual(len([query for query in queries if 'archive' in query['sql']]), 1)
+
+        lines = b''.join(self.client.get(reverse('taskfilter_export')).streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 3)
+
+
+@override_settings(REPLICA_DATABASE='default')
+class ReplicaRouterTest(ManagementTestCase):
+    """ the primary stands in for the replica, what is checked is where the router sends the reads"""
+
+    @classmethod
+    def setUpTestData(cls):
+        OvertimeParameters.objects.create(overtime_after=8, overtime_days=6)
+        cls.employee = cls.create_employee()
+        cls.workday = WorkhoursRegistry.objects.create(employee=cls.employee, start=utcnow() - timedelta(hours=9), stop=utcnow())
+
+    def setUp(self):
+        cache.clear()
+
+    def read_aliases(self, method, *args, **kwargs):
+        aliases = set()
+        db_for_read = ReplicaRouter.db_for_read
+
+        def recording(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            aliases.add(alias)
+            return alias
+
+        with patch.object(ReplicaRouter, 'db_for_read', recording):
+            method(*args, **kwargs)
+        return aliases
+
+    def test_reports_read_from_the_replica(self):
+        for url in (reverse('workdayfilter'), reverse('taskfilter'), reverse('overtime', args=(self.employee.id, ))):
+            self.assertEqual(self.read_aliases(self.client.get, url), {'default'}, url)
+        self.assertEqual(self.read_aliases(self.client.get, reverse('today_info')), {None})
+
+    def test_rollups_are_recomputed_from_the_primary(self):
+        EmployeeMonthRollup.objects.all().delete()
+        with reading_from('default'):
+            aliases = self.read_aliases(month_rollups, [self.employee.id], self.workday.work_date)
+        self.assertEqual(aliases, {'default', None})   # the lookup of the rollups, the workdays they are summed from
+        self.assertTrue(EmployeeMonthRollup.objects.exists())
+
+    def test_reads_stay_on_the_primary_after_a_write(self):
+        self.client.force_login(self.employee)
+        self.client.post(reverse('workdaycreate'), {'start': utcnow().date().isoformat() + ' 08:00'})
+        self.assertTrue(self.client.cookies[PIN_COOKIE].value)
+        self.assertEqual(self.read_aliases(self.client.get, reverse('workdayfilter')), {None})
+
+    def test_writes_and_migrations_stay_on_the_primary(self):
+        router = ReplicaRouter()
+        with patch('management.routers.replica_alias', return_value='replica'):
+            self.assertFalse(router.allow_migrate('replica', 'employee'))
+            self.assertIsNone(router.allow_migrate('default', 'employee'))
+        self.assertEqual(router.db_for_write(WorkhoursRegistry, instance=self.workday), 'default')
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite only")
+class SqliteTuningTest(ManagementTestCase):
+
+    def new_connection_pragmas(self):
+        # a private in-memory database, the shared test database is locked by the test transaction
+        new_connection = connections['default'].__class__({**connection.settings_dict, 'NAME': ':memory:'}, alias='tuning')
+        try:
+            with new_connection.cursor() as cursor:
+                return [cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in ('busy_timeout', 'synchronous', 'cache_size')]
+        finally:
+            new_connection.close()
+
+    def test_pragmas_only_with_the_profile_on(self):
+        with override_settings(SQLITE_TUNING=False):
+            self.assertNotEqual(self.new_connection_pragmas()[0], 20000)
+        with override_settings(SQLITE_TUNING=True):
+            self.assertEqual(self.new_connection_pragmas(), [20000, 1, -64 * 1024])
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite only")
+class SqliteMaintenanceTest(TransactionTestCase):
+    """ ANALYZE writes sqlite_stat1, which the open transaction of a TestCase keeps locked"""
+
+    def test_maintenance_command(self):
+        output = io.StringIO()
+        call_command('sqlite_maintenance', stdout=output)
+        self.assertIn("Statistics analyzed", output.getvalue())
+        self.assertIn("SQLite maintenance done", output.getvalue())
+        # the test database lives in memory, without a WAL
+        self.assertIn("Checkpoint skipped, the database is in memory journal mode, not WAL", output.getvalue())
+        self.assertNotIn("Checkpointed", output.getvalue())
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import AsyncClient, Client
+from django.urls import include, path, reverse
+
+from management.benchmark import percentile, route_kwargs
+from management.views import (
+    WorkDayListView, ProjectTodayListView, ProjectHoursView, OvertimeView,
+    AsyncWorkDayListView, AsyncProjectTodayListView, AsyncProjectHoursView, AsyncOvertimeView,
+)
+
+
+# the reports compared, (url name, synchronous view, asynchronous view)
+REPORTS = (
+    ('today_info', WorkDayListView, AsyncWorkDayListView),
+    ('today_project', ProjectTodayListView, AsyncProjectTodayListView),
+    ('project_hours', ProjectHoursView, AsyncProjectHoursView),
+    ('overtime', OvertimeView, AsyncOvertimeView),
+)
+
+# ROOT_URLCONF of the throughput benchmark: the project urls, so templates still resolve their links,
+# and every report once more under sync/ and async/
+urlpatterns = [path('', include('KRemployee.urls'))]
+for name, sync_view, async_view in REPORTS:
+    urlpatterns += [
+        path(f'sync/{name}/<int:pk>', sync_view.as_view(template_name=sync_view.template_name), name=f'sync_{name}'),
+        path(f'async/{name}/<int:pk>', async_view.as_view(template_name=async_view.template_name), name=f'async_{name}'),
+    ]
+
+
+def report_url(mode, name, employee):
+    """ the reports without a pk in their real url ignore it"""
+    kwargs = route_kwargs(employee).get(name, {'pk': 0})
+    return reverse(f'{mode}_{name}', kwargs=kwargs)
+
+
+def summary(timings, elapsed, statuses):
+    return {
+        'requests': len(timings),
+        'errors': len([status for status in statuses if status != 200]),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2),
+    }
+
+
+def run_sync(url, requests, concurrency):
+    """ `concurrency` threads share the requests, each with its own client like the threads of a WSGI server"""
+    def worker(count):
+        client = Client(raise_request_exception=False)
+        results = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.get(url)
+            results.append((time.perf_counter() - started, response.status_code))
+        return results
+
+    shares = [requests // concurrency + (number < requests % concurrency) for number in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = [result for results in executor.map(worker, shares) for result in results]
+    return summary([timing for timing, status in results], time.perf_counter() - started, [status for timing, status in results])
+
+
+def run_async(url, requests, concurrency):
+    """ `concurrency` coroutines share the requests in one event loop, like an ASGI server"""
+    async def worker(count, results):
+        client = AsyncClient(raise_request_exception=False)
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get(url)
+            results.append((time.perf_counter() - started, response.status_code))
+
+    async def main():
+        results = []
+        shares = [requests // concurrency + (number < requests % concurrency) for number in range(concurrency)]
+        await asyncio.gather(*(worker(count, results) for count in shares))
+        return results
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+    return summary([timing for timing, status in results], time.perf_counter() - started, [status for timing, status in results])
+
+
+def run_throughput(employee, requests=200, concurrency=(1, 10, 50)):
+    """
+    {report: {concurrency: {'sync': summary, 'async': summary}}} of the synchronous views driven by threads
+    and the async views driven by one event loop, both through the full middleware stack.
+    Run with ROOT_URLCONF = 'management.throughput'.
+    """
+    results = {}
+    for name, sync_view, async_view in REPORTS:
+        sync_url, async_url = report_url('sync', name, employee), report_url('async', name, employee)
+        Client().get(sync_url)     # warm up: lazily filled rollups and caches
+        results[name] = {
+            level: {'sync': run_sync(sync_url, requests, level), 'async': run_async(async_url, requests, level)}
+            for level in concurrency
+        }
+    return results
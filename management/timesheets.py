@@ -0,0 +1,188 @@
+import csv
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, localdate, make_aware
+
+from accounts.models import UserCustom
+from employee.enums import WorkDayStatus, WorkModeStatus
+from employee.managers import seconds_between
+from employee.models import WorkhoursRegistry, Task, Projects
+from management.report_cache import bump_all
+from management.rollups import refresh_employee_day, refresh_employee_months, refresh_project_day
+from management.utilities import periods_containing
+
+
+# one row per task, absences and workdays without tasks leave the task columns empty
+TIMESHEET_COLUMNS = ('email', 'workday_start', 'workday_stop', 'status', 'task_start', 'task_stop', 'project', 'location', 'work_mode')
+
+
+def choice_map(choices):
+    """ accepts both the stored code and the label, case insensitive"""
+    mapping = {}
+    for value, label in choices.choices:
+        mapping[value.lower()] = value
+        mapping[label.lower()] = value
+    return mapping
+
+
+def parse_moment(value, column, required=True):
+    value = (value or '').strip()
+    if not value:
+        if required:
+            raise ValidationError(f"brak wartości w kolumnie {column}")
+        return None
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError(f"niepoprawna data w kolumnie {column}: {value}")
+    return make_aware(moment) if is_naive(moment) else moment
+
+
+class TimesheetImport:
+    """
+    Loads workdays and tasks from CSV timesheets of the old system.
+    Employees (by email) and projects (by name) are resolved from maps built once, rows are validated
+    one by one and saved with bulk_create, one transaction per batch. A bad row is reported in `errors`
+    as (line, message) and skipped, the rest of the file is still loaded.
+    Workdays that already existed before the import are not touched, so a file can be imported again safely.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.employees = {email.lower(): pk for email, pk in UserCustom.objects.values_list('email', 'id')}
+        self.projects = {}
+        self.ambiguous_projects = set()
+        for name, pk in Projects.objects.values_list('name', 'id'):
+            if name.lower() in self.projects:
+                self.ambiguous_projects.add(name.lower())
+            self.projects[name.lower()] = pk
+        self.statuses = choice_map(WorkDayStatus)
+        self.work_modes = choice_map(WorkModeStatus)
+        self.workdays = {}      # (employee_id, start) -> pk of the workdays created by this import
+        self.employee_days = set()  # (employee_id, work_date) and (project_id, work_date) the import added rows to
+        self.project_days = set()
+        self.workday_count = 0
+        self.task_count = 0
+        self.errors = []
+
+    def run(self, lines, delimiter=';'):
+        reader = csv.DictReader(lines, delimiter=delimiter)
+        missing = set(TIMESHEET_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            self.errors.append((1, f"brak kolumn: {', '.join(sorted(missing))}"))
+            return self
+        batch = []
+        for row in reader:
+            batch.append((reader.line_num, row))
+            if len(batch) == self.batch_size:
+                self.load_batch(batch)
+                batch = []
+        if batch:
+            self.load_batch(batch)
+        return self
+
+    def parse(self, row):
+        """ returns (workday key, workday fields, task fields or None)"""
+        employee_id = self.employees.get((row['email'] or '').strip().lower())
+        if employee_id is None:
+            raise ValidationError(f"nieznany pracownik: {row['email']}")
+        start = parse_moment(row['workday_start'], 'workday_start')
+        stop = parse_moment(row['workday_stop'], 'workday_stop', required=False)
+        status = self.statuses.get((row['status'] or WorkDayStatus.WORK).strip().lower())
+        if status is None:
+            raise ValidationError(f"nieznany status: {row['status']}")
+        if status != WorkDayStatus.WORK:
+            stop = stop or start
+        if stop and stop < start:
+            raise ValidationError("koniec dnia pracy przed jego początkiem")
+        workday = {'employee_id': employee_id, 'start': start, 'stop': stop, 'status': status, 'work_date': localdate(start),
+                   'duration_seconds': seconds_between(start, stop)}
+
+        if not (row['task_start'] or '').strip():
+            return (employee_id, start), workday, None
+        if status != WorkDayStatus.WORK:
+            raise ValidationError("nieobecność nie może mieć zadań")
+
+        project_name = (row['project'] or '').strip().lower()
+        if project_name in self.ambiguous_projects:
+            raise ValidationError(f"kilka projektów o nazwie: {row['project']}")
+        project_id = self.projects.get(project_name)
+        if project_id is None:
+            raise ValidationError(f"nieznany projekt: {row['project']}")
+        work_mode = self.work_modes.get((row['work_mode'] or '').strip().lower())
+        if work_mode is None:
+            raise ValidationError(f"nieznany tryb pracy: {row['work_mode']}")
+        location = (row['location'] or '').strip()
+        if not location or len(location) > Task._meta.get_field('location').max_length:
+            raise ValidationError(f"niepoprawna lokalizacja: {row['location']}")
+        task_start = parse_moment(row['task_start'], 'task_start')
+        task_stop = parse_moment(row['task_stop'], 'task_stop', required=False)
+        if task_stop and task_stop < task_start:
+            raise ValidationError("koniec zadania przed jego początkiem")
+        task = {'start': task_start, 'stop': task_stop, 'project_id': project_id, 'work_mode': work_mode, 'location': location,
+                'duration_seconds': seconds_between(task_start, task_stop)}
+        return (employee_id, start), workday, task
+
+    def load_batch(self, batch):
+        parsed = []
+        for line, row in batch:
+            try:
+                parsed.append((line, *self.parse(row)))
+            except ValidationError as error:
+                self.errors.append((line, error.messages[0]))
+
+        new_keys = {key for line, key, workday, task in parsed if key not in self.workdays}
+        existing = set()
+        if new_keys:
+            existing = set(WorkhoursRegistry.objects.filter(
+                employee__in={employee_id for employee_id, start in new_keys}, start__in={start for employee_id, start in new_keys},
+            ).values_list('employee', 'start')) & new_keys
+
+        new_workdays = {}
+        tasks = []
+        lines = []
+        for line, key, workday, task in parsed:
+            if key in existing:
+                self.errors.append((line, "dzień pracy już istnieje"))
+                continue
+            if key not in self.workdays and key not in new_workdays:
+                new_workdays[key] = WorkhoursRegistry(**workday)
+            if task:
+                tasks.append((key, Task(**task)))
+            lines.append(line)
+
+        try:
+            with transaction.atomic():
+                WorkhoursRegistry.objects.bulk_create(new_workdays.values(), batch_size=self.batch_size)
+                pks = {key: workday.pk for key, workday in new_workdays.items()}
+                for (employee_id, start), task in tasks:
+                    task.work_day_id = pks.get((employee_id, start)) or self.workdays[(employee_id, start)]
+                    task.work_date = localdate(start)
+                Task.objects.bulk_create([task for key, task in tasks], batch_size=self.batch_size)
+        except DatabaseError as error:
+            self.errors.extend((line, f"błąd zapisu: {error}") for line in lines)
+            return
+
+        bump_all()     # bulk_create sends no signals to bump the versions of the cached reports
+        self.workdays.update(pks)
+        self.employee_days.update((workday.employee_id, workday.work_date) for workday in new_workdays.values())
+        self.project_days.update((task.project_id, task.work_date) for key, task in tasks)
+        self.workday_count += len(new_workdays)
+        self.task_count += len(tasks)
+
+    def refresh_rollups(self):
+        """ rollups of the days the import added rows to, for a file much smaller than the whole history instead of rebuild_rollups"""
+        periods = defaultdict(set)
+        for employee_id, day in self.employee_days:
+            refresh_employee_day(employee_id, day)
+            for period_start in periods_containing(day):
+                periods[period_start].add(employee_id)
+        for period_start, employee_ids in periods.items():
+            refresh_employee_months(list(employee_ids), period_start)
+        for project_id, day in self.project_days:
+            refresh_project_day(project_id, day)
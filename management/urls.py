@@ -1,22 +1,31 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
-from management.views import WorkDayListView, WorkDayTaskListView, ProjectTodayListView, ProjectHoursListView, ProjectHoursView, PickEmployeeView, OvertimeView, FilterPicKView, WorkDayAllFilterView, ProjectAllFilterView, TaskAllFilterView, WorkerAllFilterView
+from management.views import WorkDayListView, WorkDayTaskListView, ProjectTodayListView, ProjectHoursListView, ProjectHoursView, PickEmployeeView, OvertimeView, OvertimeAllView, FilterPicKView, LiveBoardView, ReportJobsView, ReportJobDownloadView, RequestStatsView, WorkDayAllFilterView, ProjectAllFilterView, TaskAllFilterView, WorkerAllFilterView, WorkDayExportView, TaskExportView, ProjectExportView, WorkerExportView
 
 
 
 urlpatterns = [
     path('', TemplateView.as_view(template_name='management/base_manage.html'), name='manage'),
     path('todayinfo/', WorkDayListView.as_view(), name='today_info'),
+    path('live/', LiveBoardView.as_view(), name='live_board'),
     path('todayproject/',ProjectTodayListView.as_view(), name='today_project'),
     path('pickproject/',ProjectHoursListView.as_view(), name='pick_project'),
     path('projecthours/<int:pk>', ProjectHoursView.as_view(), name='project_hours'),
     path('pickemployee/',PickEmployeeView.as_view(), name='pick_employee'),
     path('overtime/<int:pk>',OvertimeView.as_view(template_name='management/overtime.html'), name='overtime'),
+    path('overtime/all',OvertimeAllView.as_view(), name='overtime_all'),
     path('filters/',FilterPicKView.as_view(), name='filters'),
+    path('reports/', ReportJobsView.as_view(), name='report_jobs'),
+    path('reports/<int:pk>/download', ReportJobDownloadView.as_view(), name='report_job_download'),
+    path('requeststats/', RequestStatsView.as_view(), name='request_stats'),
     path('tasklist/<int:pk>', WorkDayTaskListView.as_view(), name='tasklist'),
     path('workdayfilter', WorkDayAllFilterView.as_view(), name='workdayfilter'),
     path('projectfilters', ProjectAllFilterView.as_view(), name='projectfilter'),
     path('taskfilter', TaskAllFilterView.as_view(), name='taskfilter'),
     path('workerfilter', WorkerAllFilterView.as_view(), name='workerfilter'),
+    path('workdayfilter/export', WorkDayExportView.as_view(), name='workdayfilter_export'),
+    path('projectfilters/export', ProjectExportView.as_view(), name='projectfilter_export'),
+    path('taskfilter/export', TaskExportView.as_view(), name='taskfilter_export'),
+    path('workerfilter/export', WorkerExportView.as_view(), name='workerfilter_export'),
 ]
\ No newline at end of file
@@ -1,8 +1,6 @@
 import datetime
 
 
-
-
 def seconds_to_hours_from_timedelta(timedelta_obj):
     decimal_hours = timedelta_obj.days * 24 + timedelta_obj.seconds / 3600
     full_hours = int(decimal_hours // 1)
@@ -11,6 +9,33 @@ def seconds_to_hours_from_timedelta(timedelta_obj):
     return {"full_hours":full_hours, "clock_minutes":clock_minutes}
 
 
+def hours_from_clock_parts(full_hours, clock_minutes):
+    """ summed minutes are rounded to full hours the same way ProjectHoursView always did"""
+    return full_hours + round(clock_minutes / 60)
+
+
+def settlement_period(day):
+    """ month is from 10-th to 10-th, returns (tenth, next_tenth) of the period that day belongs to"""
+    if day.day < 10:
+        day = day.replace(day=1) - datetime.timedelta(days=1)
+
+    tenth = day.replace(day=10)
+    if tenth.month != 12:
+        next_tenth = tenth.replace(month=tenth.month + 1)
+    else:   # because december
+        next_tenth = tenth.replace(month=1, year=tenth.year + 1)
+    return tenth, next_tenth
+
+
+def periods_containing(day):
+    """ settlement periods overlap on the 10-th, so a day belongs to one or two periods"""
+    periods = [settlement_period(day)[0]]
+    if day.day == 10:
+        periods.append(settlement_period(day - datetime.timedelta(days=1))[0])
+    return periods
+
+
+
 
 ########################################## development quickTesting here
 # if __name__ == "__main__":
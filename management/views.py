@@ -1,26 +1,47 @@
 from contextlib import nullcontext
+from functools import partial
+from asgiref.sync import sync_to_async
 import django_filters
 
 
-from django.shortcuts import render
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.crypto import constant_time_compare
 from django_filters.views import FilterView
 from django_filters.widgets import SuffixedMultiWidget
-from django.views.generic import ListView, TemplateView
-from django.utils.timezone import now as utcnow
+from django.views.generic import ListView, TemplateView, View
+from django.utils.timezone import localdate, now as utcnow
+from django.utils.dateparse import parse_date
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import Prefetch
 from django import forms
 
 from datetime import timedelta
 
 from accounts.models import UserCustom
-from employee.models import Projects, Task, WorkhoursRegistry, OvertimeParameters
+from employee.models import Projects, Task, WorkhoursRegistry, OvertimeParameters, TaskArchive, WorkhoursRegistryArchive
 from employee.enums import WorkDayStatus, WorkModeStatus
-from management.utilities import seconds_to_hours_from_timedelta
+from management.archive import asources, reaches_archive, sources
+from management.choices import lazy_choices
+from management.enums import ReportJobStatus
+from management.export import CsvExportView
+from management.forms import ReportJobForm
+from management.instrumentation import request_stats
+from management.live import LIVE_EVENTS_PATH, may_watch, workday_card
+from management.metrics import exposition, reset_metrics
+from management.models import ReportJob
+from management.pagination import KeysetPaginationMixin
+from management.reports import aproject_hours_data, project_hours_data, project_tasks, task_cards, workday_cards
+from management.report_cache import NAMES_VERSION, PARAMETERS_VERSION, cached_report, acached_report, employee_period_version, project_version
+from management.rollups import month_rollups, workforce_overtime
+from management.routers import ReplicaReadMixin
+from management.utilities import settlement_period
 from management.widgets import OurDateRangeWidget
 
 # Create your views here.
 
-
 class WorkDayFilter(django_filters.FilterSet):
 
     class Meta:
@@ -41,23 +62,63 @@ class WorkDayListView(FilterView):
         return context
     
     def get_queryset(self):
-        today = utcnow().date()
+        today = localdate()
         tomorrow = today + timedelta(days=1)
-        workdays = WorkhoursRegistry.objects.filter(start__date__range=(today, tomorrow)).all()
+        workdays = workday_cards(WorkhoursRegistry.objects.worked_between(today, tomorrow))
         return workdays
 
 
+class LiveBoardView(UserPassesTestMixin, TemplateView):
+    """
+    Who is working now: workdays of today, with the current task. Workdays left open on earlier days are not shown.
+    The page renders this state once, then follows the events streamed by management.live from LIVE_EVENTS_PATH.
+    """
+    template_name = 'management/live_board.html'
+
+    def test_func(self):
+        return may_watch(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        workdays = workday_cards(WorkhoursRegistry.objects.filter(status=WorkDayStatus.WORK, work_date=localdate())).prefetch_related(
+            Prefetch('task_set', queryset=Task.objects.filter(stop=None).select_related('project').order_by('-start'), to_attr='open_tasks'),
+        ).order_by('start')
+        context['cards'] = [workday_card(workday, next(iter(workday.open_tasks), None)) for workday in workdays]
+        context['events_url'] = LIVE_EVENTS_PATH
+        return context
+
+
+class AsyncFilterMixin:
+    """
+    async get of FilterView: the filter form is validated in a thread because its model choices query the database,
+    the rows are read with the async ORM so the template gets a list and does not query them again.
+    Rendering, with the filter form choices, is done by the handler in a thread.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        if not self.filterset.is_bound or await sync_to_async(self.filterset.is_valid)() or not self.get_strict():
+            queryset = self.filterset.qs
+        else:
+            queryset = self.filterset.queryset.none()
+        self.object_list = [row async for row in queryset]
+        return self.render_to_response(self.get_context_data(filter=self.filterset, object_list=self.object_list))
+
+
+class AsyncWorkDayListView(AsyncFilterMixin, WorkDayListView):
+    context_object_name = 'workhoursregistry_list'
+
+
 class WorkDayTaskListView(ListView):
     model = Task
     template_name = 'management/task_list.html'
+    context_object_name = 'task_list'
 
     def get_queryset(self):
-        workday = WorkhoursRegistry.objects.filter(id=self.kwargs['pk']).first()
-        if workday:
-            tasks = workday.task_set.all()
-            return tasks
-        else:
-            return None
+        tasks = task_cards(Task.objects.filter(work_day=self.kwargs['pk']))
+        if not tasks and reaches_archive(None):    # an archived workday keeps its tasks in the archive
+            tasks = task_cards(TaskArchive.objects.filter(work_day=self.kwargs['pk']))
+        return tasks
 
 
 class ProjectTodayFilter(django_filters.FilterSet):
@@ -80,100 +141,220 @@ class ProjectTodayListView(FilterView):
         return context
     
     def get_queryset(self):
-        today = utcnow().date()
+        today = localdate()
         tomorrow = today + timedelta(days=1)
-        tasks = Task.objects.filter(start__date__range=(today, tomorrow)).all()
+        tasks = task_cards(Task.objects.worked_between(today, tomorrow))
         return tasks
 
 
+class AsyncProjectTodayListView(AsyncFilterMixin, ProjectTodayListView):
+    context_object_name = 'task_list'
+
+
 class ProjectHoursListView(ListView):
     model = Projects
     template_name='management/pick_project.html'
 
 
-class ProjectHoursView(TemplateView):
+def project_hours_versions(project_id):
+    return (project_version(project_id), NAMES_VERSION)
+
+
+class ProjectHoursView(ReplicaReadMixin, KeysetPaginationMixin, ListView):
+    """ sums of the project from the cached report, below them one keyset page of its finished tasks"""
     template_name = 'management/project_hours.html'
+    context_object_name = 'tasks'
+
+    def get_queryset(self):
+        return task_cards(Task.objects.filter(project=self.kwargs['pk']).finished())
+
+    def source_querysets(self, queryset):
+        return project_tasks(self.kwargs['pk'], sources())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        tasks = Task.objects.filter(project=self.kwargs['pk']).exclude(stop__iexact=None).order_by('start')
-        hours = 0
-        minutes = 0
-        for task in tasks:
-            task_timedelta_object = task.stop - task.start
-            task_time_dict = seconds_to_hours_from_timedelta(task_timedelta_object)
-            hours += task_time_dict.get('full_hours')
-            minutes += task_time_dict.get('clock_minutes')
-    
-        hours_total = hours + round(minutes / 60)   
-        context['tasks'] = tasks
-        context['hours'] = hours_total
+        pk = self.kwargs['pk']
+        context.update(cached_report('project_hours', pk, project_hours_versions(pk), partial(project_hours_data, pk)))
         return context
-        
+
+
+class AsyncProjectHoursView(ProjectHoursView):
+
+    async def get(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        report = await acached_report('project_hours', pk, project_hours_versions(pk), partial(aproject_hours_data, pk))
+        # the page of tasks is read in a thread, like the rendering, the sums come from the async report above
+        self.object_list = self.get_queryset()
+        context = await sync_to_async(super(ProjectHoursView, self).get_context_data)(**report)
+        return self.render_to_response(context)
+
 class PickEmployeeView(ListView):
     model = get_user_model()
     template_name='management/pick_employee.html'
 
 
-class OvertimeView(TemplateView):
+def overtime_workdays(employee_id, tenth, next_tenth, models):
+    """ finished workdays of the settlement period with their tasks, one queryset per model pair of management.archive.sources"""
+    return [
+        workday_model.objects.filter(employee=employee_id, status=WorkDayStatus.WORK).worked_between(tenth, next_tenth).finished().order_by('start').only('start', 'stop').prefetch_related(
+            Prefetch('task_set', queryset=task_model.objects.select_related('project').only('start', 'stop', 'location', 'work_mode', 'work_day', 'project__name', 'project__client_company'))
+        )
+        for workday_model, task_model in models
+    ]
+
+
+def requested_day(request):
+    """ ?day= of the overtime pages, any day of the settlement period to show, today by default"""
+    try:
+        return parse_date(request.GET.get('day', '')) or utcnow().date()
+    except ValueError:
+        return utcnow().date()
+
+
+def overtime_data(employee_id, tenth, next_tenth):
+    get_object_or_404(UserCustom.objects.only('pk'), pk=employee_id)    # month_rollups would save rollups of a missing employee
+    # overtime is every hour past overtime_after, every workhour on overtime_days (1=Mon, 7=Sun) counts as overtime
+    rollup = month_rollups([employee_id], tenth)[employee_id]
+    return {'workdays': [workday for workdays in overtime_workdays(employee_id, tenth, next_tenth, sources(tenth)) for workday in workdays], 'overtime': rollup.overtime}
+
+
+async def aovertime_data(employee_id, tenth, next_tenth):
+    if not await UserCustom.objects.filter(pk=employee_id).aexists():
+        raise Http404
+    # month_rollups may recompute and save missing rollups, it stays synchronous
+    rollup = (await sync_to_async(month_rollups)([employee_id], tenth))[employee_id]
+    return {'workdays': [workday for workdays in overtime_workdays(employee_id, tenth, next_tenth, await asources(tenth)) async for workday in workdays], 'overtime': rollup.overtime}
+
+
+def overtime_versions(employee_id, tenth):
+    """ a closed period is read from the cache until a workday or task in it is edited"""
+    return (employee_period_version(employee_id, tenth), PARAMETERS_VERSION, NAMES_VERSION)
+
+
+class OvertimeView(ReplicaReadMixin, TemplateView):
     template_name = 'management/overtime.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        today = utcnow().date()
-        
-        # month is from 10-th to 10-th so some adjustments were needed:
-        if today.day < 10:
-            today = today.replace(month=(today.month -1))
-
-        if today.month != 12: # No December no problems
-            next_month = today.month + 1
-            year = today.year
-        else:   # because december
-            next_month = 1 #January
-            year = today.year + 1
-        
-        tenth = today.replace(day=10)
-        next_tenth = tenth.replace(month=next_month, year=year)
-
-        # get queryset with finished workdays from a monthly period
-        workdays = WorkhoursRegistry.objects.filter(employee=self.kwargs['pk'], status=WorkDayStatus.WORK, start__date__range=(tenth, next_tenth)).exclude(stop__iexact=None).order_by('start')
-        overtime_total = 0
-        # overtime is every hour past whatever int is in parameter
-        overtime_after = OvertimeParameters.objects.last().overtime_after 
-        # every workhour from whichever day is in the parameter will count as overtime (1=Mon, 7=Sun)
-        overtime_day = OvertimeParameters.objects.last().overtime_days
-
-        for workday in workdays:
-            workday_timedelta_object = workday.stop - workday.start
-            task_time_dict = seconds_to_hours_from_timedelta(workday_timedelta_object)
-            hours = task_time_dict.get('full_hours')
-            
-            if hours < overtime_after and workday.start.isoweekday() != overtime_day:
-                continue
-            
-            minutes = task_time_dict.get('clock_minutes')
-
-            if workday.start.isoweekday() == overtime_day:
-                overtime_total += hours
-            else:
-                overtime_total += (hours - overtime_after)
-            
-            if minutes >= 30: # overtime counts as full hour if it`s longer than or equal to 30 minutes
-                overtime_total += 1
-     
-        context['workdays'] = workdays
-        context['overtime'] = overtime_total
+        pk = self.kwargs['pk']
+        tenth, next_tenth = settlement_period(requested_day(self.request))
+        context.update(cached_report('overtime', (pk, tenth), overtime_versions(pk, tenth), partial(overtime_data, pk, tenth, next_tenth)))
+        context['tenth'] = tenth
+        context['next_tenth'] = next_tenth
         return context
 
 
+class AsyncOvertimeView(ReplicaReadMixin, TemplateView):
+    template_name = 'management/overtime.html'
+
+    async def get(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        tenth, next_tenth = settlement_period(requested_day(request))
+        report = await acached_report('overtime', (pk, tenth), overtime_versions(pk, tenth), partial(aovertime_data, pk, tenth, next_tenth))
+        return self.render_to_response(self.get_context_data(**kwargs, **report, tenth=tenth, next_tenth=next_tenth))
+
+
+class OvertimeAllView(TemplateView):
+    template_name = 'management/overtime_all.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tenth, next_tenth, employees_overtime = workforce_overtime(requested_day(self.request))
+
+        context['tenth'] = tenth
+        context['next_tenth'] = next_tenth
+        context['employees_overtime'] = employees_overtime
+        return context
+
+
+class ReportJobsView(UserPassesTestMixin, TemplateView):
+    """ company wide reports are requested here and computed by `manage.py report_worker`, the page follows their progress"""
+    template_name = 'management/report_jobs.html'
+
+    def test_func(self):
+        return self.request.user.is_superuser
+
+    def post(self, request, *args, **kwargs):
+        form = ReportJobForm(request.POST)
+        if not form.is_valid():
+            return self.render_to_response(self.get_context_data(form=form))
+        ReportJob.objects.create(kind=form.cleaned_data['kind'], parameters=form.parameters(), requested_by=request.user)
+        return redirect('report_jobs')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        jobs = list(ReportJob.objects.defer('result', 'error').order_by('-created')[:50])
+        context.setdefault('form', ReportJobForm())
+        context['jobs'] = jobs
+        context['pending'] = any(job.status in (ReportJobStatus.QUEUED, ReportJobStatus.RUNNING) for job in jobs)
+        return context
+
+
+class ReportJobDownloadView(UserPassesTestMixin, View):
+    """ the reports hold every employee's email and hours, like the request page they are for superusers"""
+
+    def test_func(self):
+        return self.request.user.is_superuser
+
+    def get(self, request, *args, **kwargs):
+        job = get_object_or_404(ReportJob, pk=kwargs['pk'], status=ReportJobStatus.DONE)
+        response = HttpResponse('\ufeff' + job.result, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{job.filename}"'
+        return response
+
+
 class FilterPicKView(TemplateView):
     template_name = 'management/filters.html'
 
 
+class MetricsView(View):
+    """ Prometheus scrape endpoint, with METRICS_TOKEN set the scraper has to send it as a bearer token"""
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICS_TOKEN
+        if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+        return HttpResponse(exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class RequestStatsView(UserPassesTestMixin, TemplateView):
+    """ per page timings of RequestStatsMiddleware, only for superusers - every account created by create_user is staff"""
+    template_name = 'management/request_stats.html'
+
+    def test_func(self):
+        return self.request.user.is_superuser
+
+    def post(self, request, *args, **kwargs):
+        reset_metrics()
+        return redirect('request_stats')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['enabled'] = settings.REQUEST_STATS
+        context['stats'] = request_stats()
+        return context
+
+
+
+class ArchiveFilterMixin:
+    """
+    Filter and export views of workdays or tasks: when the requested start range reaches archived days
+    the same filters are applied to archive_queryset too, otherwise the archive tables are not touched.
+    """
+    archive_queryset = None
+
+    def source_querysets(self, queryset):
+        if self.filterset.is_bound and not self.filterset.is_valid():
+            return [queryset]
+        requested = self.filterset.form.cleaned_data.get('start') if self.filterset.is_bound else None
+        if not reaches_archive(requested.start.date() if requested and requested.start else None):
+            return [queryset]
+        archive = self.get_filterset_class()(self.filterset.data, queryset=self.archive_queryset.all(), request=self.request).qs
+        return [archive, queryset]
+
 
 class WorkDayAllFilter(django_filters.FilterSet):
-    start = django_filters.DateFromToRangeFilter(widget=OurDateRangeWidget())
+    start = django_filters.DateFromToRangeFilter(field_name='work_date', widget=OurDateRangeWidget())
     employee = django_filters.ModelChoiceFilter(queryset=UserCustom.objects.all(), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%'}))
     status = django_filters.ChoiceFilter(choices=WorkDayStatus.choices, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
 
@@ -183,14 +364,17 @@ class WorkDayAllFilter(django_filters.FilterSet):
         
 
 
-class WorkDayAllFilterView(FilterView):
+class WorkDayAllFilterView(ReplicaReadMixin, ArchiveFilterMixin, KeysetPaginationMixin, FilterView):
     model = WorkhoursRegistry
+    queryset = workday_cards(WorkhoursRegistry.objects.all())
+    archive_queryset = workday_cards(WorkhoursRegistryArchive.objects.all())
     template_name= 'management/workday_all_filter.html'
     filterset_class = WorkDayAllFilter
     ordering = ['start']
 
     def get_context_data(self, *args, **kwargs):
         _request_copy = self.request.GET.copy()
+        _request_copy.pop(self.cursor_kwarg, None)
         parameters = _request_copy.pop('page', True) and _request_copy.urlencode()
         context = super().get_context_data(*args, **kwargs)
         context['parameters'] = parameters
@@ -198,18 +382,9 @@ class WorkDayAllFilterView(FilterView):
 
 
 class ProjectAllFilter(django_filters.FilterSet):
-    project_queryset = Projects.objects.all()
-
-    project_list_name = [(project.name, project.name) for project in project_queryset]
-    name = django_filters.ChoiceFilter(choices=project_list_name, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
-
-
-    project_list_client = [(project.client_company, project.client_company) for project in project_queryset]
-    client_company = django_filters.ChoiceFilter(choices=project_list_client, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
-
-    project_list_location = [(project.location, project.location) for project in project_queryset]
-    location = django_filters.ChoiceFilter(choices=project_list_location, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
-
+    name = django_filters.ChoiceFilter(choices=lazy_choices(Projects, 'name'), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
+    client_company = django_filters.ChoiceFilter(choices=lazy_choices(Projects, 'client_company'), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
+    location = django_filters.ChoiceFilter(choices=lazy_choices(Projects, 'location'), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
     finished = django_filters.BooleanFilter(widget=forms.NullBooleanSelect(attrs={'style': 'font-size: 1.5em; width:100%',}))
 
     class Meta:
@@ -223,6 +398,7 @@ class ProjectAllFilterView(FilterView):
     template_name= 'management/project_all_filter.html'
     filterset_class = ProjectAllFilter
     ordering = ['name']
+    paginate_by = settings.MANAGEMENT_PAGINATE_BY
 
     def get_context_data(self, *args, **kwargs):
         _request_copy = self.request.GET.copy()
@@ -234,10 +410,8 @@ class ProjectAllFilterView(FilterView):
 
 class TaskAllFilter(django_filters.FilterSet):
 
-    start = django_filters.DateFromToRangeFilter(widget=OurDateRangeWidget())
-    task_queryset = Task.objects.all()
-    task_list_location = set([(task.location, task.location) for task in task_queryset])
-    location = django_filters.ChoiceFilter(choices=task_list_location, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
+    start = django_filters.DateFromToRangeFilter(field_name='work_date', widget=OurDateRangeWidget())
+    location = django_filters.ChoiceFilter(choices=lazy_choices(Task, 'location'), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
     project = django_filters.ModelChoiceFilter(queryset=Projects.objects.all(), widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%'}))
     work_mode = django_filters.ChoiceFilter(choices=WorkModeStatus.choices, widget=forms.Select(attrs={'style': 'font-size: 1.5em; width:100%',}))
 
@@ -246,14 +420,17 @@ class TaskAllFilter(django_filters.FilterSet):
         fields = ['start', 'location', 'project', 'work_mode']
 
 
-class TaskAllFilterView(FilterView):
+class TaskAllFilterView(ReplicaReadMixin, ArchiveFilterMixin, KeysetPaginationMixin, FilterView):
     model = Task
+    queryset = task_cards(Task.objects.all())
+    archive_queryset = task_cards(TaskArchive.objects.all())
     template_name= 'management/task_all_filter.html'
     filterset_class = TaskAllFilter
     ordering = ['start']
 
     def get_context_data(self, *args, **kwargs):
         _request_copy = self.request.GET.copy()
+        _request_copy.pop(self.cursor_kwarg, None)
         parameters = _request_copy.pop('page', True) and _request_copy.urlencode()
         context = super().get_context_data(*args, **kwargs)
         context['parameters'] = parameters
@@ -276,6 +453,10 @@ class WorkerAllFilterView(FilterView):
     template_name= 'management/worker_all_filter.html'
     filterset_class = WorkerAllFilter
     ordering = ['first_name']
+    paginate_by = settings.MANAGEMENT_PAGINATE_BY
+
+    def get_queryset(self):
+        return super().get_queryset().with_absence_days()   # per request, the days are counted for the current year
 
     def get_context_data(self, *args, **kwargs):
         _request_copy = self.request.GET.copy()
@@ -283,3 +464,70 @@ class WorkerAllFilterView(FilterView):
         context = super().get_context_data(*args, **kwargs)
         context['parameters'] = parameters
         return context
+
+
+class WorkDayExportView(ArchiveFilterMixin, CsvExportView):
+    queryset = workday_cards(WorkhoursRegistry.objects.all())
+    archive_queryset = workday_cards(WorkhoursRegistryArchive.objects.all())
+    filterset_class = WorkDayAllFilter
+    ordering = ['start', 'id']
+    filename = 'dni_pracy'
+    columns = (
+        ('Start', 'start'),
+        ('Stop', 'stop'),
+        ('Imie', 'employee.first_name'),
+        ('Nazwisko', 'employee.last_name'),
+        ('Status', 'get_status_display'),
+    )
+
+
+class TaskExportView(ArchiveFilterMixin, CsvExportView):
+    queryset = task_cards(Task.objects.all())
+    archive_queryset = task_cards(TaskArchive.objects.all())
+    filterset_class = TaskAllFilter
+    ordering = ['start', 'id']
+    filename = 'zadania'
+    columns = (
+        ('Start', 'start'),
+        ('Stop', 'stop'),
+        ('Lokacja', 'location'),
+        ('Projekt', 'project.name'),
+        ('Klient', 'project.client_company'),
+        ('Tryb pracy', 'get_work_mode_display'),
+        ('Imie', 'work_day.employee.first_name'),
+        ('Nazwisko', 'work_day.employee.last_name'),
+    )
+
+
+class ProjectExportView(CsvExportView):
+    model = Projects
+    filterset_class = ProjectAllFilter
+    ordering = ['name']
+    filename = 'projekty'
+    columns = (
+        ('Nazwa', 'name'),
+        ('Klient', 'client_company'),
+        ('Lokacja', 'location'),
+        ('Ukończony', 'finished'),
+    )
+
+
+class WorkerExportView(CsvExportView):
+    model = UserCustom
+    filterset_class = WorkerAllFilter
+    ordering = ['first_name']
+    filename = 'pracownicy'
+
+    def get_queryset(self):
+        return super().get_queryset().with_absence_days()
+    columns = (
+        ('Imie', 'first_name'),
+        ('Nazwisko', 'last_name'),
+        ('Email', 'email'),
+        ('Nr telefonu', 'mobile_nr'),
+        ('Wymiar urlopu', 'holiday_allowance'),
+        ('Pozostaly urlop', 'remaining_holiday'),
+        ('Dni choroby', 'sick_leave_days'),
+        ('Dni opieki', 'child_care_days'),
+        ('Aktywny', 'is_active'),
+    )